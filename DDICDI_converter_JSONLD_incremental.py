@@ -1,11 +1,36 @@
 #!/usr/bin/env python
 # coding: utf-8
 import json
+import re
 import numpy as np
 import pandas as pd
 import datetime
 import time
 import math
+import os
+import types
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from jsonld_context import DDI_CDI_CONTEXT_URL, iri_resolver
+from format_converter import (
+    FormatConverter, TripleTemplate, CollectionTemplate, TurtleWriter, NQuadsWriter, RdfXmlWriter,
+    BinaryRdfWriter, quote_literal, iri_segment
+)
+
+# JSON-LD context shared by every generated document
+JSON_LD_CONTEXT = [
+    DDI_CDI_CONTEXT_URL,
+    {
+        "skos": "http://www.w3.org/2004/02/skos/core#"
+    }
+]
+
+# Separators of the compact encoding (indent=None): no whitespace at all
+COMPACT_SEPARATORS = (',', ':')
+
+# Schemas with fewer variables than this generate their metadata serially even
+# when workers are requested; below it, process start-up costs more than it saves
+PARALLEL_METADATA_MIN_VARIABLES = 1000
 
 # Helper functions for conditional references based on file format
 def _get_dataset_reference(df_meta):
@@ -36,6 +61,259 @@ def _get_structure_type(df_meta):
     else:
         return "WideDataStructure"
 
+# Variable roles, as bits of a per-variable mask
+ROLE_IDENTIFIER = 1
+ROLE_ATTRIBUTE = 2
+ROLE_MEASURE = 4
+ROLE_CONTEXTUAL = 8
+ROLE_SYNTHETIC_ID = 16
+ROLE_VARIABLE_VALUE = 32
+
+_ROLE_ATTRIBUTES = {
+    ROLE_IDENTIFIER: 'identifier_vars',
+    ROLE_ATTRIBUTE: 'attribute_vars',
+    ROLE_MEASURE: 'measure_vars',
+    ROLE_CONTEXTUAL: 'contextual_vars',
+    ROLE_SYNTHETIC_ID: 'synthetic_id_vars',
+    ROLE_VARIABLE_VALUE: 'variable_value_vars'
+}
+
+class RoleIndex:
+    """
+    The variable roles of df_meta, compiled once per conversion so that role
+    lookups are set and dict operations instead of list scans.
+
+    masks maps each variable to its role bits, variables[role] lists the role's
+    variables that exist in the dataset in the order of the role list, and
+    declared[role] tells whether the role list is non-empty at all.
+    """
+    def __init__(self, df_meta):
+        self.is_json = hasattr(df_meta, 'file_format') and df_meta.file_format == 'json'
+        columns = set(df_meta.column_names)
+        self.masks = dict.fromkeys(df_meta.column_names, 0)
+        self.variables = {}
+        self.declared = {}
+        for role, attr in _ROLE_ATTRIBUTES.items():
+            role_vars = getattr(df_meta, attr, None) or []
+            self.declared[role] = bool(role_vars)
+            self.variables[role] = [variable for variable in role_vars if variable in columns]
+            for variable in self.variables[role]:
+                self.masks[variable] |= role
+
+    def has_role(self, variable, role):
+        return bool(self.masks.get(variable, 0) & role)
+
+    def component_references(self, variable):
+        """References of the data structure components of a variable, in document order"""
+        mask = self.masks[variable]
+        references = []
+        if mask & ROLE_IDENTIFIER:
+            references.append(f"#identifierComponent-{iri_segment(variable)}")
+        if mask & ROLE_ATTRIBUTE:
+            references.append(f"#attributeComponent-{iri_segment(variable)}")
+        if self.is_json:
+            if mask & ROLE_CONTEXTUAL:
+                references.append(f"#contextualComponent-{iri_segment(variable)}")
+            if mask & ROLE_SYNTHETIC_ID:
+                references.append(f"#syntheticIdComponent-{iri_segment(variable)}")
+            if mask & ROLE_VARIABLE_VALUE:
+                references.append(f"#variableValueComponent-{iri_segment(variable)}")
+                # Also add the corresponding VariableDescriptorComponent (required by SHACL)
+                references.append(f"#variableDescriptorComponent-{iri_segment(variable)}")
+        elif mask & ROLE_MEASURE:
+            references.append(f"#measureComponent-{iri_segment(variable)}")
+        return references
+
+def _get_role_index(df_meta, role_index=None):
+    """Use the role index of the current conversion, or compile one"""
+    return role_index if role_index is not None else RoleIndex(df_meta)
+
+_CLASSIFICATION_LEVELS = {'nominal': 'Nominal', 'scale': 'Continuous', 'ordinal': 'Ordinal', 'unknown': 'Nominal'}
+
+def _substantive_excluded_values(missing_ranges):
+    """Values of numeric missing ranges (and string missing values) left out of the substantive enumeration"""
+    excluded_values = set()
+    for dict_range in missing_ranges:
+        if isinstance(dict_range['lo'], float) and isinstance(dict_range['hi'], float):
+            lo_val = float(dict_range['lo'])
+            hi_val = float(dict_range['hi'])
+
+            # Handle infinity case - just add the lo value if hi is infinity
+            if math.isinf(hi_val):
+                if not math.isinf(lo_val):
+                    excluded_values.add(int(lo_val))
+            elif not math.isinf(lo_val):
+                # Normal range case
+                excluded_values.update(
+                    range(int(lo_val), int(hi_val) + 1))
+        elif isinstance(dict_range['lo'], str):
+            excluded_values.add(dict_range['lo'])
+    return excluded_values
+
+def _concept_scheme_excluded_values(missing_values):
+    """Values of missing ranges or user missing values left out of the substantive concept scheme"""
+    excluded_values = set()
+
+    # If the relevant variable data is based on ranges and contains dictionaries
+    if isinstance(missing_values, list) and all(isinstance(item, dict) for item in missing_values):
+        for dict_range in missing_values:
+            lo_is_numeric = isinstance(dict_range['lo'], (int, float)) or (
+                    isinstance(dict_range['lo'], str) and dict_range['lo'].isnumeric()
+            )
+            hi_is_numeric = isinstance(dict_range['hi'], (int, float)) or (
+                    isinstance(dict_range['hi'], str) and dict_range['hi'].isnumeric()
+            )
+
+            if lo_is_numeric and hi_is_numeric:
+                lo_val = float(dict_range['lo'])
+                hi_val = float(dict_range['hi'])
+
+                # Handle infinity case - just add the lo value if hi is infinity
+                if math.isinf(hi_val):
+                    if not math.isinf(lo_val):
+                        excluded_values.add(int(lo_val))
+                elif not math.isinf(lo_val):
+                    # Normal range case
+                    excluded_values.update(
+                        range(int(lo_val), int(hi_val) + 1))
+            elif isinstance(dict_range['lo'], str):
+                excluded_values.add(dict_range['lo'])
+            else:
+                print(f"Warning: Unsupported 'lo' value: {dict_range['lo']}")
+
+    # If the relevant variable data contains strings (user-defined missing values)
+    elif isinstance(missing_values, list):
+        excluded_values.update(set(map(str, missing_values)))
+
+    return excluded_values
+
+def _not_excluded(values, excluded_values):
+    excluded_values_str = {str(i) for i in excluded_values}
+    return [value for value in values
+            if (not value in excluded_values) and (not str(value) in excluded_values_str)]
+
+class VariablePlan:
+    """Derived facts about one variable, see SchemaPlan"""
+    __slots__ = ('name', 'label', 'physical_data_type', 'xsd_type', 'classification_level',
+                 'value_labels', 'has_sentinel_values', 'substantive_values', 'top_concept_values',
+                 'sentinel_values')
+
+    def __init__(self, name):
+        self.name = name
+        self.label = name
+        self.physical_data_type = "string"
+        self.xsd_type = None
+        self.classification_level = None
+        self.value_labels = None
+        self.has_sentinel_values = False
+        # Value label keys that are not missing values, for the substantive enumeration domain
+        self.substantive_values = []
+        # Value label keys in the substantive concept scheme
+        self.top_concept_values = []
+        # Missing ranges or user missing values
+        self.sentinel_values = None
+
+    def sentinel_bounds(self):
+        """Smallest and largest missing value"""
+        values = self.sentinel_values
+        if isinstance(values[0], dict):
+            return min(d['lo'] for d in values), max(d['hi'] for d in values)
+        return min(values), max(values)
+
+    def sentinel_concept_values(self):
+        """Value label keys that are missing values, for the sentinel concept scheme"""
+        values = self.sentinel_values
+        if self.value_labels is None:
+            return []
+        if isinstance(values[0], dict):
+            return [
+                value
+                for value in self.value_labels.keys()
+                for range_dict in values
+                if range_dict['lo'] <= value <= range_dict['hi']
+            ]
+        return [value for value in values if value in self.value_labels]
+
+class SchemaPlan:
+    """
+    Per-variable facts the metadata generators need, derived from df_meta once
+    per conversion: labels, types, classification level, value labels and
+    missing values. Generators read the VariablePlan records instead of
+    re-deriving them from df_meta.
+
+    columns holds the records of all columns, labelled_variables those with
+    value labels and sentinel_variables those with the missing values the
+    sentinel components are generated from. All three are in column order;
+    labelled or sentinel variables that are not columns come last.
+    """
+    def __init__(self, df_meta, role_index=None):
+        self.roles = _get_role_index(df_meta, role_index)
+        self.variables = {}
+
+        column_labels = getattr(df_meta, 'column_labels', None)
+        original_types = getattr(df_meta, 'original_variable_types', None)
+        readstat_types = getattr(df_meta, 'readstat_variable_types', {})
+        variable_measure = getattr(df_meta, 'variable_measure', {})
+        value_labels = df_meta.variable_value_labels
+        missing_ranges = df_meta.missing_ranges
+        # Missing ranges take precedence over user missing values
+        relevant_variables = missing_ranges if len(missing_ranges) > 0 else df_meta.missing_user_values
+
+        self.columns = []
+        for idx, variable in enumerate(df_meta.column_names):
+            record = self._record(variable)
+            # Handle both list and dictionary cases for column_labels and original_variable_types
+            record.label = (column_labels[idx]
+                            if isinstance(column_labels, list)
+                            else column_labels.get(variable, variable))
+            record.physical_data_type = str(original_types[idx]
+                                            if isinstance(original_types, list)
+                                            else original_types.get(variable, "string"))
+            if variable in variable_measure:
+                record.classification_level = _CLASSIFICATION_LEVELS[variable_measure[variable]]
+            if variable in value_labels:
+                record.substantive_values = _not_excluded(
+                    value_labels[variable].keys(),
+                    _substantive_excluded_values(missing_ranges.get(variable, [])))
+            self.columns.append(record)
+
+        # Sorting is stable: variables that are not columns keep their order
+        position = {variable: idx for idx, variable in enumerate(df_meta.column_names)}
+
+        def column_order(item):
+            return position.get(item[0], len(position))
+
+        self.labelled_variables = []
+        for variable, values_dict in sorted(value_labels.items(), key=column_order):
+            record = self._record(variable)
+            record.value_labels = values_dict
+            record.top_concept_values = _not_excluded(
+                values_dict.keys(),
+                _concept_scheme_excluded_values(relevant_variables.get(variable)))
+            self.labelled_variables.append(record)
+
+        self.sentinel_variables = []
+        for variable, values in sorted(relevant_variables.items(), key=column_order):
+            record = self._record(variable)
+            record.has_sentinel_values = True
+            record.sentinel_values = values
+            self.sentinel_variables.append(record)
+
+        # Types are mapped last, once per variable, for the columns and sentinel variables
+        for record in self.variables.values():
+            if record.name in readstat_types:
+                record.xsd_type = map_to_xsd_type(readstat_types[record.name])
+
+    def _record(self, variable):
+        record = self.variables.get(variable)
+        if record is None:
+            record = self.variables[variable] = VariablePlan(variable)
+        return record
+
+def _get_schema_plan(df_meta, schema_plan=None):
+    """Use the schema plan of the current conversion, or compile one"""
+    return schema_plan if schema_plan is not None else SchemaPlan(df_meta)
+
 # Core functions
 def generate_PhysicalDataSetStructure(df_meta):
     json_ld_data = []
@@ -76,8 +354,9 @@ def generate_PhysicalRecordSegment(df_meta, df):
         elements["has_DataPointPosition"] = []
         # Iterate through column names and their values to add DataPointPosition references
         for variable in df_meta.column_names:
+            segment = iri_segment(variable)
             for i in range(len(df[variable])):
-                elements["has_DataPointPosition"].append(f"#dataPointPosition-{i}-{variable}")
+                elements["has_DataPointPosition"].append(f"#dataPointPosition-{i}-{segment}")
 
     json_ld_data.append(elements)
     return json_ld_data
@@ -125,7 +404,7 @@ def generate_PhysicalSegmentLayout(df_meta, include_value_mapping=True):
     # Only if include_value_mapping is True
     if include_value_mapping:
         for variable in df_meta.column_names:
-            elements["has_ValueMappingPosition"].append(f"#valueMappingPosition-{variable}")
+            elements["has_ValueMappingPosition"].append(f"#valueMappingPosition-{iri_segment(variable)}")
 
     json_ld_data.append(elements)
     return json_ld_data
@@ -136,7 +415,7 @@ def generate_DataStore(df_meta):
         "@id": "#dataStore",
         "@type": "DataStore",
         "allowsDuplicates": False,
-        "recordCount": df_meta.number_rows,
+        "recordCount": _json_scalar(df_meta.number_rows),
         "has_LogicalRecord": ["#logicalRecord"]
     }
     json_ld_data.append(elements)
@@ -154,7 +433,7 @@ def generate_LogicalRecord(df_meta):
     
     # Add InstanceVariable references with consistent ID naming
     for variable in df_meta.column_names:
-        elements["has_InstanceVariable"].append(f"#instanceVariable-{variable}")
+        elements["has_InstanceVariable"].append(f"#instanceVariable-{iri_segment(variable)}")
     
     json_ld_data.append(elements)
     return json_ld_data
@@ -170,7 +449,8 @@ def generate_WideDataSet(df_meta):
     json_ld_data.append(elements)
     return json_ld_data
 
-def generate_WideDataStructure(df_meta):
+def generate_WideDataStructure(df_meta, role_index=None):
+    role_index = _get_role_index(df_meta, role_index)
     json_ld_data = []
     elements = {
         "@id": _get_structure_reference(df_meta),
@@ -179,247 +459,119 @@ def generate_WideDataStructure(df_meta):
         "has_ComponentPosition": []
     }
     
-    # Check if this is a JSON file to use different component logic
-    is_json_file = hasattr(df_meta, 'file_format') and df_meta.file_format == 'json'
-    
     # Set up for primary key if identifiers exist (non-JSON files only)
-    if hasattr(df_meta, 'identifier_vars') and df_meta.identifier_vars and not is_json_file:
+    if role_index.declared[ROLE_IDENTIFIER] and not role_index.is_json:
         elements["has_PrimaryKey"] = "#primaryKey"
     
     # Process all variables for all possible roles
     for variable in df_meta.column_names:
-        # Add as identifier component (common to both JSON and non-JSON)
-        if hasattr(df_meta, 'identifier_vars') and df_meta.identifier_vars and variable in df_meta.identifier_vars:
-            elements["has_DataStructureComponent"].append(f"#identifierComponent-{variable}")
-        
-        # Add as attribute component (common to both JSON and non-JSON)
-        if hasattr(df_meta, 'attribute_vars') and df_meta.attribute_vars and variable in df_meta.attribute_vars:
-            elements["has_DataStructureComponent"].append(f"#attributeComponent-{variable}")
-        
-        
-        if is_json_file:
-            # JSON-specific components
-            # Add as contextual component
-            if hasattr(df_meta, 'contextual_vars') and df_meta.contextual_vars and variable in df_meta.contextual_vars:
-                elements["has_DataStructureComponent"].append(f"#contextualComponent-{variable}")
-            
-            # Add as synthetic ID component
-            if hasattr(df_meta, 'synthetic_id_vars') and df_meta.synthetic_id_vars and variable in df_meta.synthetic_id_vars:
-                elements["has_DataStructureComponent"].append(f"#syntheticIdComponent-{variable}")
-            
-            # Add as variable value component
-            if hasattr(df_meta, 'variable_value_vars') and df_meta.variable_value_vars and variable in df_meta.variable_value_vars:
-                elements["has_DataStructureComponent"].append(f"#variableValueComponent-{variable}")
-                # Also add the corresponding VariableDescriptorComponent reference (required by SHACL)
-                elements["has_DataStructureComponent"].append(f"#variableDescriptorComponent-{variable}")
-        else:
-            # Non-JSON files (SPSS, CSV, etc.) - use measure components
-            # Add as measure component
-            if hasattr(df_meta, 'measure_vars') and df_meta.measure_vars and variable in df_meta.measure_vars:
-                elements["has_DataStructureComponent"].append(f"#measureComponent-{variable}")
-            # If no roles are assigned, default to measure for non-JSON files
-            elif (not hasattr(df_meta, 'identifier_vars') or variable not in df_meta.identifier_vars) and \
-                 (not hasattr(df_meta, 'attribute_vars') or variable not in df_meta.attribute_vars) and \
-                 (not hasattr(df_meta, 'measure_vars') or variable not in df_meta.measure_vars):
-                elements["has_DataStructureComponent"].append(f"#measureComponent-{variable}")
-
-    # Add ComponentPosition references
-    # Calculate total number of component positions needed
-    position_count = 0
-    for variable in df_meta.column_names:
-        component_count = 0
-        
-        # Count components for this variable
-        if hasattr(df_meta, 'identifier_vars') and df_meta.identifier_vars and variable in df_meta.identifier_vars:
-            component_count += 1
-        if hasattr(df_meta, 'attribute_vars') and df_meta.attribute_vars and variable in df_meta.attribute_vars:
-            component_count += 1
-        
-        if not is_json_file:
-            if hasattr(df_meta, 'measure_vars') and df_meta.measure_vars and variable in df_meta.measure_vars:
-                component_count += 1
-            # Default to measure if no roles assigned for non-JSON files
-            elif (not hasattr(df_meta, 'identifier_vars') or variable not in df_meta.identifier_vars) and \
-                 (not hasattr(df_meta, 'attribute_vars') or variable not in df_meta.attribute_vars) and \
-                 (not hasattr(df_meta, 'measure_vars') or variable not in df_meta.measure_vars):
-                component_count += 1
-        else:
-            if hasattr(df_meta, 'contextual_vars') and df_meta.contextual_vars and variable in df_meta.contextual_vars:
-                component_count += 1
-            if hasattr(df_meta, 'synthetic_id_vars') and df_meta.synthetic_id_vars and variable in df_meta.synthetic_id_vars:
-                component_count += 1
-            if hasattr(df_meta, 'variable_value_vars') and df_meta.variable_value_vars and variable in df_meta.variable_value_vars:
-                component_count += 2  # VariableValue + VariableDescriptor
-        
-        # Add ComponentPosition references for this variable's components
-        for i in range(component_count):
-            elements["has_ComponentPosition"].append(f"#componentPosition-{position_count}")
-            position_count += 1
+        references = role_index.component_references(variable)
+        # If no roles are assigned, default to measure for non-JSON files
+        if not role_index.is_json and not role_index.masks[variable] & (ROLE_IDENTIFIER | ROLE_ATTRIBUTE | ROLE_MEASURE):
+            references.append(f"#measureComponent-{iri_segment(variable)}")
+        elements["has_DataStructureComponent"].extend(references)
+
+    # Add ComponentPosition references, one per component
+    elements["has_ComponentPosition"] = [
+        f"#componentPosition-{position}" for position in range(len(elements["has_DataStructureComponent"]))
+    ]
 
     json_ld_data.append(elements)
     return json_ld_data
 
-def generate_MeasureComponent(df_meta):
+def generate_MeasureComponent(df_meta, role_index=None):
     json_ld_data = []
     # Only generate MeasureComponents for non-JSON files
     if hasattr(df_meta, 'file_format') and df_meta.file_format == 'json':
         return json_ld_data
+    role_index = _get_role_index(df_meta, role_index)
     
     # Process all variables that are assigned as measures
-    if hasattr(df_meta, 'measure_vars') and df_meta.measure_vars:
-        for variable in df_meta.measure_vars:
-            if variable in df_meta.column_names:  # Verify variable exists in dataset
-                elements = {
-                    "@id": f"#measureComponent-{variable}",
-                    "@type": "MeasureComponent",
-                    "isDefinedBy_RepresentedVariable": f"#instanceVariable-{variable}"
-                }
-                json_ld_data.append(elements)
+    if role_index.declared[ROLE_MEASURE]:
+        variables = role_index.variables[ROLE_MEASURE]
     # Also handle any variables not explicitly assigned roles (default to measure)
     else:
-        for variable in df_meta.column_names:
-            if (not hasattr(df_meta, 'identifier_vars') or variable not in df_meta.identifier_vars) and \
-               (not hasattr(df_meta, 'attribute_vars') or variable not in df_meta.attribute_vars):
-                elements = {
-                    "@id": f"#measureComponent-{variable}",
-                    "@type": "MeasureComponent",
-                    "isDefinedBy_RepresentedVariable": f"#instanceVariable-{variable}"
-                }
-                json_ld_data.append(elements)
+        variables = [variable for variable in df_meta.column_names
+                     if not role_index.masks[variable] & (ROLE_IDENTIFIER | ROLE_ATTRIBUTE)]
+    for variable in variables:
+        elements = {
+            "@id": f"#measureComponent-{iri_segment(variable)}",
+            "@type": "MeasureComponent",
+            "isDefinedBy_RepresentedVariable": f"#instanceVariable-{iri_segment(variable)}"
+        }
+        json_ld_data.append(elements)
     return json_ld_data
 
-def generate_IdentifierComponent(df_meta):
+def _generate_role_components(df_meta, role, component_type, role_index=None):
+    """Generate one component of component_type per variable with the given role"""
+    role_index = _get_role_index(df_meta, role_index)
+    prefix = component_type[0].lower() + component_type[1:]
     json_ld_data = []
-    if hasattr(df_meta, 'identifier_vars') and df_meta.identifier_vars:
-        for variable in df_meta.identifier_vars:
-            if variable in df_meta.column_names:  # Verify variable exists in dataset
-                elements = {
-                    "@id": f"#identifierComponent-{variable}",
-                    "@type": "IdentifierComponent",
-                    "isDefinedBy_RepresentedVariable": f"#instanceVariable-{variable}"
-                }
-                json_ld_data.append(elements)
+    for variable in role_index.variables[role]:
+        elements = {
+            "@id": f"#{prefix}-{iri_segment(variable)}",
+            "@type": component_type,
+            "isDefinedBy_RepresentedVariable": f"#instanceVariable-{iri_segment(variable)}"
+        }
+        json_ld_data.append(elements)
     return json_ld_data
 
-def generate_AttributeComponent(df_meta):
-    json_ld_data = []
-    if hasattr(df_meta, 'attribute_vars') and df_meta.attribute_vars:
-        for variable in df_meta.attribute_vars:
-            if variable in df_meta.column_names:  # Verify variable exists in dataset
-                elements = {
-                    "@id": f"#attributeComponent-{variable}",
-                    "@type": "AttributeComponent",
-                    "isDefinedBy_RepresentedVariable": f"#instanceVariable-{variable}"
-                }
-                json_ld_data.append(elements)
-    return json_ld_data
+def generate_IdentifierComponent(df_meta, role_index=None):
+    return _generate_role_components(df_meta, ROLE_IDENTIFIER, "IdentifierComponent", role_index)
+
+def generate_AttributeComponent(df_meta, role_index=None):
+    return _generate_role_components(df_meta, ROLE_ATTRIBUTE, "AttributeComponent", role_index)
 
 
-def generate_ContextualComponent(df_meta):
+def generate_ContextualComponent(df_meta, role_index=None):
     """Generate ContextualComponent entries for JSON files only"""
-    json_ld_data = []
     # Only generate for JSON files (KeyValueDataStore)
     if hasattr(df_meta, 'file_format') and df_meta.file_format == 'json':
-        if hasattr(df_meta, 'contextual_vars') and df_meta.contextual_vars:
-            for variable in df_meta.contextual_vars:
-                if variable in df_meta.column_names:  # Verify variable exists in dataset
-                    elements = {
-                        "@id": f"#contextualComponent-{variable}",
-                        "@type": "ContextualComponent",
-                        "isDefinedBy_RepresentedVariable": f"#instanceVariable-{variable}"
-                    }
-                    json_ld_data.append(elements)
-    return json_ld_data
+        return _generate_role_components(df_meta, ROLE_CONTEXTUAL, "ContextualComponent", role_index)
+    return []
 
-def generate_SyntheticIdComponent(df_meta):
+def generate_SyntheticIdComponent(df_meta, role_index=None):
     """Generate SyntheticIdComponent entries for JSON files only"""
-    json_ld_data = []
     # Only generate for JSON files (KeyValueDataStore)
     if hasattr(df_meta, 'file_format') and df_meta.file_format == 'json':
-        if hasattr(df_meta, 'synthetic_id_vars') and df_meta.synthetic_id_vars:
-            for variable in df_meta.synthetic_id_vars:
-                if variable in df_meta.column_names:  # Verify variable exists in dataset
-                    elements = {
-                        "@id": f"#syntheticIdComponent-{variable}",
-                        "@type": "SyntheticIdComponent",
-                        "isDefinedBy_RepresentedVariable": f"#instanceVariable-{variable}"
-                    }
-                    json_ld_data.append(elements)
-    return json_ld_data
+        return _generate_role_components(df_meta, ROLE_SYNTHETIC_ID, "SyntheticIdComponent", role_index)
+    return []
 
-def generate_VariableValueComponent(df_meta):
+def generate_VariableValueComponent(df_meta, role_index=None):
     """Generate VariableValueComponent entries for JSON files only"""
-    json_ld_data = []
     # Only generate for JSON files (KeyValueDataStore)
     if hasattr(df_meta, 'file_format') and df_meta.file_format == 'json':
-        if hasattr(df_meta, 'variable_value_vars') and df_meta.variable_value_vars:
-            for variable in df_meta.variable_value_vars:
-                if variable in df_meta.column_names:  # Verify variable exists in dataset
-                    elements = {
-                        "@id": f"#variableValueComponent-{variable}",
-                        "@type": "VariableValueComponent",
-                        "isDefinedBy_RepresentedVariable": f"#instanceVariable-{variable}"
-                    }
-                    json_ld_data.append(elements)
-    return json_ld_data
+        return _generate_role_components(df_meta, ROLE_VARIABLE_VALUE, "VariableValueComponent", role_index)
+    return []
 
-def generate_VariableDescriptorComponent(df_meta):
+def generate_VariableDescriptorComponent(df_meta, role_index=None):
     """Generate VariableDescriptorComponent entries for JSON files only"""
     json_ld_data = []
     # Only generate for JSON files (KeyValueDataStore)
     if hasattr(df_meta, 'file_format') and df_meta.file_format == 'json':
-        if hasattr(df_meta, 'variable_value_vars') and df_meta.variable_value_vars:
-            for variable in df_meta.variable_value_vars:
-                if variable in df_meta.column_names:  # Verify variable exists in dataset
-                    elements = {
-                        "@id": f"#variableDescriptorComponent-{variable}",
-                        "@type": "VariableDescriptorComponent",
-                        "refersTo": f"#variableValueComponent-{variable}",
-                        "isDefinedBy_RepresentedVariable": f"#instanceVariable-{variable}"
-                    }
-                    json_ld_data.append(elements)
+        role_index = _get_role_index(df_meta, role_index)
+        for variable in role_index.variables[ROLE_VARIABLE_VALUE]:
+            elements = {
+                "@id": f"#variableDescriptorComponent-{iri_segment(variable)}",
+                "@type": "VariableDescriptorComponent",
+                "refersTo": f"#variableValueComponent-{iri_segment(variable)}",
+                "isDefinedBy_RepresentedVariable": f"#instanceVariable-{iri_segment(variable)}"
+            }
+            json_ld_data.append(elements)
     return json_ld_data
 
-def generate_ComponentPosition(df_meta):
+def generate_ComponentPosition(df_meta, role_index=None):
     """Generate ComponentPosition entries for all components in the data structure"""
+    role_index = _get_role_index(df_meta, role_index)
     json_ld_data = []
     
-    # Check if this is a JSON file to use different component logic
-    is_json_file = hasattr(df_meta, 'file_format') and df_meta.file_format == 'json'
-    
     # Build list of all components with their positions (0-based indexing)
     position = 0
     
     # Process all variables in the order they appear in column_names
     for variable in df_meta.column_names:
-        component_references = []
-        
-        # Collect all component types this variable belongs to
-        if hasattr(df_meta, 'identifier_vars') and df_meta.identifier_vars and variable in df_meta.identifier_vars:
-            component_references.append(f"#identifierComponent-{variable}")
-        
-        if hasattr(df_meta, 'attribute_vars') and df_meta.attribute_vars and variable in df_meta.attribute_vars:
-            component_references.append(f"#attributeComponent-{variable}")
-        
-        if not is_json_file:
-            # Non-JSON specific components
-            if hasattr(df_meta, 'measure_vars') and df_meta.measure_vars and variable in df_meta.measure_vars:
-                component_references.append(f"#measureComponent-{variable}")
-        else:
-            # JSON-specific components
-            if hasattr(df_meta, 'contextual_vars') and df_meta.contextual_vars and variable in df_meta.contextual_vars:
-                component_references.append(f"#contextualComponent-{variable}")
-            
-            if hasattr(df_meta, 'synthetic_id_vars') and df_meta.synthetic_id_vars and variable in df_meta.synthetic_id_vars:
-                component_references.append(f"#syntheticIdComponent-{variable}")
-            
-            if hasattr(df_meta, 'variable_value_vars') and df_meta.variable_value_vars and variable in df_meta.variable_value_vars:
-                component_references.append(f"#variableValueComponent-{variable}")
-                # Also add the corresponding VariableDescriptorComponent
-                component_references.append(f"#variableDescriptorComponent-{variable}")
-        
         # Create ComponentPosition for each component reference
-        for component_ref in component_references:
+        for component_ref in role_index.component_references(variable):
             elements = {
                 "@id": f"#componentPosition-{position}",
                 "@type": "ComponentPosition",
@@ -432,55 +584,47 @@ def generate_ComponentPosition(df_meta):
     return json_ld_data
 
 
-def generate_PrimaryKey(df_meta):
+def generate_PrimaryKey(df_meta, role_index=None):
+    role_index = _get_role_index(df_meta, role_index)
     json_ld_data = []
-    if hasattr(df_meta, 'identifier_vars') and df_meta.identifier_vars:
+    if role_index.declared[ROLE_IDENTIFIER]:
         elements = {
             "@id": "#primaryKey",
             "@type": "PrimaryKey",
-            "isComposedOf": [f"#primaryKeyComponent-{var}" for var in df_meta.identifier_vars if var in df_meta.column_names]
+            "isComposedOf": [f"#primaryKeyComponent-{iri_segment(var)}" for var in role_index.variables[ROLE_IDENTIFIER]]
         }
         json_ld_data.append(elements)
     return json_ld_data
 
-def generate_PrimaryKeyComponent(df_meta):
+def generate_PrimaryKeyComponent(df_meta, role_index=None):
+    role_index = _get_role_index(df_meta, role_index)
     json_ld_data = []
-    if hasattr(df_meta, 'identifier_vars') and df_meta.identifier_vars:
-        for variable in df_meta.identifier_vars:
-            if variable in df_meta.column_names:  # Verify variable exists in dataset
-                elements = {
-                    "@id": f"#primaryKeyComponent-{variable}",
-                    "@type": "PrimaryKeyComponent",
-                    "correspondsTo_DataStructureComponent": f"#identifierComponent-{variable}"
-                }
-                json_ld_data.append(elements)
+    for variable in role_index.variables[ROLE_IDENTIFIER]:
+        elements = {
+            "@id": f"#primaryKeyComponent-{iri_segment(variable)}",
+            "@type": "PrimaryKeyComponent",
+            "correspondsTo_DataStructureComponent": f"#identifierComponent-{iri_segment(variable)}"
+        }
+        json_ld_data.append(elements)
     return json_ld_data
 
-def generate_InstanceVariable(df_meta, include_value_mapping=True):
+def generate_InstanceVariable(df_meta, include_value_mapping=True, schema_plan=None):
+    schema_plan = _get_schema_plan(df_meta, schema_plan)
     json_ld_data = []
-    for idx, variable in enumerate(df_meta.column_names):
-        # Handle both list and dictionary cases for column_labels
-        label = (df_meta.column_labels[idx]
-                if isinstance(df_meta.column_labels, list)
-                else df_meta.column_labels.get(variable, variable))
-
-        # Handle both list and dictionary cases for original_variable_types
-        data_type = (df_meta.original_variable_types[idx]
-                    if isinstance(df_meta.original_variable_types, list)
-                    else df_meta.original_variable_types.get(variable, "string"))
-
+    for record in schema_plan.columns:
+        variable = record.name
         elements = {
-            "@id": f"#instanceVariable-{variable}",
+            "@id": f"#instanceVariable-{iri_segment(variable)}",
             "@type": "InstanceVariable",
             "physicalDataType": {
                 "@type": "ControlledVocabularyEntry",
-                "entryValue": str(data_type)
+                "entryValue": record.physical_data_type
             },
             "displayLabel": {
                 "@type": "LabelForDisplay",
                 "locationVariant": {
                     "@type": "ControlledVocabularyEntry",
-                    "entryValue": label
+                    "entryValue": record.label
                 }
             },
             "name": {
@@ -488,393 +632,455 @@ def generate_InstanceVariable(df_meta, include_value_mapping=True):
                 "name": variable
             },
             "has_PhysicalSegmentLayout": "#physicalSegmentLayout",
-            "takesSubstantiveValuesFrom_SubstantiveValueDomain": f"#substantiveValueDomain-{variable}"
+            "takesSubstantiveValuesFrom_SubstantiveValueDomain": f"#substantiveValueDomain-{iri_segment(variable)}"
         }
 
         # Only include has_ValueMapping if include_value_mapping is True
         if include_value_mapping:
-            elements["has_ValueMapping"] = f"#valueMapping-{variable}"
+            elements["has_ValueMapping"] = f"#valueMapping-{iri_segment(variable)}"
 
         # Add sentinel value domain reference if the variable has missing values
-        if (variable in df_meta.missing_ranges) or (
-                len(df_meta.missing_ranges) == 0 and variable in df_meta.missing_user_values):
+        if record.has_sentinel_values:
             # changed from takesSentinelValuesFrom_SentinelValueDomain to takesSentinelValuesFrom   
-            elements["takesSentinelValuesFrom"] = f"#sentinelValueDomain-{variable}"
+            elements["takesSentinelValuesFrom"] = f"#sentinelValueDomain-{iri_segment(variable)}"
 
         json_ld_data.append(elements)
     return json_ld_data
 
-def generate_SubstantiveConceptScheme(df_meta):
+def generate_SubstantiveConceptScheme(df_meta, schema_plan=None):
+    schema_plan = _get_schema_plan(df_meta, schema_plan)
     json_ld_data = []
 
-    # Determine the relevant variables based on the presence of missing values
-    relevant_variables = df_meta.missing_ranges if len(df_meta.missing_ranges) > 0 else df_meta.missing_user_values
+    for record in schema_plan.labelled_variables:
+        # Only add concept schemes with at least one top concept
+        if record.top_concept_values:
+            elements = {
+                "@id": f"#substantiveConceptScheme-{iri_segment(record.name)}",
+                "@type": "skos:ConceptScheme",
+                "skos:hasTopConcept": [f"#{iri_segment(record.name)}-concept-{iri_segment(value)}" for value in record.top_concept_values]
+            }
+            json_ld_data.append(elements)
 
-    for variable_name, values_dict in df_meta.variable_value_labels.items():
-        elements = {
-            "@id": f"#substantiveConceptScheme-{variable_name}",
-            "@type": "skos:ConceptScheme",
-        }
+    return json_ld_data
 
-        excluded_values = set()
-
-        # Check if variable_name is in relevant_variables
-        if variable_name in relevant_variables:
-
-            # If the relevant variable data is based on ranges and contains dictionaries
-            if isinstance(relevant_variables[variable_name], list) and all(
-                    isinstance(item, dict) for item in relevant_variables[variable_name]):
-                for dict_range in relevant_variables[variable_name]:
-                    lo_is_numeric = isinstance(dict_range['lo'], (int, float)) or (
-                            isinstance(dict_range['lo'], str) and dict_range['lo'].isnumeric()
-                    )
-                    hi_is_numeric = isinstance(dict_range['hi'], (int, float)) or (
-                            isinstance(dict_range['hi'], str) and dict_range['hi'].isnumeric()
-                    )
-
-                    if lo_is_numeric and hi_is_numeric:
-                        lo_val = float(dict_range['lo'])
-                        hi_val = float(dict_range['hi'])
-
-                        # Handle infinity case - just add the lo value if hi is infinity
-                        if math.isinf(hi_val):
-                            if not math.isinf(lo_val):
-                                excluded_values.add(int(lo_val))
-                        elif not math.isinf(lo_val):
-                            # Normal range case
-                            excluded_values.update(
-                                range(int(lo_val), int(hi_val) + 1))
-                    elif isinstance(dict_range['lo'], str):
-                        excluded_values.add(dict_range['lo'])
-                    else:
-                        print(f"Warning: Unsupported 'lo' value: {dict_range['lo']}")
-
-            # If the relevant variable data contains strings (user-defined missing values)
-            elif isinstance(relevant_variables[variable_name], list):
-                excluded_values.update(set(map(str, relevant_variables[variable_name])))
-
-        # Use list comprehension to generate the hasTopConcept list
-        excluded_values_str = {str(i) for i in excluded_values}
-        has_top_concept = [
-            f"#{variable_name}-concept-{value}"
-            for value in values_dict.keys()
-            if (not value in excluded_values) and (not str(value) in excluded_values_str)
-        ]
+def _row_range(df, start=0, stop=None):
+    """Clip a requested row range to the rows available in df"""
+    stop = len(df) if stop is None else min(stop, len(df))
+    start = max(0, min(start, stop))
+    return start, stop
 
-        # Only add to json_ld_data if has_top_concept list is not empty
-        if has_top_concept:
-            elements['skos:hasTopConcept'] = has_top_concept
-            json_ld_data.append(elements)
+def _rows_to_process(df, process_all_rows, chunk_size):
+    """Number of leading rows the list generators cover"""
+    if process_all_rows:
+        return len(df)
+    return min(len(df), chunk_size)
+
+def _batched(items, batch_size=None):
+    """Group items into lists of at most batch_size; pass them through when batch_size is None"""
+    if not batch_size:
+        yield from items
+        return
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def iter_ValueMapping(df, df_meta, start=0, stop=None, batch_size=None):
+    """
+    Lazily generate ValueMapping objects, one per variable, whose formats
+    reference the DataPoints of rows start..stop-1.
+    With batch_size set, lists of up to batch_size elements are yielded instead.
+    """
+    start, stop = _row_range(df, start, stop)
 
-    return json_ld_data
+    def elements():
+        for variable in df_meta.column_names:
+            segment = iri_segment(variable)
+            yield {
+                "@id": f"#valueMapping-{segment}",
+                "@type": "ValueMapping",
+                "defaultValue": "",
+                "formats": [f"#dataPoint-{i}-{segment}" for i in range(start, stop)]
+            }
+
+    return _batched(elements(), batch_size)
 
 def generate_ValueMapping(df, df_meta, process_all_rows=False, chunk_size=5):
     """
     Generate ValueMapping objects for the dataset.
     Optimized for performance with large datasets.
     """
-    # Determine how many rows to process
-    if process_all_rows:
-        max_rows = len(df)
-    else:
-        max_rows = min(len(df), chunk_size)
-    
-    # Only generate format lists if we have rows to process
-    if len(df) == 0:
-        # Shortcut for empty dataframes
-        return [
-            {
-                "@id": f"#valueMapping-{variable}",
-                "@type": "ValueMapping",
-                "defaultValue": "",
-                "formats": []
-            }
-            for variable in df_meta.column_names
-        ]
-    
-    # For better performance with large datasets, we'll generate
-    # the format lists separately for each variable
-    result = []
-    for variable in df_meta.column_names:
-        # Create format list using range and format strings - much faster than list comprehension
-        # for very large datasets
-        datapoint_template = f"#dataPoint-{{0}}-{variable}"
-        formats = [datapoint_template.format(i) for i in range(max_rows)]
-        
-        element = {
-            "@id": f"#valueMapping-{variable}",
-            "@type": "ValueMapping",
-            "defaultValue": "",
-            "formats": formats
-        }
-        result.append(element)
-    
-    return result
+    max_rows = _rows_to_process(df, process_all_rows, chunk_size)
+    return list(iter_ValueMapping(df, df_meta, 0, max_rows))
 
 def generate_ValueMappingPosition(df_meta):
     json_ld_data = []
     for idx, variable in enumerate(df_meta.column_names):
         elements = {
-            "@id": f"#valueMappingPosition-{variable}",
+            "@id": f"#valueMappingPosition-{iri_segment(variable)}",
             "@type": "ValueMappingPosition",
             "value": idx,
-            "indexes": f"#valueMapping-{variable}"
+            "indexes": f"#valueMapping-{iri_segment(variable)}"
         }
         json_ld_data.append(elements)
     return json_ld_data
 
+def iter_DataPoint(df, df_meta, start=0, stop=None, batch_size=None):
+    """
+    Lazily generate DataPoint objects for rows start..stop-1, variable by variable.
+    With batch_size set, lists of up to batch_size elements are yielded instead.
+    """
+    start, stop = _row_range(df, start, stop)
+    dataset_reference = _get_dataset_reference(df_meta)
+
+    def elements():
+        for variable in df_meta.column_names:
+            yield from _variable_DataPoints(variable, start, stop, dataset_reference)
+
+    return _batched(elements(), batch_size)
+
+def _variable_DataPoints(variable, start, stop, dataset_reference):
+    segment = iri_segment(variable)
+    variable_reference = f"#instanceVariable-{segment}"
+    for idx in range(start, stop):
+        yield {
+            "@id": f"#dataPoint-{idx}-{segment}",
+            "@type": "DataPoint",
+            "isDescribedBy": variable_reference,
+            "has_DataPoint_OF_DataSet": dataset_reference
+        }
+
 def generate_DataPoint(df, df_meta, process_all_rows=False, chunk_size=5):
     """
     Generate DataPoint objects for the dataset.
     Optimized for performance with large datasets.
     """
-    # Determine how many rows to process
-    if process_all_rows:
-        max_rows = len(df)
-    else:
-        max_rows = min(len(df), chunk_size)
-    
-    # Using a list comprehension to generate all data points at once is more efficient
-    # Pre-calculate the common values
-    datapoint_type = "DataPoint"
-    dataset_reference = _get_dataset_reference(df_meta)
-    
-    result = []
-    # Generate data points in a single operation to avoid repeated function calls
-    for variable in df_meta.column_names:
-        variable_reference = f"#instanceVariable-{variable}"
-        
-        # Generate all data points for this variable in one go
-        variable_datapoints = [
-            {
-                "@id": f"#dataPoint-{idx}-{variable}",
-                "@type": datapoint_type,
-                "isDescribedBy": variable_reference,
-                "has_DataPoint_OF_DataSet": dataset_reference
-            }
-            for idx in range(max_rows)
-        ]
-        result.extend(variable_datapoints)
-    
-    return result
+    max_rows = _rows_to_process(df, process_all_rows, chunk_size)
+    return list(iter_DataPoint(df, df_meta, 0, max_rows))
+
+def iter_DataPointPosition(df, df_meta, start=0, stop=None, batch_size=None):
+    """
+    Lazily generate DataPointPosition objects for rows start..stop-1, variable by variable.
+    With batch_size set, lists of up to batch_size elements are yielded instead.
+    """
+    start, stop = _row_range(df, start, stop)
+
+    def elements():
+        for variable in df_meta.column_names:
+            yield from _variable_DataPointPositions(variable, start, stop)
+
+    return _batched(elements(), batch_size)
+
+def _variable_DataPointPositions(variable, start, stop):
+    segment = iri_segment(variable)
+    for idx in range(start, stop):
+        yield {
+            "@id": f"#dataPointPosition-{idx}-{segment}",
+            "@type": "DataPointPosition",
+            "value": idx,
+            "indexes": f"#dataPoint-{idx}-{segment}"
+        }
 
 def generate_DataPointPosition(df, df_meta, process_all_rows=False, chunk_size=5):
     """
     Generate DataPointPosition objects for the dataset.
     Optimized for performance with large datasets.
     """
-    # Determine how many rows to process
-    if process_all_rows:
-        max_rows = len(df)
+    max_rows = _rows_to_process(df, process_all_rows, chunk_size)
+    return list(iter_DataPointPosition(df, df_meta, 0, max_rows))
+
+def _content_converter(column):
+    """
+    Compile a column into a function that converts a row slice of it to its
+    InstanceValue content strings, matching column.astype(str). The dtype is
+    inspected once per column; each call only slices the underlying array, so
+    no part of the column is copied before it is converted. Plain integer and
+    float64 columns are converted by NumPy instead of calling str() per value.
+    """
+    dtype = column.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        convert = lambda rows: column.iloc[rows].astype(str).to_numpy(dtype=object)
+    elif isinstance(dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_integer_dtype(dtype):
+        # Nullable Int64 and friends: slicing the extension array is a view
+        array = column.array
+
+        def convert(rows):
+            part = array[rows]
+            # Convert the data, then mark the NA slots
+            contents = part.to_numpy(dtype='int64', na_value=0).astype(str).astype(object)
+            contents[part.isna()] = str(pd.NA)
+            return contents
+    elif pd.api.types.is_integer_dtype(dtype) or dtype == np.float64:
+        values = column.to_numpy()
+        convert = lambda rows: values[rows].astype(str).astype(object)
     else:
-        max_rows = min(len(df), chunk_size)
-    
-    # Pre-calculate constants to avoid repetitive string operations
-    datapoint_position_type = "DataPointPosition"
-    result = []
-    
-    # Generate all positions in batches by variable to improve memory locality
-    for variable in df_meta.column_names:
-        # Pre-calculate the datapoint prefix
-        datapoint_prefix = f"#dataPoint-{{}}-{variable}"
-        
-        # Generate all positions for this variable in one operation
-        variable_positions = [
-            {
-                "@id": f"#dataPointPosition-{idx}-{variable}", 
-                "@type": datapoint_position_type,
-                "value": idx,
-                "indexes": datapoint_prefix.format(idx)
-            }
-            for idx in range(max_rows)
-        ]
-        result.extend(variable_positions)
-    
-    return result
+        convert = lambda rows: column.iloc[rows].astype(str).to_numpy(dtype=object)
+
+    def converter(rows):
+        try:
+            return convert(rows)
+        except Exception:
+            # Fallback for columns that can't be bulk converted
+            return np.array([str(val) for val in column.iloc[rows]], dtype=object)
+
+    return converter
+
+def _is_number(value):
+    return isinstance(value, (int, float, np.number)) and not isinstance(value, (bool, np.bool_))
+
+class _SentinelCodes:
+    """
+    The missing value codes of one variable, sorted into numeric ranges,
+    discrete numeric codes, string ranges and discrete string codes.
+    Accepts missing_ranges entries ({'lo': ..., 'hi': ...}) as well as
+    missing_user_values entries (plain codes).
+    """
+    def __init__(self, missing_values):
+        numeric_ranges, numeric_codes, string_ranges, string_codes = [], [], [], []
+        for item in missing_values or []:
+            if isinstance(item, dict):
+                lo, hi = item['lo'], item['hi']
+                if _is_number(lo) and _is_number(hi):
+                    if lo == hi:
+                        numeric_codes.append(lo)
+                    else:
+                        numeric_ranges.append((lo, hi))
+                elif isinstance(lo, str) and isinstance(hi, str):
+                    if lo == hi:
+                        string_codes.append(lo)
+                    else:
+                        string_ranges.append((lo, hi))
+            elif _is_number(item):
+                numeric_codes.append(item)
+            elif isinstance(item, str):
+                string_codes.append(item)
+        self.numeric_ranges = [(float(lo), float(hi)) for lo, hi in numeric_ranges]
+        self.numeric_codes = np.array(numeric_codes, dtype=float)
+        self.string_ranges = string_ranges
+        self.string_codes = string_codes
+
+    def __bool__(self):
+        return bool(self.numeric_ranges or len(self.numeric_codes) or self.string_ranges or self.string_codes)
+
+def _sentinel_codes_by_variable(df_meta):
+    """
+    _SentinelCodes of the variables with missing values. Like the sentinel value
+    domains, these come from missing_ranges, or from missing_user_values when
+    the dataset has no missing ranges.
+    """
+    missing_ranges = df_meta.missing_ranges
+    relevant_variables = missing_ranges if len(missing_ranges) > 0 else getattr(df_meta, 'missing_user_values', {})
+    codes_by_variable = {}
+    for variable, missing_values in relevant_variables.items():
+        codes = _SentinelCodes(missing_values)
+        if codes:
+            codes_by_variable[variable] = codes
+    return codes_by_variable
+
+def _classify_sentinels(column, codes):
+    """
+    Boolean array marking the values of a column that are missing values:
+    within a numeric range, equal to a numeric code, or, for string values,
+    equal to a string code or within a string range.
+    """
+    is_missing = np.zeros(len(column), dtype=bool)
+    if codes.numeric_ranges or len(codes.numeric_codes):
+        # Non-numeric values become NaN, which compares False
+        numeric_values = pd.to_numeric(column, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        for lo, hi in codes.numeric_ranges:
+            is_missing |= (numeric_values >= lo) & (numeric_values <= hi)
+        if len(codes.numeric_codes):
+            is_missing |= np.isin(numeric_values, codes.numeric_codes)
+    if codes.string_ranges or codes.string_codes:
+        string_values = column.astype('string')
+        if codes.string_codes:
+            is_missing |= string_values.isin(codes.string_codes).to_numpy(dtype=bool)
+        for lo, hi in codes.string_ranges:
+            in_range = (string_values >= lo) & (string_values <= hi)
+            is_missing |= in_range.to_numpy(dtype=bool, na_value=False)
+    return is_missing
+
+class _InstanceValueFrame:
+    """
+    Columnar InstanceValue engine.
+
+    The columns of df are prepared once per conversion: content converters are
+    compiled and missing values classified over the whole column. Row ranges
+    are then served from slices of the prepared arrays, so a chunk costs no
+    copy of the frame and no repeated type inspection or numeric coercion.
+    first_row is the row number of the first row of df.
+    """
+    def __init__(self, df, df_meta, first_row=0):
+        self.column_names = df_meta.column_names
+        self.n_rows = len(df)
+        self.first_row = first_row
+        self.converters = {}
+        self.sentinel_masks = {}
+        if self.n_rows == 0:
+            # Metadata-only conversions have no rows, skip the per-column work
+            return
+        sentinel_codes = _sentinel_codes_by_variable(df_meta)
+        for variable in self.column_names:
+            column = df[variable]
+            self.converters[variable] = _content_converter(column)
+            if variable in sentinel_codes:
+                # One byte per row, instead of coercing the column again for every chunk
+                self.sentinel_masks[variable] = _classify_sentinels(column, sentinel_codes[variable])
+
+    def columns(self, start=0, stop=None):
+        """
+        For each variable, yield (ids, contents, stored_in, domains): the four
+        per-cell strings of the InstanceValues of rows start..stop-1 of the
+        frame, each computed as a whole-column operation on object arrays.
+        """
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        rows = slice(start, stop)
+        first = self.first_row + start
+        row_labels = np.arange(first, first + stop - start).astype(str).astype(object)
+        id_prefixes = "#instanceValue-" + row_labels + "-"
+        stored_in_prefixes = "#dataPoint-" + row_labels + "-"
+
+        for variable in self.column_names:
+            contents = self.converters[variable](rows)
+            segment = iri_segment(variable)
+
+            # Value domain reference per cell; the two strings are shared, not copied
+            domains = np.full(len(contents), f"#substantiveValueDomain-{segment}", dtype=object)
+            if variable in self.sentinel_masks:
+                domains[self.sentinel_masks[variable][rows]] = f"#sentinelValueDomain-{segment}"
+
+            yield id_prefixes + segment, contents, stored_in_prefixes + segment, domains
+
+    def elements(self, start=0, stop=None):
+        """InstanceValue objects of rows start..stop-1 of the frame"""
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        if stop <= start:
+            return
+        for ids, contents, stored_in, domains in self.columns(start, stop):
+            for id_, content, stored, domain in zip(ids.tolist(), contents.tolist(), stored_in.tolist(), domains.tolist()):
+                yield {
+                    "@id": id_,
+                    "@type": "InstanceValue",
+                    "content": {
+                        "@type": "TypedString",
+                        "content": content
+                    },
+                    "isStoredIn": stored,
+                    "hasValueFrom_ValueDomain": domain
+                }
+
+    def encoded(self, start, stop, indent, level):
+        """
+        The InstanceValues of rows start..stop-1 as consecutive JSON array
+        elements at depth level: the text of elements(start, stop), rendered
+        column by column from one _ElementTemplate instead of per-cell dicts.
+        """
+        stop = min(stop, self.n_rows)
+        if stop <= start:
+            return ''
+        template = _ElementTemplate({
+            "@id": _template_value(0),
+            "@type": "InstanceValue",
+            "content": {
+                "@type": "TypedString",
+                "content": _template_value(1)
+            },
+            "isStoredIn": _template_value(2),
+            "hasValueFrom_ValueDomain": _template_value(3)
+        }, indent, level)
+        return template.separator.join(
+            template.render(*map(_json_strings, column)) for column in self.columns(start, stop)
+        )
+
+    def encoded_chunks(self, chunk_size, indent, level):
+        """The InstanceValues of all rows, encoded chunk by chunk as _EncodedItems"""
+        for chunk_start in range(0, self.n_rows, chunk_size):
+            yield _EncodedItems(self.encoded(chunk_start, chunk_start + chunk_size, indent, level))
+
+def iter_InstanceValue(df, df_meta, start=0, stop=None, batch_size=None):
+    """
+    Lazily generate InstanceValue objects for rows start..stop-1, variable by variable.
+    Values are computed column-wise by the columnar engine, one column of the
+    row range at a time. With batch_size set, lists of up to batch_size
+    elements are yielded instead.
+    """
+    start, stop = _row_range(df, start, stop)
+    # Positional row slices are views, the range is not copied
+    frame = _InstanceValueFrame(df.iloc[start:stop], df_meta, first_row=start)
+    return _batched(frame.elements(), batch_size)
 
 def generate_InstanceValue(df, df_meta, process_all_rows=False, chunk_size=5):
     """
     Generate InstanceValue objects for the dataset.
     Optimized for performance with large datasets.
     """
-    json_ld_data = []
+    max_rows = _rows_to_process(df, process_all_rows, chunk_size)
+    return list(iter_InstanceValue(df, df_meta, 0, max_rows))
+
+# Original data type names to XSD data types, see map_to_xsd_type
+_XSD_TYPE_MAPPING = {
+    # Numeric types
+    'int8': 'https://www.w3.org/TR/xmlschema-2/#byte',
+    'int16': 'https://www.w3.org/TR/xmlschema-2/#short',
+    'int32': 'https://www.w3.org/TR/xmlschema-2/#int',
+    'int64': 'https://www.w3.org/TR/xmlschema-2/#long',
+    'int': 'https://www.w3.org/TR/xmlschema-2/#int',
+    'integer': 'https://www.w3.org/TR/xmlschema-2/#integer',
+    'uint8': 'https://www.w3.org/TR/xmlschema-2/#unsignedByte',
+    'uint16': 'https://www.w3.org/TR/xmlschema-2/#unsignedShort',
+    'uint32': 'https://www.w3.org/TR/xmlschema-2/#unsignedInt',
+    'uint64': 'https://www.w3.org/TR/xmlschema-2/#unsignedLong',
+    'float': 'https://www.w3.org/TR/xmlschema-2/#float',
+    'float32': 'https://www.w3.org/TR/xmlschema-2/#float',
+    'float64': 'https://www.w3.org/TR/xmlschema-2/#double',
+    'double': 'https://www.w3.org/TR/xmlschema-2/#double',
+    'decimal': 'https://www.w3.org/TR/xmlschema-2/#decimal',
+    'numeric': 'https://www.w3.org/TR/xmlschema-2/#decimal',
+    'number': 'https://www.w3.org/TR/xmlschema-2/#decimal',
+    'complex': 'https://www.w3.org/TR/xmlschema-2/#string',
     
-    # Determine how many rows to process
-    if process_all_rows:
-        max_rows = len(df)
-    else:
-        max_rows = min(len(df), chunk_size)
+    # String types
+    'string': 'https://www.w3.org/TR/xmlschema-2/#string',
+    'str': 'https://www.w3.org/TR/xmlschema-2/#string',
+    'object': 'https://www.w3.org/TR/xmlschema-2/#string',
+    'text': 'https://www.w3.org/TR/xmlschema-2/#string',
+    'varchar': 'https://www.w3.org/TR/xmlschema-2/#string',
+    'character': 'https://www.w3.org/TR/xmlschema-2/#string',
+    'char': 'https://www.w3.org/TR/xmlschema-2/#string',
     
-    # If df has more than max_rows and we're not processing all rows, take a sample
-    if len(df) > max_rows and not process_all_rows:
-        df_sample = df.head(max_rows)
-    else:
-        df_sample = df.iloc[:max_rows]
+    # Date/Time types
+    'datetime': 'https://www.w3.org/TR/xmlschema-2/#dateTime',
+    'datetime64': 'https://www.w3.org/TR/xmlschema-2/#dateTime',
+    'datetime64[ns]': 'https://www.w3.org/TR/xmlschema-2/#dateTime',
+    'timestamp': 'https://www.w3.org/TR/xmlschema-2/#dateTime',
+    'date': 'https://www.w3.org/TR/xmlschema-2/#date',
+    'time': 'https://www.w3.org/TR/xmlschema-2/#time',
+    'timedelta': 'https://www.w3.org/TR/xmlschema-2/#duration',
+    'duration': 'https://www.w3.org/TR/xmlschema-2/#duration',
     
-    # Pre-compute value domain references for each variable (do this once)
-    value_domain_refs = {}
-    for variable in df_meta.column_names:
-        if variable in df_meta.missing_ranges:
-            value_domain_refs[variable] = {
-                'has_missing': True,
-                'ranges': df_meta.missing_ranges[variable],
-                'numeric_ranges': [r for r in df_meta.missing_ranges[variable] if isinstance(r['lo'], float)]
-            }
-        else:
-            value_domain_refs[variable] = {
-                'has_missing': False
-            }
+    # Boolean
+    'bool': 'https://www.w3.org/TR/xmlschema-2/#boolean',
+    'boolean': 'https://www.w3.org/TR/xmlschema-2/#boolean',
     
-    # Create a template element to avoid recreating common parts
-    template_element = {
-        "@type": "InstanceValue",
-        "content": {
-            "@type": "TypedString"
-        }
-    }
-    
-    # Process each variable once - this is much more efficient
-    for variable in df_meta.column_names:
-        # Get variable-specific information
-        var_info = value_domain_refs[variable]
-        has_missing_ranges = var_info['has_missing']
-        
-        # Convert column to strings in one operation if possible
-        try:
-            # Using pandas vectorized operations when possible
-            content_values = df_sample[variable].astype(str).tolist()
-        except:
-            # Fallback for columns that can't be bulk converted
-            content_values = [str(val) for val in df_sample[variable]]
-        
-        # Pre-calculate missing value domains to avoid repeated checks
-        value_domains = []
-        if has_missing_ranges and var_info.get('numeric_ranges'):
-            numeric_ranges = var_info['numeric_ranges']
-            
-            # For numeric columns, try to use vectorized operations
-            try:
-                # Convert to numeric for comparison (will set non-numerics to NaN)
-                numeric_values = pd.to_numeric(df_sample[variable], errors='coerce')
-                
-                # Initialize all as substantive domains
-                is_missing = pd.Series([False] * len(df_sample), index=df_sample.index)
-                
-                # Check each range
-                for range_dict in numeric_ranges:
-                    # Combine conditions across all ranges
-                    range_condition = (numeric_values >= range_dict['lo']) & (numeric_values <= range_dict['hi'])
-                    is_missing = is_missing | range_condition
-                
-                # Create value domains list based on the result
-                value_domains = [
-                    f"#sentinelValueDomain-{variable}" if is_missing[i] 
-                    else f"#substantiveValueDomain-{variable}"
-                    for i in range(len(df_sample))
-                ]
-            except:
-                # Fallback to non-vectorized approach for complex cases
-                value_domains = []
-                for value in df_sample[variable]:
-                    in_missing_range = False
-                    if value is not None:
-                        for range_dict in numeric_ranges:
-                            try:
-                                value_float = float(value)
-                                if range_dict['lo'] <= value_float <= range_dict['hi']:
-                                    in_missing_range = True
-                                    break
-                            except (ValueError, TypeError):
-                                pass
-                    
-                    if in_missing_range:
-                        value_domains.append(f"#sentinelValueDomain-{variable}")
-                    else:
-                        value_domains.append(f"#substantiveValueDomain-{variable}")
-        else:
-            # If no missing ranges, all values use substantive domain
-            value_domains = [f"#substantiveValueDomain-{variable}"] * len(df_sample)
-        
-        # Now build all elements for this variable at once
-        variable_elements = []
-        for idx in range(len(df_sample)):
-            # Create element using the template to avoid recreation
-            element = {
-                "@id": f"#instanceValue-{idx}-{variable}",
-                "@type": template_element["@type"],
-                "content": {
-                    "@type": template_element["content"]["@type"],
-                    "content": content_values[idx]
-                },
-                "isStoredIn": f"#dataPoint-{idx}-{variable}",
-                "hasValueFrom_ValueDomain": value_domains[idx]
-            }
-            variable_elements.append(element)
-        
-        # Add all elements for this variable at once
-        json_ld_data.extend(variable_elements)
+    # Other specialized types
+    'category': 'https://www.w3.org/TR/xmlschema-2/#string',
+    'factor': 'https://www.w3.org/TR/xmlschema-2/#string',
+    'array': 'https://www.w3.org/TR/xmlschema-2/#string',
+    'list': 'https://www.w3.org/TR/xmlschema-2/#string',
     
-    return json_ld_data
+    # Default fallback
+    'unknown': 'https://www.w3.org/TR/xmlschema-2/#string'
+}
 
 def map_to_xsd_type(original_type):
     """Map original data types to XSD data types with full URLs"""
     # Convert original_type to lowercase string for comparison
     type_str = str(original_type).lower()
     
-    type_mapping = {
-        # Numeric types
-        'int8': 'https://www.w3.org/TR/xmlschema-2/#byte',
-        'int16': 'https://www.w3.org/TR/xmlschema-2/#short',
-        'int32': 'https://www.w3.org/TR/xmlschema-2/#int',
-        'int64': 'https://www.w3.org/TR/xmlschema-2/#long',
-        'int': 'https://www.w3.org/TR/xmlschema-2/#int',
-        'integer': 'https://www.w3.org/TR/xmlschema-2/#integer',
-        'uint8': 'https://www.w3.org/TR/xmlschema-2/#unsignedByte',
-        'uint16': 'https://www.w3.org/TR/xmlschema-2/#unsignedShort',
-        'uint32': 'https://www.w3.org/TR/xmlschema-2/#unsignedInt',
-        'uint64': 'https://www.w3.org/TR/xmlschema-2/#unsignedLong',
-        'float': 'https://www.w3.org/TR/xmlschema-2/#float',
-        'float32': 'https://www.w3.org/TR/xmlschema-2/#float',
-        'float64': 'https://www.w3.org/TR/xmlschema-2/#double',
-        'double': 'https://www.w3.org/TR/xmlschema-2/#double',
-        'decimal': 'https://www.w3.org/TR/xmlschema-2/#decimal',
-        'numeric': 'https://www.w3.org/TR/xmlschema-2/#decimal',
-        'number': 'https://www.w3.org/TR/xmlschema-2/#decimal',
-        'complex': 'https://www.w3.org/TR/xmlschema-2/#string',
-        
-        # String types
-        'string': 'https://www.w3.org/TR/xmlschema-2/#string',
-        'str': 'https://www.w3.org/TR/xmlschema-2/#string',
-        'object': 'https://www.w3.org/TR/xmlschema-2/#string',
-        'text': 'https://www.w3.org/TR/xmlschema-2/#string',
-        'varchar': 'https://www.w3.org/TR/xmlschema-2/#string',
-        'character': 'https://www.w3.org/TR/xmlschema-2/#string',
-        'char': 'https://www.w3.org/TR/xmlschema-2/#string',
-        
-        # Date/Time types
-        'datetime': 'https://www.w3.org/TR/xmlschema-2/#dateTime',
-        'datetime64': 'https://www.w3.org/TR/xmlschema-2/#dateTime',
-        'datetime64[ns]': 'https://www.w3.org/TR/xmlschema-2/#dateTime',
-        'timestamp': 'https://www.w3.org/TR/xmlschema-2/#dateTime',
-        'date': 'https://www.w3.org/TR/xmlschema-2/#date',
-        'time': 'https://www.w3.org/TR/xmlschema-2/#time',
-        'timedelta': 'https://www.w3.org/TR/xmlschema-2/#duration',
-        'duration': 'https://www.w3.org/TR/xmlschema-2/#duration',
-        
-        # Boolean
-        'bool': 'https://www.w3.org/TR/xmlschema-2/#boolean',
-        'boolean': 'https://www.w3.org/TR/xmlschema-2/#boolean',
-        
-        # Other specialized types
-        'category': 'https://www.w3.org/TR/xmlschema-2/#string',
-        'factor': 'https://www.w3.org/TR/xmlschema-2/#string',
-        'array': 'https://www.w3.org/TR/xmlschema-2/#string',
-        'list': 'https://www.w3.org/TR/xmlschema-2/#string',
-        
-        # Default fallback
-        'unknown': 'https://www.w3.org/TR/xmlschema-2/#string'
-    }
-    
     # Check for pandas-specific type strings
     if 'int' in type_str:
         return 'https://www.w3.org/TR/xmlschema-2/#int'
@@ -886,59 +1092,27 @@ def map_to_xsd_type(original_type):
         return 'https://www.w3.org/TR/xmlschema-2/#boolean'
     
     # Try direct mapping first
-    return type_mapping.get(type_str, 'https://www.w3.org/TR/xmlschema-2/#string')
+    return _XSD_TYPE_MAPPING.get(type_str, 'https://www.w3.org/TR/xmlschema-2/#string')
 
-def generate_SubstantiveValueDomain(df_meta):
+def generate_SubstantiveValueDomain(df_meta, schema_plan=None):
+    schema_plan = _get_schema_plan(df_meta, schema_plan)
     json_ld_data = []
-    for variable in df_meta.column_names:
-        # Get the original type and map it to XSD type
-        original_type = df_meta.readstat_variable_types[variable]
-        mapped_type = map_to_xsd_type(original_type)
-        
+    for record in schema_plan.columns:
+        variable = record.name
         elements = {
-            "@id": f"#substantiveValueDomain-{variable}",
+            "@id": f"#substantiveValueDomain-{iri_segment(variable)}",
             "@type": "SubstantiveValueDomain",
             "recommendedDataType": {
                 "@type": "ControlledVocabularyEntry",
-                "entryValue": mapped_type
+                "entryValue": record.xsd_type
             },
-            "isDescribedBy": f"#substantiveValueAndConceptDescription-{variable}"
+            "isDescribedBy": f"#substantiveValueAndConceptDescription-{iri_segment(variable)}"
         }
 
-        # Add reference to EnumerationDomain if variable has value labels
-        # and if at least one value label will be included (not all excluded as missing)
-        if variable in df_meta.variable_value_labels:
-            # Create a set to track excluded values (same logic as in generate_SubstantiveEnumerationDomain)
-            excluded_values = set()
-
-            # Check if there are missing values for this variable
-            if variable in df_meta.missing_ranges:
-                for dict_range in df_meta.missing_ranges[variable]:
-                    if isinstance(dict_range['lo'], float) and isinstance(dict_range['hi'], float):
-                        lo_val = float(dict_range['lo'])
-                        hi_val = float(dict_range['hi'])
-
-                        # Handle infinity case - just add the lo value if hi is infinity
-                        if math.isinf(hi_val):
-                            if not math.isinf(lo_val):
-                                excluded_values.add(int(lo_val))
-                        elif not math.isinf(lo_val):
-                            # Normal range case
-                            excluded_values.update(
-                                range(int(lo_val), int(hi_val) + 1))
-                    elif isinstance(dict_range['lo'], str):
-                        excluded_values.add(dict_range['lo'])
-
-            # Check if there will be any non-excluded values
-            excluded_values_str = {str(i) for i in excluded_values}
-            has_substantive_values = any(
-                (value not in excluded_values) and (str(value) not in excluded_values_str)
-                for value in df_meta.variable_value_labels[variable].keys()
-            )
-
-            # Only add takesValuesFrom if there are substantive values
-            if has_substantive_values:
-                elements["takesValuesFrom"] = f"#substantiveEnumerationDomain-{variable}"
+        # Add reference to EnumerationDomain if at least one value label
+        # will be included (not all excluded as missing)
+        if record.substantive_values:
+            elements["takesValuesFrom"] = f"#substantiveEnumerationDomain-{iri_segment(variable)}"
 
         json_ld_data.append(elements)
     return json_ld_data
@@ -952,40 +1126,30 @@ def get_classification_level(variable_type):
     else:
         return "Nominal"  # Default
 
-def generate_ValueAndConceptDescription(df_meta):
+def generate_ValueAndConceptDescription(df_meta, schema_plan=None):
+    schema_plan = _get_schema_plan(df_meta, schema_plan)
     json_ld_data = []
-    relevant_variables = df_meta.missing_ranges if df_meta.missing_ranges else df_meta.missing_user_values
 
-    class_level = {'nominal': 'Nominal', 'scale': 'Continuous', 'ordinal': 'Ordinal', 'unknown': 'Nominal'}
-    
     # Generate substantive descriptions for all variables
-    for variable in df_meta.column_names:
+    for record in schema_plan.columns:
         elements = {
-            "@id": f"#substantiveValueAndConceptDescription-{variable}",
+            "@id": f"#substantiveValueAndConceptDescription-{iri_segment(record.name)}",
             "@type": "ValueAndConceptDescription",
-            "classificationLevel": class_level[df_meta.variable_measure[variable]]
+            "classificationLevel": record.classification_level
         }
         json_ld_data.append(elements)
 
     # Generate sentinel descriptions for variables with missing values
-    for variable in relevant_variables:
-        values = relevant_variables[variable]
-        if isinstance(values[0], dict):
-            all_lo_values = [d['lo'] for d in values]
-            all_hi_values = [d['hi'] for d in values]
-            min_val = min(all_lo_values)
-            max_val = max(all_hi_values)
-        else:
-            min_val, max_val = min(values), max(values)
-
+    for record in schema_plan.sentinel_variables:
+        min_val, max_val = record.sentinel_bounds()
         elements = {
-            "@id": f"#sentinelValueAndConceptDescription-{variable}",
+            "@id": f"#sentinelValueAndConceptDescription-{iri_segment(record.name)}",
             "@type": "ValueAndConceptDescription",
             "description": {
                 "@type": "InternationalString",
                 "languageSpecificString": {  # Single object instead of array
                     "@type": "LanguageString",
-                    "content": str(values)
+                    "content": str(record.sentinel_values)
                 }
             },
             "maximumValueExclusive": str(max_val),
@@ -995,40 +1159,29 @@ def generate_ValueAndConceptDescription(df_meta):
 
     return json_ld_data
 
-def generate_SentinelConceptScheme(df_meta):
+def generate_SentinelConceptScheme(df_meta, schema_plan=None):
+    schema_plan = _get_schema_plan(df_meta, schema_plan)
     json_ld_data = []
-    relevant_variables = df_meta.missing_ranges if len(df_meta.missing_ranges) > 0 else df_meta.missing_user_values
     
-    for variable_name in relevant_variables:
-        if variable_name in df_meta.variable_value_labels:
+    for record in schema_plan.sentinel_variables:
+        concept_values = record.sentinel_concept_values()
+        if concept_values:
             elements = {
-                "@id": f"#sentinelConceptScheme-{variable_name}",
+                "@id": f"#sentinelConceptScheme-{iri_segment(record.name)}",
                 "@type": "skos:ConceptScheme",
-                "skos:hasTopConcept": []
+                "skos:hasTopConcept": [f"#{iri_segment(record.name)}-concept-{iri_segment(value)}" for value in concept_values]
             }
-            
-            values = relevant_variables[variable_name]
-            if isinstance(values[0], dict):
-                for value in df_meta.variable_value_labels[variable_name].keys():
-                    for range_dict in values:
-                        if range_dict['lo'] <= value <= range_dict['hi']:
-                            elements["skos:hasTopConcept"].append(f"#{variable_name}-concept-{value}")
-            else:
-                for value in values:
-                    if value in df_meta.variable_value_labels[variable_name]:
-                        elements["skos:hasTopConcept"].append(f"#{variable_name}-concept-{value}")
-            
-            if elements["skos:hasTopConcept"]:
-                json_ld_data.append(elements)
+            json_ld_data.append(elements)
     
     return json_ld_data
 
-def generate_Concept(df_meta):
+def generate_Concept(df_meta, schema_plan=None):
+    schema_plan = _get_schema_plan(df_meta, schema_plan)
     json_ld_data = []
-    for variable_name, values_dict in df_meta.variable_value_labels.items():
-        for value, label in values_dict.items():
+    for record in schema_plan.labelled_variables:
+        for value, label in record.value_labels.items():
             elements = {
-                "@id": f"#{variable_name}-concept-{value}",
+                "@id": f"#{iri_segment(record.name)}-concept-{iri_segment(value)}",
                 "@type": "skos:Concept",
                 # Nested TypedString for notation and prefLabel
                 "skos:notation": {
@@ -1043,83 +1196,51 @@ def generate_Concept(df_meta):
             json_ld_data.append(elements)
     return json_ld_data
 
-def generate_SubstantiveEnumerationDomain(df_meta):
+def generate_SubstantiveEnumerationDomain(df_meta, schema_plan=None):
+    schema_plan = _get_schema_plan(df_meta, schema_plan)
     json_ld_data = []
-    for variable in df_meta.column_names:
-        if variable in df_meta.variable_value_labels:
-            # Create a set to track excluded values
-            excluded_values = set()
-            
-            # Check if there are missing values for this variable
-            if variable in df_meta.missing_ranges:
-                for dict_range in df_meta.missing_ranges[variable]:
-                    if isinstance(dict_range['lo'], float) and isinstance(dict_range['hi'], float):
-                        lo_val = float(dict_range['lo'])
-                        hi_val = float(dict_range['hi'])
-
-                        # Handle infinity case - just add the lo value if hi is infinity
-                        if math.isinf(hi_val):
-                            if not math.isinf(lo_val):
-                                excluded_values.add(int(lo_val))
-                        elif not math.isinf(lo_val):
-                            # Normal range case
-                            excluded_values.update(
-                                range(int(lo_val), int(hi_val) + 1))
-                    elif isinstance(dict_range['lo'], str):
-                        excluded_values.add(dict_range['lo'])
-
-            # Use list comprehension to generate the hasTopConcept list
-            excluded_values_str = {str(i) for i in excluded_values}
-            has_top_concept = [
-                f"#{variable}-concept-{value}"
-                for value in df_meta.variable_value_labels[variable].keys()
-                if (not value in excluded_values) and (not str(value) in excluded_values_str)
-            ]
-
-            # Only add to json_ld_data if has_top_concept list is not empty
-            if has_top_concept:
-                elements = {
-                    "@id": f"#substantiveEnumerationDomain-{variable}",
-                    "@type": "EnumerationDomain",
-                    "sameAs": f"#substantiveConceptScheme-{variable}"
-                }
-                json_ld_data.append(elements)
+    for record in schema_plan.columns:
+        # Only add enumeration domains with at least one substantive value
+        if record.substantive_values:
+            elements = {
+                "@id": f"#substantiveEnumerationDomain-{iri_segment(record.name)}",
+                "@type": "EnumerationDomain",
+                "sameAs": f"#substantiveConceptScheme-{iri_segment(record.name)}"
+            }
+            json_ld_data.append(elements)
 
     return json_ld_data
 
-def generate_SentinelValueDomain(df_meta):
+def generate_SentinelValueDomain(df_meta, schema_plan=None):
+    schema_plan = _get_schema_plan(df_meta, schema_plan)
     json_ld_data = []
-    relevant_variables = df_meta.missing_ranges if len(df_meta.missing_ranges) > 0 else df_meta.missing_user_values
     
-    for variable in relevant_variables:
-        original_type = df_meta.readstat_variable_types[variable]
-        mapped_type = map_to_xsd_type(original_type)
-        
+    for record in schema_plan.sentinel_variables:
         elements = {
-            "@id": f"#sentinelValueDomain-{variable}",
+            "@id": f"#sentinelValueDomain-{iri_segment(record.name)}",
             "@type": "SentinelValueDomain",
             "recommendedDataType": {
                 "@type": "ControlledVocabularyEntry",
-                "entryValue": mapped_type
+                "entryValue": record.xsd_type
             },
-            "isDescribedBy": f"#sentinelValueAndConceptDescription-{variable}"
+            "isDescribedBy": f"#sentinelValueAndConceptDescription-{iri_segment(record.name)}"
         }
-        if variable in df_meta.variable_value_labels:
-            elements["takesValuesFrom"] = f"#sentinelEnumerationDomain-{variable}"
+        if record.value_labels is not None:
+            elements["takesValuesFrom"] = f"#sentinelEnumerationDomain-{iri_segment(record.name)}"
         json_ld_data.append(elements)
     return json_ld_data
 
-def generate_SentinelEnumerationDomain(df_meta):
+def generate_SentinelEnumerationDomain(df_meta, schema_plan=None):
     """New function to generate EnumerationDomain objects"""
+    schema_plan = _get_schema_plan(df_meta, schema_plan)
     json_ld_data = []
-    relevant_variables = df_meta.missing_ranges if len(df_meta.missing_ranges) > 0 else df_meta.missing_user_values
     
-    for variable in relevant_variables:
-        if variable in df_meta.variable_value_labels:
+    for record in schema_plan.sentinel_variables:
+        if record.value_labels is not None:
             elements = {
-                "@id": f"#sentinelEnumerationDomain-{variable}",
+                "@id": f"#sentinelEnumerationDomain-{iri_segment(record.name)}",
                 "@type": "EnumerationDomain",
-                "sameAs": f"#sentinelConceptScheme-{variable}"
+                "sameAs": f"#sentinelConceptScheme-{iri_segment(record.name)}"
             }
             json_ld_data.append(elements)
     
@@ -1145,284 +1266,132 @@ def wrap_in_graph(*args):
         "skos_components": skos_components if skos_components else None
     }
 
-def generate_complete_json_ld(df, df_meta, spssfile='name', chunk_size=5, process_all_rows=False, max_rows=5):
+def _generate_variable_components(df_meta, include_value_mapping=True):
+    """Run the per-variable metadata generators on one schema plan, results keyed by component type"""
+    schema_plan = SchemaPlan(df_meta)
+    return {
+        "InstanceVariable": generate_InstanceVariable(df_meta, include_value_mapping, schema_plan),
+        "SubstantiveValueDomain": generate_SubstantiveValueDomain(df_meta, schema_plan),
+        "SubstantiveEnumerationDomain": generate_SubstantiveEnumerationDomain(df_meta, schema_plan),
+        "SentinelValueDomain": generate_SentinelValueDomain(df_meta, schema_plan),
+        "SentinelEnumerationDomain": generate_SentinelEnumerationDomain(df_meta, schema_plan),
+        "ValueAndConceptDescription": generate_ValueAndConceptDescription(df_meta, schema_plan),
+        "SubstantiveConceptScheme": generate_SubstantiveConceptScheme(df_meta, schema_plan),
+        "SentinelConceptScheme": generate_SentinelConceptScheme(df_meta, schema_plan),
+        "Concept": generate_Concept(df_meta, schema_plan)
+    }
+
+class _ColumnShardMeta:
     """
-    Generate complete JSON-LD representation of the dataset.
-    
-    Parameters:
-    -----------
-    df : pandas DataFrame
-        The dataset to convert
-    df_meta : object
-        Metadata about the dataset
-    spssfile : str
-        Name of the source file
-    chunk_size : int
-        Size of chunks to process at once (default: 5)
-    process_all_rows : bool
-        Whether to process all rows (True) or limit to first chunk (False)
-    max_rows : int
-        Maximum number of rows to process when process_all_rows is False
+    The metadata of a contiguous range of variables, with every per-variable
+    attribute the metadata generators read restricted to those variables.
+    Picklable, so it can be sent to a worker process.
     """
-    start_time = time.time()
-    
-    # Check if we need to process all rows or just a sample
-    if process_all_rows and len(df) > chunk_size:
-        print(f"Processing complete dataset with {len(df)} rows in chunks of {chunk_size}...")
-        
-        # For large datasets, we'll process in chunks for InstanceValue which is intensive
-        # First generate all DataPoints and DataPointPositions at once - this is fast
-        print("Generating DataPoints and DataPointPositions...")
-        dp_start = time.time()
-        all_data_points = generate_DataPoint(df, df_meta, process_all_rows, chunk_size)
-        dp_end = time.time()
-        print(f"Generated {len(all_data_points)} DataPoints in {dp_end - dp_start:.2f} seconds")
-        
-        dp_pos_start = time.time()
-        all_data_point_positions = generate_DataPointPosition(df, df_meta, process_all_rows, chunk_size)
-        dp_pos_end = time.time()
-        print(f"Generated {len(all_data_point_positions)} DataPointPositions in {dp_pos_end - dp_pos_start:.2f} seconds")
-        
-        vm_start = time.time()
-        value_mappings = generate_ValueMapping(df, df_meta, process_all_rows, chunk_size)
-        vm_end = time.time()
-        print(f"Generated {len(value_mappings)} ValueMappings in {vm_end - vm_start:.2f} seconds")
-        
-        # Process InstanceValues in chunks to manage memory usage
-        print("Processing InstanceValues in chunks...")
-        all_instance_values = []
-        
-        # Calculate total chunks for progress reporting
-        total_chunks = (len(df) + chunk_size - 1) // chunk_size
-        total_cells = len(df) * len(df_meta.column_names)
-        
-        # Process each chunk with optimization for large datasets
-        chunk_start = 0
-        iv_total_start = time.time()
-        
-        for chunk_idx in range(total_chunks):
-            chunk_start_time = time.time()
-            
-            # Define chunk boundaries
-            chunk_start = chunk_idx * chunk_size
-            chunk_end = min(chunk_start + chunk_size, len(df))
-            rows_in_chunk = chunk_end - chunk_start
-            
-            # Progress reporting
-            percent_complete = (chunk_idx / total_chunks) * 100
-            print(f"Processing chunk {chunk_idx+1}/{total_chunks}: rows {chunk_start} to {chunk_end-1} ({percent_complete:.1f}% complete)")
-            
-            # Get the current chunk using iloc for better performance
-            df_chunk = df.iloc[chunk_start:chunk_end].copy()
-            
-            # Generate instance values for this chunk with adjusted indices
-            generate_start = time.time()
-            
-            # Optimize: Keep numeric columns as numeric where possible
-            # Pre-process for better performance in the InstanceValue function
-            for col in df_chunk.columns:
-                # Try to convert object columns to numeric if possible for faster processing
-                if df_chunk[col].dtype == 'object':
-                    try:
-                        df_chunk[col] = pd.to_numeric(df_chunk[col], errors='ignore')
-                    except:
-                        pass  # Keep as is if conversion fails
-            
-            chunk_instance_values = []
-            
-            # Process InstanceValues for this chunk
-            for variable in df_meta.column_names:
-                # Create a template for efficiency
-                id_template = f"#instanceValue-{{0}}-{variable}"
-                stored_in_template = f"#dataPoint-{{0}}-{variable}"
-                
-                # Check if this variable has missing ranges
-                has_missing_ranges = variable in df_meta.missing_ranges
-                missing_ranges = df_meta.missing_ranges.get(variable, [])
-                numeric_ranges = [r for r in missing_ranges if isinstance(r['lo'], float)]
-                
-                # Process all rows for this variable
-                col_values = df_chunk[variable]
-                
-                # Apply a batch approach based on data type
-                try:
-                    # Use vectorized operations for numeric data when possible
-                    if numeric_ranges and pd.api.types.is_numeric_dtype(col_values):
-                        # For numeric columns with missing ranges, use vectorized comparison
-                        in_missing_range = pd.Series([False] * len(col_values))
-                        for range_dict in numeric_ranges:
-                            range_condition = (col_values >= range_dict['lo']) & (col_values <= range_dict['hi'])
-                            in_missing_range = in_missing_range | range_condition
-                        
-                        # Generate values based on condition
-                        for idx, (value, is_missing) in enumerate(zip(col_values, in_missing_range)):
-                            global_idx = chunk_start + idx
-                            value_str = str(value)
-                            
-                            element = {
-                                "@id": id_template.format(global_idx),
-                                "@type": "InstanceValue",
-                                "content": {
-                                    "@type": "TypedString",
-                                    "content": value_str
-                                },
-                                "isStoredIn": stored_in_template.format(global_idx),
-                                "hasValueFrom_ValueDomain": (f"#sentinelValueDomain-{variable}" 
-                                                              if is_missing else 
-                                                               f"#substantiveValueDomain-{variable}")
-                            }
-                            chunk_instance_values.append(element)
-                    else:
-                        # For non-numeric or complex cases, fall back to regular processing
-                        for idx, value in enumerate(col_values):
-                            global_idx = chunk_start + idx
-                            value_str = str(value)
-                            
-                            if has_missing_ranges:
-                                in_missing = False
-                                for range_dict in numeric_ranges:
-                                    try:
-                                        value_float = float(value)
-                                        if range_dict['lo'] <= value_float <= range_dict['hi']:
-                                            in_missing = True
-                                            break
-                                    except (ValueError, TypeError):
-                                        pass
-                                
-                                value_domain = (f"#sentinelValueDomain-{variable}" if in_missing
-                                             else f"#substantiveValueDomain-{variable}")
-                            else:
-                                value_domain = f"#substantiveValueDomain-{variable}"
-                            
-                            element = {
-                                "@id": id_template.format(global_idx),
-                                "@type": "InstanceValue",
-                                "content": {
-                                    "@type": "TypedString",
-                                    "content": value_str
-                                },
-                                "isStoredIn": stored_in_template.format(global_idx),
-                                "hasValueFrom_ValueDomain": value_domain
-                            }
-                            chunk_instance_values.append(element)
-                except Exception as e:
-                    # If any optimized approach fails, fall back to the most reliable method
-                    print(f"Warning: Falling back to standard processing for variable {variable}: {str(e)}")
-                    for idx, value in enumerate(col_values):
-                        global_idx = chunk_start + idx
-                        
-                        element = {
-                            "@id": id_template.format(global_idx),
-                            "@type": "InstanceValue",
-                            "content": {
-                                "@type": "TypedString",
-                                "content": str(value)
-                            },
-                            "isStoredIn": stored_in_template.format(global_idx),
-                            "hasValueFrom_ValueDomain": f"#substantiveValueDomain-{variable}"
-                        }
-                        
-                        # Check for missing values if needed
-                        if has_missing_ranges:
-                            for range_dict in missing_ranges:
-                                if isinstance(range_dict['lo'], float):
-                                    try:
-                                        value_float = float(value)
-                                        if range_dict['lo'] <= value_float <= range_dict['hi']:
-                                            element["hasValueFrom_ValueDomain"] = f"#sentinelValueDomain-{variable}"
-                                            break
-                                    except (ValueError, TypeError):
-                                        pass
-                        
-                        chunk_instance_values.append(element)
-            
-            # Add this chunk's instance values to the complete list
-            all_instance_values.extend(chunk_instance_values)
-            
-            generate_end = time.time()
-            chunk_end_time = time.time()
-            
-            # Calculate and display performance metrics
-            chunk_duration = chunk_end_time - chunk_start_time
-            rows_per_sec = rows_in_chunk / chunk_duration
-            cells_processed = rows_in_chunk * len(df_meta.column_names)
-            cells_per_sec = cells_processed / chunk_duration
-            
-            print(f"  Chunk {chunk_idx+1} processed in {chunk_duration:.2f} seconds")
-            print(f"  Performance: {rows_per_sec:.1f} rows/sec, {cells_per_sec:.1f} cells/sec")
-            print(f"  Memory usage: {len(chunk_instance_values)} objects created")
-            
-            # Estimate remaining time
-            elapsed_time = time.time() - iv_total_start
-            estimated_total = elapsed_time / (chunk_idx + 1) * total_chunks
-            remaining_time = max(0, estimated_total - elapsed_time)
-            
-            if remaining_time > 60:
-                mins = int(remaining_time // 60)
-                secs = int(remaining_time % 60)
-                print(f"  Estimated time remaining: {mins}m {secs}s")
+    def __init__(self, df_meta, start, stop, variable_dicts):
+        self.column_names = list(df_meta.column_names[start:stop])
+        for attr in ('column_labels', 'original_variable_types'):
+            if hasattr(df_meta, attr):
+                value = getattr(df_meta, attr)
+                setattr(self, attr, value[start:stop] if isinstance(value, list) else value)
+        for attr, value in variable_dicts.items():
+            setattr(self, attr, value)
+        if hasattr(df_meta, 'file_format'):
+            self.file_format = df_meta.file_format
+
+def _column_shards(df_meta, n_shards):
+    """Split df_meta into at most n_shards _ColumnShardMeta, in column order"""
+    columns = df_meta.column_names
+    shard_size = max(1, math.ceil(len(columns) / n_shards))
+    bounds = [(start, min(start + shard_size, len(columns))) for start in range(0, len(columns), shard_size)]
+    shard_of = {variable: i for i, (start, stop) in enumerate(bounds) for variable in columns[start:stop]}
+
+    # Split every per-variable dict in one pass, keeping its own key order within a shard.
+    # Keys that are not columns stay with the last shard, so nothing is dropped.
+    shard_dicts = [{} for _ in bounds]
+    for attr in ('readstat_variable_types', 'variable_measure', 'variable_value_labels',
+                 'missing_ranges', 'missing_user_values'):
+        if not hasattr(df_meta, attr):
+            continue
+        parts = [{} for _ in bounds]
+        for variable, value in getattr(df_meta, attr).items():
+            parts[shard_of.get(variable, len(bounds) - 1)][variable] = value
+        for shard_dict, part in zip(shard_dicts, parts):
+            shard_dict[attr] = part
+
+    # Generators fall back to missing_user_values when missing_ranges is empty;
+    # a shard without missing ranges must not, if the dataset has them
+    if getattr(df_meta, 'missing_ranges', None):
+        for shard_dict in shard_dicts:
+            if 'missing_user_values' in shard_dict:
+                shard_dict['missing_user_values'] = {}
+
+    return [_ColumnShardMeta(df_meta, start, stop, shard_dict)
+            for (start, stop), shard_dict in zip(bounds, shard_dicts)]
+
+def _generate_variable_components_parallel(df_meta, include_value_mapping, workers):
+    """
+    Run the per-variable metadata generators on column shards in worker processes
+    and merge the results in column order: shards are consecutive column ranges
+    and SchemaPlan keeps the components of each shard in column order, so the
+    shards are concatenated in shard order.
+    """
+    shards = _column_shards(df_meta, workers * 4)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_generate_variable_components, shards,
+                                    [include_value_mapping] * len(shards)))
+
+    merged = {key: [] for key in results[0]}
+    sentinel_descriptions = []
+    for shard, result in zip(shards, results):
+        for key, items in result.items():
+            if key == "ValueAndConceptDescription":
+                # Substantive descriptions of all variables come before the sentinel ones
+                n_substantive = len(shard.column_names)
+                merged[key].extend(items[:n_substantive])
+                sentinel_descriptions.extend(items[n_substantive:])
             else:
-                print(f"  Estimated time remaining: {int(remaining_time)}s")
-        
-        iv_total_end = time.time()
-        print(f"All InstanceValues processed in {iv_total_end - iv_total_start:.2f} seconds")
-        
-        # Use the complete dataset for the rest of the components
-        df_limited = df
-        
+                merged[key].extend(items)
+    merged["ValueAndConceptDescription"].extend(sentinel_descriptions)
+    return merged
+
+def _assemble_components(df_meta, spssfile, include_value_mappings, record_segment,
+                         value_mappings, data_points, data_point_positions, instance_values,
+                         workers=None):
+    """
+    Put the generated components into document order.
+    The row-level components are passed in, so they can be lists or lazy iterables.
+    With workers > 1, the per-variable metadata of wide schemas is generated in parallel.
+    """
+    if workers is not None and workers > 1 and len(df_meta.column_names) >= PARALLEL_METADATA_MIN_VARIABLES:
+        variable_components = _generate_variable_components_parallel(df_meta, include_value_mappings, workers)
     else:
-        # Use the standard approach with a limited number of rows
-        if len(df) > max_rows and not process_all_rows:
-            print(f"Warning: Dataset has {len(df)} rows. Limiting to {max_rows} rows for performance.")
-            print(f"Set process_all_rows=True to process all rows (may be slow for large datasets).")
-            df_limited = df.head(max_rows)
-        else:
-            df_limited = df
-        
-        # Generate components for the limited dataset
-        print("Generating components for limited dataset...")
-        component_start_time = time.time()
-        all_instance_values = generate_InstanceValue(df_limited, df_meta, process_all_rows, max_rows)
-        print(f"InstanceValues generated in {(time.time() - component_start_time):.2f} seconds")
-        
-        component_start_time = time.time()
-        all_data_points = generate_DataPoint(df_limited, df_meta, process_all_rows, max_rows)
-        print(f"DataPoints generated in {(time.time() - component_start_time):.2f} seconds")
-        
-        component_start_time = time.time()
-        all_data_point_positions = generate_DataPointPosition(df_limited, df_meta, process_all_rows, max_rows)
-        print(f"DataPointPositions generated in {(time.time() - component_start_time):.2f} seconds")
-        
-        component_start_time = time.time()
-        value_mappings = generate_ValueMapping(df_limited, df_meta, process_all_rows, max_rows)
-        print(f"ValueMappings generated in {(time.time() - component_start_time):.2f} seconds")
+        variable_components = _generate_variable_components(df_meta, include_value_mappings)
 
-    # Determine if we should include ValueMapping and ValueMappingPosition
-    # Skip these when max_rows is 0 (metadata-only mode)
-    include_value_mappings = max_rows > 0 or process_all_rows
+    # Roles are looked up by every structure generator, compile them once
+    role_index = RoleIndex(df_meta)
 
     # Generate base components that are always included
     components = [
         generate_PhysicalDataset(df_meta, spssfile),
-        generate_PhysicalRecordSegment(df_meta, df_limited),
+        record_segment,
         generate_PhysicalSegmentLayout(df_meta, include_value_mapping=include_value_mappings),
-        all_data_points,
-        all_data_point_positions,
-        all_instance_values,
+        data_points,
+        data_point_positions,
+        instance_values,
         generate_DataStore(df_meta),
         generate_LogicalRecord(df_meta),
         generate_WideDataSet(df_meta),
-        generate_WideDataStructure(df_meta),
-        generate_MeasureComponent(df_meta),
-        generate_InstanceVariable(df_meta, include_value_mapping=include_value_mappings),
-        generate_SubstantiveValueDomain(df_meta),
-        generate_SubstantiveEnumerationDomain(df_meta),
-        generate_SentinelValueDomain(df_meta),
-        generate_SentinelEnumerationDomain(df_meta),
-        generate_ValueAndConceptDescription(df_meta),
-        generate_SubstantiveConceptScheme(df_meta),
-        generate_SentinelConceptScheme(df_meta),
-        generate_Concept(df_meta)
+        generate_WideDataStructure(df_meta, role_index),
+        generate_MeasureComponent(df_meta, role_index),
+        variable_components["InstanceVariable"],
+        variable_components["SubstantiveValueDomain"],
+        variable_components["SubstantiveEnumerationDomain"],
+        variable_components["SentinelValueDomain"],
+        variable_components["SentinelEnumerationDomain"],
+        variable_components["ValueAndConceptDescription"],
+        variable_components["SubstantiveConceptScheme"],
+        variable_components["SentinelConceptScheme"],
+        variable_components["Concept"]
     ]
 
     # Only add ValueMapping and ValueMappingPosition if we're processing data
@@ -1431,52 +1400,174 @@ def generate_complete_json_ld(df, df_meta, spssfile='name', chunk_size=5, proces
         components.insert(4, generate_ValueMappingPosition(df_meta))  # Insert after ValueMapping
 
     # Only add primary key related components for non-JSON files
-    is_json_file = hasattr(df_meta, 'file_format') and df_meta.file_format == 'json'
-    if df_meta.identifier_vars and not is_json_file:
+    if role_index.declared[ROLE_IDENTIFIER] and not role_index.is_json:
         pk_components = [
-            generate_IdentifierComponent(df_meta),
-            generate_PrimaryKey(df_meta),
-            generate_PrimaryKeyComponent(df_meta)
+            generate_IdentifierComponent(df_meta, role_index),
+            generate_PrimaryKey(df_meta, role_index),
+            generate_PrimaryKeyComponent(df_meta, role_index)
         ]
         components.extend(pk_components)
-    elif df_meta.identifier_vars and is_json_file:
+    elif role_index.declared[ROLE_IDENTIFIER]:
         # For JSON files, only generate IdentifierComponent (no PrimaryKey)
-        components.append(generate_IdentifierComponent(df_meta))
+        components.append(generate_IdentifierComponent(df_meta, role_index))
     
     # Add attribute components if attribute_vars is not empty
-    if df_meta.attribute_vars:
-        components.append(generate_AttributeComponent(df_meta))
+    if role_index.declared[ROLE_ATTRIBUTE]:
+        components.append(generate_AttributeComponent(df_meta, role_index))
     
     
     # Add contextual components if contextual_vars is not empty (JSON files only)
-    if hasattr(df_meta, 'contextual_vars') and df_meta.contextual_vars:
-        components.append(generate_ContextualComponent(df_meta))
+    if role_index.declared[ROLE_CONTEXTUAL]:
+        components.append(generate_ContextualComponent(df_meta, role_index))
     
     # Add synthetic ID components if synthetic_id_vars is not empty (JSON files only)
-    if hasattr(df_meta, 'synthetic_id_vars') and df_meta.synthetic_id_vars:
-        components.append(generate_SyntheticIdComponent(df_meta))
+    if role_index.declared[ROLE_SYNTHETIC_ID]:
+        components.append(generate_SyntheticIdComponent(df_meta, role_index))
     
     # Add variable value components if variable_value_vars is not empty (JSON files only)
-    if hasattr(df_meta, 'variable_value_vars') and df_meta.variable_value_vars:
-        components.append(generate_VariableValueComponent(df_meta))
+    if role_index.declared[ROLE_VARIABLE_VALUE]:
+        components.append(generate_VariableValueComponent(df_meta, role_index))
         # Add corresponding variable descriptor components (required by SHACL)
-        components.append(generate_VariableDescriptorComponent(df_meta))
+        components.append(generate_VariableDescriptorComponent(df_meta, role_index))
     
     
     # Add ComponentPosition for all components in the data structure
-    components.append(generate_ComponentPosition(df_meta))
+    components.append(generate_ComponentPosition(df_meta, role_index))
+
+    return components
+
+def _json_scalar(value):
+    """
+    Convert a numpy scalar to the Python value json encodes natively, so the
+    encoder never has to fall back to _default_encode for it
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def _json_separators(indent):
+    """Item and key separators used with an indent, like json.dumps; compact without one"""
+    return COMPACT_SEPARATORS if indent is None else (',', ': ')
+
+def encode_json_ld(json_ld_doc, indent=4):
+    """
+    Encode a JSON-LD document. With indent=None the document is written in the
+    compact encoding, without whitespace, by the C encoder of the json module;
+    pretty-printing (the default, indent=4) goes through its pure-Python encoder.
+    """
+    return json.dumps(json_ld_doc, indent=indent, separators=_json_separators(indent),
+                      default=_default_encode)
+
+def compact_json_ld(json_ld_string):
+    """Re-encode a pretty-printed JSON-LD document in the compact encoding"""
+    return encode_json_ld(json.loads(json_ld_string), indent=None)
+
+def _default_encode(obj):
+    """Fallback JSON encoder for numpy/pandas scalars and dates"""
+    if isinstance(obj, np.int64):
+        return int(obj)
+    elif pd.isna(obj):
+        return None
+    elif isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    elif isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+def generate_complete_json_ld(df, df_meta, spssfile='name', chunk_size=5, process_all_rows=False, max_rows=5, workers=None, indent=4):
+    """
+    Generate complete JSON-LD representation of the dataset.
+    
+    Parameters:
+    -----------
+    df : pandas DataFrame
+        The dataset to convert, or a spss_import.ChunkedFrame to convert all rows
+        of a file that is read chunk by chunk
+    df_meta : object
+        Metadata about the dataset
+    spssfile : str
+        Name of the source file
+    chunk_size : int
+        Size of chunks to process at once (default: 5)
+    process_all_rows : bool
+        Whether to process all rows (True) or limit to first chunk (False)
+    max_rows : int
+        Maximum number of rows to process when process_all_rows is False
+    workers : int or None
+        Number of worker processes for the row chunks when process_all_rows is True,
+        and for the per-variable metadata of wide schemas (default: None, serial)
+    indent : int or None
+        Indentation of the JSON text (default: 4); None gives the compact encoding,
+        which is smaller and much faster to produce for large documents
+    """
+    start_time = time.time()
+
+    # Complete datasets are encoded column by column by the streaming writer
+    if process_all_rows and len(df) > chunk_size:
+        if workers is not None and workers > 1:
+            print(f"Processing complete dataset with {len(df)} rows in chunks of {chunk_size} on {workers} worker processes...")
+        elif not isinstance(df, pd.DataFrame):
+            print(f"Processing complete dataset with {len(df)} rows in chunks of {chunk_size}, reading it chunk by chunk...")
+        else:
+            print(f"Processing complete dataset with {len(df)} rows in chunks of {chunk_size}...")
+        json_ld = ''.join(iter_complete_json_ld(df, df_meta, spssfile=spssfile, chunk_size=chunk_size,
+                                                process_all_rows=process_all_rows, max_rows=max_rows,
+                                                indent=indent, workers=workers))
+        print(f"Dataset: {len(df)} rows x {len(df_meta.column_names)} variables")
+        print(f"Total processing time: {time.time() - start_time:.2f} seconds")
+        return json_ld
+
+    if not isinstance(df, pd.DataFrame):
+        # Only the leading rows are converted, read them
+        df = _limit_rows(df, chunk_size, process_all_rows, max_rows)
+    
+    # Use the standard approach with a limited number of rows
+    if len(df) > max_rows and not process_all_rows:
+        print(f"Warning: Dataset has {len(df)} rows. Limiting to {max_rows} rows for performance.")
+        print(f"Set process_all_rows=True to process all rows (may be slow for large datasets).")
+        df_limited = df.head(max_rows)
+    else:
+        df_limited = df
+    
+    # Generate components for the limited dataset
+    print("Generating components for limited dataset...")
+    component_start_time = time.time()
+    all_instance_values = generate_InstanceValue(df_limited, df_meta, process_all_rows, max_rows)
+    print(f"InstanceValues generated in {(time.time() - component_start_time):.2f} seconds")
+    
+    component_start_time = time.time()
+    all_data_points = generate_DataPoint(df_limited, df_meta, process_all_rows, max_rows)
+    print(f"DataPoints generated in {(time.time() - component_start_time):.2f} seconds")
+    
+    component_start_time = time.time()
+    all_data_point_positions = generate_DataPointPosition(df_limited, df_meta, process_all_rows, max_rows)
+    print(f"DataPointPositions generated in {(time.time() - component_start_time):.2f} seconds")
+    
+    component_start_time = time.time()
+    value_mappings = generate_ValueMapping(df_limited, df_meta, process_all_rows, max_rows)
+    print(f"ValueMappings generated in {(time.time() - component_start_time):.2f} seconds")
+
+    # Determine if we should include ValueMapping and ValueMappingPosition
+    # Skip these when max_rows is 0 (metadata-only mode)
+    include_value_mappings = max_rows > 0 or process_all_rows
+
+    # Generate base components that are always included
+    components = _assemble_components(
+        df_meta, spssfile, include_value_mappings,
+        record_segment=generate_PhysicalRecordSegment(df_meta, df_limited),
+        value_mappings=value_mappings,
+        data_points=all_data_points,
+        data_point_positions=all_data_point_positions,
+        instance_values=all_instance_values,
+        workers=workers
+    )
     
     # Get the separated components
     components_dict = wrap_in_graph(*components)
     
     # Create the final JSON-LD document with the new structure
     json_ld_doc = {
-        "@context": [
-            "https://docs.ddialliance.org/DDI-CDI/1.0/model/encoding/json-ld/ddi-cdi.jsonld",
-            {
-                "skos": "http://www.w3.org/2004/02/skos/core#"
-            }
-        ],
+        "@context": JSON_LD_CONTEXT,
         "DDICDIModels": components_dict["ddi_components"]
     }
     
@@ -1503,24 +1594,406 @@ def generate_complete_json_ld(df, df_meta, spssfile='name', chunk_size=5, proces
     print(f"Dataset: {num_rows} rows x {num_variables} variables")
     print(f"Generated: {data_points_count} DataPoints")
     
-    if process_all_rows and num_rows > chunk_size:
-        print(f"Processing strategy: Chunked processing with {(num_rows + chunk_size - 1) // chunk_size} chunks of size {chunk_size}")
-    else:
-        print(f"Processing strategy: Limited to {max_rows} rows" if not process_all_rows and num_rows > max_rows else "Full dataset")
-
-    def default_encode(obj):
-        if isinstance(obj, np.int64):
-            return int(obj)
-        elif pd.isna(obj):
-            return None
-        elif isinstance(obj, pd.Timestamp):
-            return obj.isoformat()
-        elif isinstance(obj, (datetime.date, datetime.datetime)):
-            return obj.isoformat()
-        raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+    print(f"Processing strategy: Limited to {max_rows} rows" if not process_all_rows and num_rows > max_rows else "Full dataset")
 
     # Convert to JSON string
-    return json.dumps(json_ld_doc, indent=4, default=default_encode)
+    return encode_json_ld(json_ld_doc, indent=indent)
+
+class _LazyList:
+    """
+    Stand-in for a JSON array whose elements are produced on demand.
+    Used for arrays inside a single element that grow with rows x variables.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+
+    def __iter__(self):
+        return iter(self.factory())
+
+def _iter_json(obj, indent=None, level=0):
+    """
+    Encode obj exactly as encode_json_ld(obj, indent=indent) would at nesting
+    depth level, yielding fragments. Lazy arrays and generators are never materialized.
+    """
+    if isinstance(obj, _EncodedItems):
+        yield obj.text
+    elif isinstance(obj, _StringItems):
+        yield _item_separator(indent, level).join(_json_strings(obj.strings).tolist())
+    elif isinstance(obj, (_LazyList, types.GeneratorType)):
+        yield from _iter_json_entries('[', ']', (('', value) for value in obj), indent, level)
+    elif isinstance(obj, dict) and any(isinstance(value, _LazyList) for value in obj.values()):
+        key_separator = _json_separators(indent)[1]
+        entries = ((json.dumps(key) + key_separator, value) for key, value in obj.items())
+        yield from _iter_json_entries('{', '}', entries, indent, level)
+    else:
+        text = encode_json_ld(obj, indent=indent)
+        if indent is not None and level > 0:
+            # Nested values need the indentation of their depth in the document
+            text = text.replace('\n', '\n' + ' ' * (indent * level))
+        yield text
+
+def _iter_json_entries(open_char, close_char, entries, indent, level):
+    """Encode (prefix, value) entries as a JSON object or array body"""
+    if indent is None:
+        item_separator, inner, closing = COMPACT_SEPARATORS[0], '', ''
+    else:
+        item_separator = ','
+        inner = '\n' + ' ' * (indent * (level + 1))
+        closing = '\n' + ' ' * (indent * level)
+
+    first = True
+    for prefix, value in entries:
+        yield (open_char if first else item_separator) + inner + prefix
+        first = False
+        yield from _iter_json(value, indent, level + 1)
+
+    yield open_char + close_char if first else closing + close_char
+
+def _split_skos_components(components, skos_components):
+    """Yield DDI-CDI items in order and divert SKOS items, like wrap_in_graph"""
+    for component in components:
+        for item in component:
+            if isinstance(item, _EncodedItems):
+                if item.text:
+                    yield item
+            elif item.get("@type", "").startswith("skos:"):
+                skos_components.append(item)
+            else:
+                yield item
+
+def _iter_DataPointPosition_refs(df_meta, n_rows):
+    row_labels = _row_labels(0, n_rows)
+    for variable in df_meta.column_names:
+        yield _StringItems("#dataPointPosition-" + row_labels + f"-{iri_segment(variable)}")
+
+def _buffer_fragments(fragments, buffer_size=65536):
+    """Join small fragments so writes and HTTP chunks are not a few bytes each"""
+    buffer = []
+    buffered = 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        buffered += len(fragment)
+        if buffered >= buffer_size:
+            yield ''.join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield ''.join(buffer)
+
+class _EncodedItems:
+    """
+    Consecutive array elements already encoded as JSON text, e.g. by a worker
+    process. _iter_json writes the text as is.
+    """
+    def __init__(self, text):
+        self.text = text
+
+# Encodes an object array of strings as JSON strings, like json.dumps does
+_json_strings = np.frompyfunc(json.encoder.encode_basestring_ascii, 1, 1)
+
+def _template_value(i):
+    """Placeholder for the i-th value an _ElementTemplate fills in"""
+    return f"zqvalue{i}zq"
+
+class _ElementTemplate:
+    """
+    The JSON text of an array element at depth level of the document, encoded
+    once with _template_value placeholders for the values that vary. render()
+    fills them in for a whole column of elements at once, so row-level
+    components are encoded without building a dict per element.
+    """
+    def __init__(self, element, indent, level):
+        text = ''.join(_iter_json(element, indent, level))
+        self.parts = re.split(r'"zqvalue\d+zq"', text)
+        self.separator = _item_separator(indent, level)
+
+    def render(self, *values):
+        """
+        The elements as consecutive array elements, given the JSON text of each
+        placeholder in order: an object array with one text per element, or one
+        text shared by all. The texts are interleaved with the template and
+        joined once, without concatenating strings per element.
+        """
+        n = max(len(value) for value in values if not isinstance(value, str))
+        if n == 0:
+            return ''
+        pieces = np.empty((n, 2 * len(values) + 1), dtype=object)
+        pieces[:, 0] = self.parts[0]
+        for i, (value, part) in enumerate(zip(values, self.parts[1:])):
+            pieces[:, 2 * i + 1] = value
+            pieces[:, 2 * i + 2] = part
+        pieces[:-1, -1] = self.parts[-1] + self.separator
+        return ''.join(pieces.ravel().tolist())
+
+def _item_separator(indent, level):
+    """Separator of consecutive JSON array elements at depth level"""
+    return COMPACT_SEPARATORS[0] if indent is None else ',\n' + ' ' * (indent * level)
+
+def _row_labels(start, stop):
+    """Row numbers start..stop-1 as an object array of strings"""
+    return np.arange(start, stop).astype(str).astype(object)
+
+class _StringItems:
+    """
+    Consecutive string elements of a JSON array, as an object array. _iter_json
+    encodes them together, at the depth they are written at.
+    """
+    def __init__(self, strings):
+        self.strings = strings
+
+class _ShardMeta:
+    """
+    The part of df_meta the row-level generators read. The metadata objects of
+    read_csv and read_json are instances of local classes that can't be pickled,
+    so this copy is sent to worker processes instead.
+    """
+    def __init__(self, df_meta):
+        self.column_names = list(df_meta.column_names)
+        self.missing_ranges = dict(df_meta.missing_ranges)
+        self.missing_user_values = dict(getattr(df_meta, 'missing_user_values', {}))
+        if hasattr(df_meta, 'file_format'):
+            self.file_format = df_meta.file_format
+
+# Rows of a chunked frame converted at a time, see _iter_row_shards
+CHUNKED_FRAME_SHARD_ROWS = 100000
+
+def _iter_row_shards(df, shard_size):
+    """
+    (first row, rows) of the consecutive shard_size-row slices of df. df is a
+    DataFrame or a chunked frame (spss_import.ChunkedFrame), whose chunks are
+    read once, in order, and cut or joined into shards.
+    """
+    if isinstance(df, pd.DataFrame):
+        for start in range(0, len(df), shard_size):
+            yield start, df.iloc[start:start + shard_size]
+        return
+    start = 0
+    pending = []
+    pending_rows = 0
+    for chunk in df:
+        pending.append(chunk)
+        pending_rows += len(chunk)
+        while pending_rows >= shard_size:
+            rows = pending[0] if len(pending) == 1 else pd.concat(pending, ignore_index=True)
+            yield start, rows.iloc[:shard_size]
+            rest = rows.iloc[shard_size:]
+            pending = [rest] if len(rest) else []
+            pending_rows = len(rest)
+            start += shard_size
+    if pending_rows:
+        yield start, pending[0] if len(pending) == 1 else pd.concat(pending, ignore_index=True)
+
+def _chunked_shard_size(unit):
+    """Shard size for a chunked frame: a whole number of units, about CHUNKED_FRAME_SHARD_ROWS rows"""
+    return max(1, CHUNKED_FRAME_SHARD_ROWS // unit) * unit
+
+def _limit_rows(df, chunk_size, process_all_rows, max_rows):
+    """The rows generate_complete_json_ld converts"""
+    if process_all_rows and len(df) > chunk_size:
+        return df
+    if len(df) > max_rows and not process_all_rows:
+        return df.head(max_rows)
+    # A chunked frame is only kept for conversions of all rows
+    return df if isinstance(df, pd.DataFrame) else df.head(len(df))
+
+def _encode_items(items, indent, level):
+    """Encode items as consecutive elements of a JSON array at depth level, without the brackets"""
+    return _item_separator(indent, level).join(''.join(_iter_json(item, indent, level)) for item in items)
+
+def _encode_data_points(variable, start, stop, dataset_reference, indent, level):
+    """
+    Encode the DataPoints of rows start to stop of variable, the text
+    _variable_DataPoints encodes to. Also a worker process task.
+    """
+    if stop <= start:
+        return ''
+    template = _ElementTemplate({
+        "@id": _template_value(0),
+        "@type": "DataPoint",
+        "isDescribedBy": _template_value(1),
+        "has_DataPoint_OF_DataSet": _template_value(2)
+    }, indent, level)
+    segment = iri_segment(variable)
+    return template.render(
+        _json_strings("#dataPoint-" + _row_labels(start, stop) + f"-{segment}"),
+        json.dumps(f"#instanceVariable-{segment}"),
+        json.dumps(dataset_reference)
+    )
+
+def _encode_data_point_positions(variable, start, stop, indent, level):
+    """
+    Encode the DataPointPositions of rows start to stop of variable, the text
+    _variable_DataPointPositions encodes to. Also a worker process task.
+    """
+    if stop <= start:
+        return ''
+    template = _ElementTemplate({
+        "@id": _template_value(0),
+        "@type": "DataPointPosition",
+        "value": _template_value(1),
+        "indexes": _template_value(2)
+    }, indent, level)
+    segment = iri_segment(variable)
+    row_labels = _row_labels(start, stop)
+    return template.render(
+        _json_strings("#dataPointPosition-" + row_labels + f"-{segment}"),
+        row_labels,
+        _json_strings("#dataPoint-" + row_labels + f"-{segment}")
+    )
+
+def _encode_instance_values(df_shard, shard_meta, start, chunk_size, indent, level):
+    """
+    Worker process task: encode the InstanceValues of the rows in df_shard, whose
+    first row is row number start, chunk by chunk as one text.
+    """
+    frame = _InstanceValueFrame(df_shard, shard_meta, first_row=start)
+    return _item_separator(indent, level).join(
+        item.text for item in frame.encoded_chunks(chunk_size, indent, level))
+
+def _iter_pool_results(tasks, workers):
+    """
+    Run (function, args) tasks on a pool of worker processes and yield their
+    results in task order. At most two tasks per worker are pending at a time,
+    so memory stays bounded while all workers are busy.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for function, args in tasks:
+            pending.append(executor.submit(function, *args))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _row_level_tasks(df, df_meta, chunk_size, shard_size, indent, level):
+    """
+    (function, args) tasks that encode the DataPoints, DataPointPositions and
+    InstanceValues of df, shard_size rows at a time, in document order: by
+    variable, then row, for the first two, by row for the InstanceValues.
+    Shards are whole numbers of chunks, so the InstanceValues are in chunk
+    order whatever the shard size.
+    """
+    n_rows = len(df)
+    shard_meta = _ShardMeta(df_meta)
+    dataset_reference = _get_dataset_reference(df_meta)
+    row_ranges = [(start, min(start + shard_size, n_rows)) for start in range(0, n_rows, shard_size)]
+
+    data_points = (
+        (_encode_data_points, (variable, start, stop, dataset_reference, indent, level))
+        for variable in shard_meta.column_names for start, stop in row_ranges
+    )
+    data_point_positions = (
+        (_encode_data_point_positions, (variable, start, stop, indent, level))
+        for variable in shard_meta.column_names for start, stop in row_ranges
+    )
+    instance_values = (
+        (_encode_instance_values, (rows, shard_meta, start, chunk_size, indent, level))
+        for start, rows in _iter_row_shards(df, shard_size)
+    )
+    return data_points, data_point_positions, instance_values
+
+def _encode_rows(df, df_meta, chunk_size, indent, level):
+    """
+    Encode the row-level components of df while they are written. Returns
+    the DataPoints, DataPointPositions and InstanceValues as lazy iterables
+    of encoded shards, see _row_level_tasks.
+    """
+    tasks = _row_level_tasks(df, df_meta, chunk_size, _chunked_shard_size(chunk_size), indent, level)
+    return tuple(
+        (_EncodedItems(function(*args)) for function, args in component)
+        for component in tasks
+    )
+
+def _encode_row_shards(df, df_meta, chunk_size, workers, indent, level):
+    """
+    Encode the row-level components of df on pools of worker processes, like
+    _encode_rows. Each pool runs while its component is written.
+    """
+    total_chunks = (len(df) + chunk_size - 1) // chunk_size
+    # A few shards per worker balances the load without paying for every small
+    # chunk; shards of a large dataset are capped, as pending shards are held
+    shard_size = min(max(1, math.ceil(total_chunks / (workers * 4))) * chunk_size,
+                     _chunked_shard_size(chunk_size))
+    tasks = _row_level_tasks(df, df_meta, chunk_size, shard_size, indent, level)
+    return tuple(
+        (_EncodedItems(text) for text in _iter_pool_results(component, workers))
+        for component in tasks
+    )
+
+def iter_complete_json_ld(df, df_meta, spssfile='name', chunk_size=5, process_all_rows=False, max_rows=5, indent=4, workers=None):
+    """
+    Stream the JSON-LD document produced by generate_complete_json_ld as string fragments.
+
+    Takes the same parameters as generate_complete_json_ld. Row-level components
+    (DataPoints, DataPointPositions, InstanceValues) are generated while they are
+    written, so peak memory stays proportional to one chunk instead of the whole
+    dataset. Joining the fragments gives the same document as
+    generate_complete_json_ld with the same indent.
+
+    With workers > 1 and process_all_rows, the row chunks are encoded on a pool
+    of that many worker processes and spliced in order. Only a few encoded
+    shards per worker are pending at a time, so memory stays bounded. Wide
+    schemas also get their per-variable metadata generated in parallel.
+    """
+    df_limited = _limit_rows(df, chunk_size, process_all_rows, max_rows)
+    n_rows = len(df_limited)
+    include_value_mappings = max_rows > 0 or process_all_rows
+
+    # Keep has_DataPointPosition lazy, it holds one reference per cell
+    record_segment = generate_PhysicalRecordSegment(df_meta, df_limited.head(0))
+    if n_rows > 0:
+        record_segment[0]["has_DataPointPosition"] = _LazyList(
+            lambda: _iter_DataPointPosition_refs(df_meta, n_rows))
+
+    # Elements of DDICDIModels are at depth 2 of the document
+    if process_all_rows and len(df) > chunk_size and workers is not None and workers > 1:
+        data_points, data_point_positions, instance_values = _encode_row_shards(
+            df_limited, df_meta, chunk_size, workers, indent, 2)
+    elif process_all_rows and len(df) > chunk_size:
+        data_points, data_point_positions, instance_values = _encode_rows(
+            df_limited, df_meta, chunk_size, indent, 2)
+    else:
+        # The InstanceValues of a sample are one chunk, ordered by variable, then row
+        data_points, data_point_positions, instance_values = _encode_rows(
+            df_limited, df_meta, max(n_rows, 1), indent, 2)
+
+    components = _assemble_components(
+        df_meta, spssfile, include_value_mappings,
+        record_segment=record_segment,
+        value_mappings=iter_ValueMapping(df_limited, df_meta),
+        data_points=data_points,
+        data_point_positions=data_point_positions,
+        instance_values=instance_values,
+        workers=workers
+    )
+
+    skos_components = []
+
+    key_separator = _json_separators(indent)[1]
+
+    def document_entries():
+        yield '"@context"' + key_separator, JSON_LD_CONTEXT
+        yield '"DDICDIModels"' + key_separator, _split_skos_components(components, skos_components)
+        # SKOS components are only known once DDICDIModels has been written
+        if skos_components:
+            yield '"@included"' + key_separator, skos_components
+
+    yield from _buffer_fragments(_iter_json_entries('{', '}', document_entries(), indent, 0))
+
+def write_complete_json_ld(sink, df, df_meta, spssfile='name', chunk_size=5, process_all_rows=False, max_rows=5, indent=4, workers=None):
+    """
+    Write the JSON-LD document to a file-like sink (anything with a write method)
+    without building it in memory. Returns the number of characters written.
+    """
+    start_time = time.time()
+    written = 0
+    for fragment in iter_complete_json_ld(df, df_meta, spssfile=spssfile, chunk_size=chunk_size,
+                                          process_all_rows=process_all_rows, max_rows=max_rows,
+                                          indent=indent, workers=workers):
+        sink.write(fragment)
+        written += len(fragment)
+    print(f"Streamed {written} characters of JSON-LD in {time.time() - start_time:.2f} seconds")
+    return written
 
 class MemoryManager:
     """
@@ -1585,3 +2058,340 @@ class MemoryManager:
         else:
             return optimal_chunk
 
+
+# Marker values of the N-Triples templates, see format_converter.TripleTemplate
+_ROW_MARKER = 918273645
+_VARIABLE_MARKER = 'zqvariablezq'
+_CONTENT_MARKER = 'zqcontentzq'
+_DOMAIN_MARKER = 'zqdomainzq'
+_ITEM_MARKER = 'zqitemzq'
+
+# Rows rendered at a time by iter_complete_ntriples
+NTRIPLES_BATCH_ROWS = 1000
+
+# Templates are built once per base URI, dataset reference and context
+_NTRIPLES_TEMPLATES = {}
+
+def _ntriples_templates(base_uri, dataset_reference):
+    """N-Triples templates of the row-level components, see iter_complete_ntriples"""
+    key = (base_uri, dataset_reference, json.dumps(JSON_LD_CONTEXT))
+    if key in _NTRIPLES_TEMPLATES:
+        return _NTRIPLES_TEMPLATES[key]
+
+    row, variable = _ROW_MARKER, _VARIABLE_MARKER
+    markers = {'row': row, 'variable': variable}
+    data_point = next(_variable_DataPoints(variable, row, row + 1, dataset_reference))
+    data_point_position = next(_variable_DataPointPositions(variable, row, row + 1))
+    instance_value = {
+        "@id": f"#instanceValue-{row}-{variable}",
+        "@type": "InstanceValue",
+        "content": {
+            "@type": "TypedString",
+            "content": _CONTENT_MARKER
+        },
+        "isStoredIn": f"#dataPoint-{row}-{variable}",
+        "hasValueFrom_ValueDomain": f"#{_DOMAIN_MARKER}"
+    }
+    record_segment = {
+        "@id": "#physicalRecordSegment",
+        "@type": "PhysicalRecordSegment",
+        "has_DataPointPosition": [f"#{_ITEM_MARKER}"]
+    }
+    value_mapping = {
+        "@id": f"#valueMapping-{variable}",
+        "@type": "ValueMapping",
+        "formats": [f"#{_ITEM_MARKER}"]
+    }
+
+    templates = _NTRIPLES_TEMPLATES[key] = {
+        "DataPoint": TripleTemplate(data_point, markers, base_uri, JSON_LD_CONTEXT),
+        "DataPointPosition": TripleTemplate(data_point_position, markers, base_uri, JSON_LD_CONTEXT),
+        "InstanceValue": TripleTemplate(
+            instance_value, dict(markers, content=_CONTENT_MARKER, domain=_DOMAIN_MARKER),
+            base_uri, JSON_LD_CONTEXT, literals=('content',)),
+        "PhysicalRecordSegment": CollectionTemplate(record_segment, _ITEM_MARKER, {}, base_uri, JSON_LD_CONTEXT),
+        "ValueMapping": CollectionTemplate(value_mapping, _ITEM_MARKER, {'variable': variable},
+                                           base_uri, JSON_LD_CONTEXT)
+    }
+    return templates
+
+def _metadata_json_ld(df, df_meta, spssfile, include_value_mappings, workers=None):
+    """
+    The document of a conversion without its row-level parts: no DataPoints,
+    DataPointPositions or InstanceValues, and no has_DataPointPosition or
+    ValueMapping formats. Its size grows with the variables, not the rows.
+    """
+    no_rows = df.head(0)
+    record_segment = generate_PhysicalRecordSegment(df_meta, no_rows)
+    value_mappings = generate_ValueMapping(no_rows, df_meta)
+    for value_mapping in value_mappings:
+        del value_mapping["formats"]
+
+    components = _assemble_components(
+        df_meta, spssfile, include_value_mappings,
+        record_segment=record_segment,
+        value_mappings=value_mappings,
+        data_points=[],
+        data_point_positions=[],
+        instance_values=[],
+        workers=workers
+    )
+    components_dict = wrap_in_graph(*components)
+    json_ld_doc = {
+        "@context": JSON_LD_CONTEXT,
+        "DDICDIModels": components_dict["ddi_components"]
+    }
+    if components_dict["skos_components"]:
+        json_ld_doc["@included"] = components_dict["skos_components"]
+    return encode_json_ld(json_ld_doc, indent=None)
+
+def iter_complete_ntriples(df, df_meta, spssfile='name', chunk_size=5, process_all_rows=False, max_rows=5, base_uri=None, workers=None):
+    """
+    Stream the N-Triples of the document produced by generate_complete_json_ld
+    as string fragments, straight from the DataFrame.
+
+    Takes the same parameters as generate_complete_json_ld, plus the base_uri
+    of FormatConverter.convert. Only the metadata, whose size grows with the
+    variables, is converted through rdflib. The row-level triples are rendered
+    from N-Triples templates of each component kind, built once with rdflib,
+    so they are the same triples FormatConverter.convert produces from the
+    JSON-LD, without building the JSON-LD text or a graph of the whole dataset.
+    Triples come in a different order, which N-Triples does not define anyway.
+
+    With workers > 1 and process_all_rows, the row-level triples are rendered
+    on a pool of that many worker processes, shard by row range, and written
+    in row order as the shards complete.
+    """
+    base_uri = base_uri or FormatConverter.DEFAULT_BASE_URI
+    df_limited = _limit_rows(df, chunk_size, process_all_rows, max_rows)
+    n_rows = len(df_limited)
+    include_value_mappings = max_rows > 0 or process_all_rows
+    # Variable names as they appear in the element IRIs
+    segments = [iri_segment(variable) for variable in df_meta.column_names]
+
+    metadata = _metadata_json_ld(df, df_meta, spssfile, include_value_mappings, workers)
+    metadata_ntriples = FormatConverter.convert(metadata, 'ntriples', base_uri=base_uri).decode('utf-8')
+    # rdflib writes triples in hash order; sorted, the triples of a subject are together
+    yield ''.join(sorted(metadata_ntriples.splitlines(keepends=True)))
+
+    templates = _ntriples_templates(base_uri, _get_dataset_reference(df_meta))
+    # Row-level elements hang off the same document node as the metadata, if any
+    document = templates["DataPoint"].document_node(metadata_ntriples) or "document"
+    # Rows are rendered in batches of at least NTRIPLES_BATCH_ROWS, the per-batch work is per column
+    batch_rows = max(chunk_size, NTRIPLES_BATCH_ROWS)
+    row_ranges = [(start, min(start + batch_rows, n_rows)) for start in range(0, n_rows, batch_rows)]
+
+    parallel = workers is not None and workers > 1 and process_all_rows and n_rows > chunk_size
+
+    def fragments():
+        if n_rows > 0:
+            yield from templates["PhysicalRecordSegment"].lines(
+                (f"dataPointPosition-{i}-{segment}" for segment in segments for i in range(n_rows)),
+                node_prefix="prs")
+        if include_value_mappings:
+            for j, segment in enumerate(segments):
+                yield from templates["ValueMapping"].lines(
+                    (f"dataPoint-{i}-{segment}" for i in range(n_rows)),
+                    node_prefix=f"vm{j}", variable=segment)
+
+        if parallel:
+            yield from _iter_ntriples_shards(df_limited, df_meta, templates, document, workers, batch_rows)
+            return
+        if not isinstance(df_limited, pd.DataFrame):
+            # A chunked frame is read shard by shard, shards are whole batches
+            for first_row, rows in _iter_row_shards(df_limited, _chunked_shard_size(batch_rows)):
+                frame = _InstanceValueFrame(rows, df_meta, first_row=first_row)
+                for start in range(0, len(rows), batch_rows):
+                    yield from _ntriples_rows(templates, frame, start, start + batch_rows, document)
+            return
+        frame = _InstanceValueFrame(df_limited, df_meta)
+        for start, stop in row_ranges:
+            yield from _ntriples_rows(templates, frame, start, stop, document)
+
+    yield from _buffer_fragments(fragments())
+
+def _ntriples_rows(templates, frame, start, stop, document):
+    """
+    N-Triples of the DataPoints, DataPointPositions and InstanceValues of rows
+    start..stop-1 of an _InstanceValueFrame, one fragment per variable and kind
+    """
+    segments = [iri_segment(variable) for variable in frame.column_names]
+    rows = range(frame.first_row + start, frame.first_row + min(stop, frame.n_rows))
+    data_point = templates["DataPoint"].format
+    data_point_position = templates["DataPointPosition"].format
+    for segment in segments:
+        yield ''.join(data_point(row=i, variable=segment, document=document) for i in rows)
+        yield ''.join(data_point_position(row=i, variable=segment, document=document) for i in rows)
+
+    instance_value = templates["InstanceValue"].format
+    for j, (segment, (_, contents, _, domains)) in enumerate(zip(segments, frame.columns(start, stop))):
+        yield ''.join(
+            instance_value(row=i, variable=segment, content=quote_literal(content),
+                           domain=domain[1:], bnode=f"iv{i}c{j}", document=document)
+            for i, content, domain in zip(rows, contents.tolist(), domains.tolist()))
+
+def _render_ntriples_shard(df_shard, shard_meta, start, templates, document, batch_rows):
+    """
+    Worker process task: the row-level N-Triples of the rows in df_shard, whose
+    first row is row number start, as one text
+    """
+    frame = _InstanceValueFrame(df_shard, shard_meta, first_row=start)
+    return ''.join(
+        fragment
+        for batch_start in range(0, len(df_shard), batch_rows)
+        for fragment in _ntriples_rows(templates, frame, batch_start, batch_start + batch_rows, document)
+    )
+
+def _iter_ntriples_shards(df, df_meta, templates, document, workers, batch_rows):
+    """
+    Render the row-level N-Triples of df on a pool of worker processes, shard by
+    row range, and yield the shard texts in row order. At most two shards per
+    worker are pending at a time, so memory stays bounded while all workers are busy.
+    """
+    # A few shards per worker balances the load; shards are whole batches
+    shard_size = max(1, math.ceil(len(df) / (workers * 4 * batch_rows))) * batch_rows
+    shard_meta = _ShardMeta(df_meta)
+
+    tasks = (
+        (_render_ntriples_shard, (rows, shard_meta, start, templates, document, batch_rows))
+        for start, rows in _iter_row_shards(df, shard_size)
+    )
+    yield from _iter_pool_results(tasks, workers)
+
+def write_complete_ntriples(sink, df, df_meta, spssfile='name', chunk_size=5, process_all_rows=False, max_rows=5, base_uri=None, workers=None):
+    """
+    Write the N-Triples of the document to a binary file-like sink without
+    building it in memory. Returns the number of bytes written.
+    """
+    start_time = time.time()
+    written = 0
+    for fragment in iter_complete_ntriples(df, df_meta, spssfile=spssfile, chunk_size=chunk_size,
+                                           process_all_rows=process_all_rows, max_rows=max_rows,
+                                           base_uri=base_uri, workers=workers):
+        data = fragment.encode('utf-8')
+        sink.write(data)
+        written += len(data)
+    print(f"Streamed {written} bytes of N-Triples in {time.time() - start_time:.2f} seconds")
+    return written
+
+def iter_complete_turtle(df, df_meta, spssfile='name', chunk_size=5, process_all_rows=False, max_rows=5, base_uri=None, workers=None):
+    """
+    Stream the Turtle of the document produced by generate_complete_json_ld as
+    string fragments. The triples of iter_complete_ntriples are written by
+    format_converter.TurtleWriter in the order they are generated, one block
+    per subject, so memory stays bounded as with N-Triples.
+    """
+    ntriples = iter_complete_ntriples(df, df_meta, spssfile=spssfile, chunk_size=chunk_size,
+                                      process_all_rows=process_all_rows, max_rows=max_rows,
+                                      base_uri=base_uri, workers=workers)
+    yield from _ntriples_writer('turtle', _get_dataset_reference(df_meta), base_uri)(ntriples)
+
+def iter_complete_nquads(df, df_meta, spssfile='name', chunk_size=5, process_all_rows=False, max_rows=5, base_uri=None, workers=None):
+    """
+    Stream the N-Quads of the document produced by generate_complete_json_ld as
+    string fragments: the triples of iter_complete_ntriples, in a named graph
+    whose name is the IRI of the dataset.
+    """
+    ntriples = iter_complete_ntriples(df, df_meta, spssfile=spssfile, chunk_size=chunk_size,
+                                      process_all_rows=process_all_rows, max_rows=max_rows,
+                                      base_uri=base_uri, workers=workers)
+    yield from _ntriples_writer('nquads', _get_dataset_reference(df_meta), base_uri)(ntriples)
+
+def iter_complete_rdfxml(df, df_meta, spssfile='name', chunk_size=5, process_all_rows=False, max_rows=5, base_uri=None, workers=None):
+    """
+    Stream the RDF/XML of the document produced by generate_complete_json_ld as
+    string fragments. The triples of iter_complete_ntriples are written by
+    format_converter.RdfXmlWriter, one rdf:Description per subject block.
+    """
+    ntriples = iter_complete_ntriples(df, df_meta, spssfile=spssfile, chunk_size=chunk_size,
+                                      process_all_rows=process_all_rows, max_rows=max_rows,
+                                      base_uri=base_uri, workers=workers)
+    yield from _ntriples_writer('rdfxml', _get_dataset_reference(df_meta), base_uri)(ntriples)
+
+def iter_complete_binary_rdf(df, df_meta, spssfile='name', chunk_size=5, process_all_rows=False, max_rows=5, base_uri=None, workers=None):
+    """
+    Stream the document produced by generate_complete_json_ld in the binary
+    RDF format of format_converter.BinaryRdfWriter, as bytes fragments. Read it
+    back with format_converter.iter_binary_rdf.
+    """
+    ntriples = iter_complete_ntriples(df, df_meta, spssfile=spssfile, chunk_size=chunk_size,
+                                      process_all_rows=process_all_rows, max_rows=max_rows,
+                                      base_uri=base_uri, workers=workers)
+    yield from _ntriples_writer('binary', _get_dataset_reference(df_meta), base_uri)(ntriples)
+
+def _ntriples_writer(output_format, dataset_reference, base_uri):
+    """
+    The writer of an RDF format streamed from N-Triples: a function from
+    N-Triples fragments, which may split lines anywhere, to the fragments of
+    the format
+    """
+    if output_format == 'ntriples':
+        return lambda ntriples: ntriples
+    if output_format == 'turtle':
+        return lambda ntriples: _buffer_fragments(TurtleWriter(base_uri).write(ntriples))
+    if output_format == 'nquads':
+        base_uri = base_uri or FormatConverter.DEFAULT_BASE_URI
+        graph_iri = iri_resolver(base_uri)(dataset_reference)
+        return lambda ntriples: _buffer_fragments(NQuadsWriter(graph_iri).write(ntriples))
+    if output_format == 'rdfxml':
+        return lambda ntriples: _buffer_fragments(RdfXmlWriter(base_uri).write(ntriples))
+    if output_format == 'binary':
+        return BinaryRdfWriter().write
+    raise ValueError(f"Format '{output_format}' is not streamed from N-Triples")
+
+# Characters of the N-Triples file of write_format_files read at a time
+SPOOL_READ_CHARS = 1 << 20
+
+def _write_fragments(path, fragments):
+    """Write str or bytes fragments one after the other to a new file"""
+    with open(path, 'wb') as f:
+        for fragment in fragments:
+            f.write(fragment.encode('utf-8') if isinstance(fragment, str) else fragment)
+
+def _write_ntriples_format(output_format, dataset_reference, base_uri, ntriples_path, path):
+    """Write an RDF format of _ntriples_writer to path from an N-Triples file (runs in worker processes)"""
+    writer = _ntriples_writer(output_format, dataset_reference, base_uri)
+    with open(ntriples_path, encoding='utf-8', newline='') as ntriples:
+        _write_fragments(path, writer(iter(lambda: ntriples.read(SPOOL_READ_CHARS), '')))
+
+def write_format_files(df, df_meta, formats, directory, spssfile='name', chunk_size=5, process_all_rows=False,
+                       max_rows=5, base_uri=None, workers=None, indent=4):
+    """
+    Write the document in several formats at once, e.g. for a bundle, as files
+    of directory. Returns the path of each format's file.
+
+    The triples are generated once, into the N-Triples file, while JSON-LD,
+    which is not written from triples, is generated on a thread of its own.
+    The writers of the other RDF formats of _ntriples_writer then read the
+    N-Triples file concurrently: on a pool of worker processes with
+    workers > 1, else on threads.
+    """
+    paths = {output_format: os.path.join(directory, f"{output_format}{FormatConverter.FORMATS[output_format]['extension']}")
+             for output_format in formats}
+    rdf_formats = [output_format for output_format in formats if output_format != 'jsonld']
+    ntriples_path = paths.get('ntriples', os.path.join(directory, 'triples.nt'))
+
+    json_ld = None
+    with ThreadPoolExecutor(max_workers=1) as thread:
+        if 'jsonld' in formats:
+            json_ld = thread.submit(_write_fragments, paths['jsonld'], iter_complete_json_ld(
+                df, df_meta, spssfile=spssfile, chunk_size=chunk_size, process_all_rows=process_all_rows,
+                max_rows=max_rows, indent=indent, workers=workers))
+        if rdf_formats:
+            _write_fragments(ntriples_path, iter_complete_ntriples(
+                df, df_meta, spssfile=spssfile, chunk_size=chunk_size, process_all_rows=process_all_rows,
+                max_rows=max_rows, base_uri=base_uri, workers=workers))
+            dataset_reference = _get_dataset_reference(df_meta)
+            written_formats = [output_format for output_format in rdf_formats if output_format != 'ntriples']
+            if written_formats:
+                parallel = workers is not None and workers > 1
+                pool = (ProcessPoolExecutor(max_workers=min(workers, len(written_formats))) if parallel
+                        else ThreadPoolExecutor(max_workers=len(written_formats)))
+                with pool:
+                    for future in [pool.submit(_write_ntriples_format, output_format, dataset_reference,
+                                               base_uri, ntriples_path, paths[output_format])
+                                   for output_format in written_formats]:
+                        future.result()
+        if json_ld is not None:
+            json_ld.result()
+    return paths
@@ -11,16 +11,24 @@ from functools import wraps
 import tempfile
 import os
 import base64
-from DDICDI_converter_JSONLD_incremental import generate_complete_json_ld, MemoryManager
-from spss_import import read_sav, read_csv, read_json
-from format_converter import FormatConverter
+from DDICDI_converter_JSONLD_incremental import (
+    generate_complete_json_ld, iter_complete_json_ld, iter_complete_ntriples, iter_complete_turtle,
+    iter_complete_nquads, iter_complete_rdfxml, iter_complete_binary_rdf, write_format_files, MemoryManager
+)
+from spss_import import read_sav, read_sav_chunks, read_csv, read_json, ChunkedFrame
+from format_converter import FormatConverter, write_bundle
 import io
+import itertools
 import json
 
 # API Configuration
 API_KEY_ENV_VAR = 'DDI_API_KEY'
 DEFAULT_MAX_ROWS = 5
 DEFAULT_OUTPUT_FORMAT = 'jsonld'
+BUNDLE_FORMAT = 'bundle'
+# Bytes of a bundle member's file copied into the archive at a time
+BUNDLE_READ_BYTES = 1 << 20
+WORKERS_ENV_VAR = 'DDI_WORKERS'
 
 def require_api_key(f):
     """Decorator to require API key authentication"""
@@ -74,10 +82,13 @@ def register_api_routes(server):
         Request:
             - Multipart form data with 'file' field
             - Optional form fields:
-                - output_format: Output RDF format ('jsonld', 'turtle', 'ntriples') [default: 'jsonld']
+                - output_format: Output RDF format ('jsonld', 'turtle', 'ntriples', 'nquads', 'rdfxml', 'binary'), or 'bundle' for a zip archive [default: 'jsonld']
+                - bundle_formats: Comma-separated formats of a bundle (default: all formats)
                 - base_uri: Base URI for instance data [default: http://example.org/ddi/]
                 - max_rows: Number of rows to process (default: 5)
                 - process_all_rows: 'true' to process all rows (default: 'false')
+                - workers: Worker processes for process_all_rows conversions (default: DDI_WORKERS env var or serial)
+                - compact: 'true' for compact JSON-LD without whitespace (default: 'false')
                 - decompose_keys: 'true' to decompose hierarchical JSON keys (default: 'false')
                 - variable_roles: JSON string with role assignments
 
@@ -106,15 +117,28 @@ def register_api_routes(server):
         # Validate format
         try:
             format_info = FormatConverter.get_format_info(output_format)
+            if output_format == BUNDLE_FORMAT:
+                format_info = FormatConverter.BUNDLE
             if not format_info:
                 raise ValueError(f"Unsupported format: {output_format}")
         except ValueError as e:
             return jsonify({
                 'error': 'Invalid output_format parameter',
                 'message': str(e),
-                'supported_formats': list(FormatConverter.FORMATS.keys())
+                'supported_formats': list(FormatConverter.FORMATS.keys()) + [BUNDLE_FORMAT]
             }), 400
 
+        bundle_formats = None
+        if output_format == BUNDLE_FORMAT:
+            try:
+                bundle_formats = FormatConverter.bundle_formats(request.form.get('bundle_formats'))
+            except ValueError as e:
+                return jsonify({
+                    'error': 'Invalid bundle_formats parameter',
+                    'message': str(e),
+                    'supported_formats': list(FormatConverter.FORMATS.keys())
+                }), 400
+
         # Get optional base URI (defaults to environment variable or FormatConverter default)
         base_uri = request.form.get('base_uri', os.environ.get('DDI_BASE_URI', None))
 
@@ -128,7 +152,18 @@ def register_api_routes(server):
             }), 400
 
         process_all_rows = request.form.get('process_all_rows', 'false').lower() == 'true'
+
+        workers = request.form.get('workers', os.environ.get(WORKERS_ENV_VAR))
+        if workers is not None:
+            try:
+                workers = int(workers)
+            except ValueError:
+                return jsonify({
+                    'error': 'Invalid workers parameter',
+                    'message': 'workers must be an integer'
+                }), 400
         decompose_keys = request.form.get('decompose_keys', 'false').lower() == 'true'
+        compact = request.form.get('compact', 'false').lower() == 'true'
 
         # Parse variable roles if provided
         variable_roles = {}
@@ -151,12 +186,19 @@ def register_api_routes(server):
             # Determine file type and read file
             filename_lower = file.filename.lower()
 
-            if filename_lower.endswith('.sav') or filename_lower.endswith('.dta'):
-                df, df_meta, _, _ = read_sav(temp_path)
+            # Sample conversions only read the rows they convert
+            row_limit = None if process_all_rows else max(max_rows, 0)
+
+            if (filename_lower.endswith('.sav') or filename_lower.endswith('.dta')) and process_all_rows:
+                # The rows are read chunk by chunk while they are converted
+                df, df_meta, _, _ = read_sav_chunks(temp_path)
+            elif filename_lower.endswith('.sav') or filename_lower.endswith('.dta'):
+                # Structure-only conversions need the file header, not the data
+                df, df_meta, _, _ = read_sav(temp_path, metadata_only=row_limit == 0, row_limit=row_limit)
             elif filename_lower.endswith('.csv'):
-                df, df_meta, _, _ = read_csv(temp_path)
+                df, df_meta, _, _ = read_csv(temp_path, row_limit=row_limit)
             elif filename_lower.endswith('.json'):
-                df, df_meta, _, _ = read_json(temp_path, decompose_keys=decompose_keys)
+                df, df_meta, _, _ = read_json(temp_path, decompose_keys=decompose_keys, row_limit=row_limit)
             else:
                 return jsonify({
                     'error': 'Unsupported file format',
@@ -223,13 +265,94 @@ def register_api_routes(server):
                         elif role == 'variabledescriptor':
                             df_meta.variable_descriptor_vars.append(var_name)
 
+            # Add Content-Disposition header for file download
+            base_filename = os.path.splitext(file.filename)[0]
+            download_filename = f"{base_filename}_DDICDI{format_info['extension']}"
+
+            # The RDF formats are streamed straight from the DataFrame, without JSON-LD or rdflib
+            streaming_writers = {
+                'ntriples': iter_complete_ntriples,
+                'turtle': iter_complete_turtle,
+                'nquads': iter_complete_nquads,
+                'rdfxml': iter_complete_rdfxml,
+                'binary': iter_complete_binary_rdf
+            }
+
+            # A bundle writes every format into a file of its own at once, then
+            # zips the files; see write_format_files
+            if bundle_formats:
+                archive = tempfile.TemporaryFile()
+                with tempfile.TemporaryDirectory() as directory:
+                    paths = write_format_files(
+                        df=df, df_meta=df_meta, formats=bundle_formats, directory=directory,
+                        spssfile=file.filename, max_rows=max_rows, process_all_rows=process_all_rows,
+                        base_uri=base_uri, workers=workers, indent=None if compact else 4
+                    )
+
+                    def members():
+                        for fmt in bundle_formats:
+                            with open(paths[fmt], 'rb') as member:
+                                yield (f"{base_filename}_DDICDI{FormatConverter.FORMATS[fmt]['extension']}",
+                                       iter(lambda: member.read(BUNDLE_READ_BYTES), b''))
+
+                    write_bundle(members(), archive)
+                archive.seek(0)
+                return send_file(
+                    archive,
+                    mimetype=format_info['mimetype'],
+                    as_attachment=True,
+                    download_name=download_filename
+                ), 200
+            fragments = None
+            if output_format in streaming_writers:
+                fragments = streaming_writers[output_format](
+                    df=df,
+                    df_meta=df_meta,
+                    spssfile=file.filename,
+                    max_rows=max_rows,
+                    process_all_rows=process_all_rows,
+                    base_uri=base_uri,
+                    workers=workers
+                )
+            elif process_all_rows:
+                # Whole datasets are streamed as JSON-LD too, rather than joined in memory
+                fragments = iter_complete_json_ld(
+                    df=df,
+                    df_meta=df_meta,
+                    spssfile=file.filename,
+                    max_rows=max_rows,
+                    process_all_rows=process_all_rows,
+                    workers=workers,
+                    indent=None if compact else 4
+                )
+            if fragments is not None:
+                # The metadata comes first; errors in it still get a 500 response
+                first_fragment = next(fragments)
+
+                def stream():
+                    # Binary RDF comes as bytes, the text formats as str
+                    for fragment in itertools.chain([first_fragment], fragments):
+                        yield fragment if isinstance(fragment, bytes) else fragment.encode('utf-8')
+
+                response = Response(stream(), mimetype=format_info['mimetype'])
+                response.headers['Content-Disposition'] = (
+                    f'attachment; filename="{download_filename}"'
+                )
+                if isinstance(df, ChunkedFrame):
+                    # The rows are still read from the file while the response streams
+                    response.call_on_close(lambda: os.unlink(temp_path))
+                    temp_file = None
+                return response, 200
+
             # Generate DDI-CDI JSON-LD
             json_ld_output = generate_complete_json_ld(
                 df=df,
                 df_meta=df_meta,
                 spssfile=file.filename,
                 max_rows=max_rows,
-                process_all_rows=process_all_rows
+                process_all_rows=process_all_rows,
+                workers=workers,
+                indent=None if compact else 4
             )
 
             # Convert to requested format
@@ -251,9 +374,6 @@ def register_api_routes(server):
                 mimetype=format_info['mimetype']
             )
 
-            # Add Content-Disposition header for file download
-            base_filename = os.path.splitext(file.filename)[0]
-            download_filename = f"{base_filename}_DDICDI{format_info['extension']}"
             response.headers['Content-Disposition'] = (
                 f'attachment; filename="{download_filename}"'
             )
@@ -305,11 +425,21 @@ def register_api_routes(server):
             },
             'supported_input_formats': ['.sav', '.dta', '.csv', '.json'],
             'supported_output_formats': formats_info,
+            'bundle': {
+                'output_format': BUNDLE_FORMAT,
+                'name': FormatConverter.BUNDLE['name'],
+                'mimetype': FormatConverter.BUNDLE['mimetype'],
+                'extension': FormatConverter.BUNDLE['extension'],
+                'description': FormatConverter.BUNDLE['description']
+            },
             'parameters': {
-                'output_format': f'Output RDF format (default: "{DEFAULT_OUTPUT_FORMAT}")',
+                'output_format': f'Output RDF format, or "{BUNDLE_FORMAT}" for a zip archive (default: "{DEFAULT_OUTPUT_FORMAT}")',
+                'bundle_formats': 'Comma-separated formats of a bundle (default: all formats)',
                 'base_uri': 'Base URI for instance data (default: http://example.org/ddi/ or DDI_BASE_URI env var)',
                 'max_rows': 'Number of rows to process (default: 5)',
                 'process_all_rows': 'Process all rows: true/false (default: false)',
+                'workers': 'Worker processes for process_all_rows conversions (default: serial or DDI_WORKERS env var)',
+                'compact': 'Compact JSON-LD without whitespace: true/false (default: false)',
                 'decompose_keys': 'Decompose JSON hierarchical keys: true/false (default: false)',
                 'variable_roles': 'JSON object with variable role assignments'
             }
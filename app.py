@@ -11,6 +11,7 @@ from dash.dependencies import Input, Output, State
 import dash_bootstrap_components as dbc
 from DDICDI_converter_JSONLD_incremental import (
     generate_complete_json_ld,
+    compact_json_ld,
     MemoryManager
 )
 from spss_import import read_sav, read_csv, read_json, create_variable_view, create_variable_view2
@@ -377,7 +378,11 @@ app.layout = dbc.Container([
                     options=[
                         {'label': 'JSON-LD (.jsonld)', 'value': 'jsonld'},
                         {'label': 'Turtle (.ttl) - Human-readable', 'value': 'turtle'},
-                        {'label': 'N-Triples (.nt) - Simple line-based', 'value': 'ntriples'}
+                        {'label': 'N-Triples (.nt) - Simple line-based', 'value': 'ntriples'},
+                        {'label': 'N-Quads (.nq) - Named graph per dataset', 'value': 'nquads'},
+                        {'label': 'RDF/XML (.rdf)', 'value': 'rdfxml'},
+                        {'label': 'Binary RDF (.rdfb) - Compressed archive', 'value': 'binary'},
+                        {'label': 'All formats (.zip) - One archive', 'value': 'bundle'}
                     ],
                     value='jsonld',
                     clearable=False,
@@ -394,6 +399,18 @@ app.layout = dbc.Container([
                           id='btn-download-format',
                           color="primary",
                           className="mr-1"),
+                # The on-screen preview stays pretty-printed; this only affects JSON-LD downloads
+                dbc.Switch(
+                    id="compact-json",
+                    label="Compact JSON-LD (no whitespace)",
+                    value=False,
+                    style={
+                        'display': 'inline-block',
+                        'marginLeft': '15px',
+                        'verticalAlign': 'middle',
+                        'color': colors['secondary']
+                    }
+                ),
             ], style=get_button_group_style(visible=False), id='download-controls'),
             # Add switch using dbc.Switch
             dbc.Switch(
@@ -769,26 +786,26 @@ def combined_callback(contents, selected_rows, include_metadata, decompose_keys,
                 if include_metadata:
                     data_subset = df
                     if process_all_rows:
-                        instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include ALL {len(df)} rows."
-                    elif len(df) > MAX_ROWS_TO_PROCESS:
-                        instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include up to {MAX_ROWS_TO_PROCESS} rows due to performance limitations."
+                        instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include ALL {df_meta.number_rows} rows."
+                    elif df_meta.number_rows > MAX_ROWS_TO_PROCESS:
+                        instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include up to {MAX_ROWS_TO_PROCESS} rows due to performance limitations."
                     else:
-                        instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include all {len(df)} rows."
+                        instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include all {df_meta.number_rows} rows."
                 else:
                     data_subset = df.head(0)
-                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will not include any data rows."
+                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will not include any data rows."
             else:
                 # For other triggers, maintain the current state
                 data_subset = df if include_metadata else df.head(0)
                 if include_metadata:
                     if process_all_rows:
-                        instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include ALL {len(df)} rows."
-                    elif len(df) > MAX_ROWS_TO_PROCESS:
-                        instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include up to {MAX_ROWS_TO_PROCESS} rows due to performance limitations."
+                        instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include ALL {df_meta.number_rows} rows."
+                    elif df_meta.number_rows > MAX_ROWS_TO_PROCESS:
+                        instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include up to {MAX_ROWS_TO_PROCESS} rows due to performance limitations."
                     else:
-                        instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include all {len(df)} rows."
+                        instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include all {df_meta.number_rows} rows."
                 else:
-                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will not include any data rows."
+                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will not include any data rows."
             
             # Create instruction text for table2 (column view)
             instruction_text2 = f"The table below shows all {len(df.columns)} columns from the dataset '{filename}'. Please select the appropriate role for each variable (column)."
@@ -850,17 +867,20 @@ def combined_callback(contents, selected_rows, include_metadata, decompose_keys,
                 tmp_file.write(decoded)
                 tmp_filename = tmp_file.name
 
+            # Only the rows the app shows and converts are read, unless all rows are processed
+            row_limit = None if process_all_rows else max(PREVIEW_ROWS, MAX_ROWS_TO_PROCESS)
+
             if '.dta' in tmp_filename or '.sav' in tmp_filename:
-                df, df_meta, file_name, n_rows = read_sav(tmp_filename)
+                df, df_meta, file_name, n_rows = read_sav(tmp_filename, row_limit=row_limit)
                 df2 = create_variable_view2(df_meta) if '.dta' in tmp_filename else create_variable_view(df_meta)
             elif '.csv' in tmp_filename:
                 print("Reading file using read_csv")
                 # Use automatic delimiter detection and handle date formats
-                df, df_meta, file_name, n_rows = read_csv(tmp_filename, delimiter=None, dayfirst=False)
+                df, df_meta, file_name, n_rows = read_csv(tmp_filename, delimiter=None, dayfirst=False, row_limit=row_limit)
                 df2 = create_variable_view(df_meta)  # Use standard variable view for CSV
             elif '.json' in tmp_filename:
                 print("Reading file using read_json")
-                df, df_meta, file_name, n_rows = read_json(tmp_filename, decompose_keys=decompose_keys)
+                df, df_meta, file_name, n_rows = read_json(tmp_filename, decompose_keys=decompose_keys, row_limit=row_limit)
                 df2 = create_variable_view(df_meta)  # Use standard variable view for JSON
             else:
                 raise ValueError(f"Unsupported file type. File must be .sav, .dta, .csv, or .json, got: {tmp_filename}")
@@ -970,13 +990,13 @@ def combined_callback(contents, selected_rows, include_metadata, decompose_keys,
 
             if include_metadata:
                 if process_all_rows:
-                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include ALL {len(df)} rows."
-                elif len(df) > MAX_ROWS_TO_PROCESS:
-                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include up to {MAX_ROWS_TO_PROCESS} rows due to performance limitations."
+                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include ALL {df_meta.number_rows} rows."
+                elif df_meta.number_rows > MAX_ROWS_TO_PROCESS:
+                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include up to {MAX_ROWS_TO_PROCESS} rows due to performance limitations."
                 else:
-                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include all {len(df)} rows."
+                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include all {df_meta.number_rows} rows."
             else:
-                instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will not include any data rows."
+                instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will not include any data rows."
 
             # Create instruction text for table2 (column view)
             instruction_text2 = f"The table below shows all {len(df.columns)} columns from the dataset '{filename}'. Please select the appropriate role for each variable (column)."
@@ -1128,19 +1148,20 @@ def combined_callback(contents, selected_rows, include_metadata, decompose_keys,
             tmp_filename = tmp_file.name
 
         print("Step 3: About to read file")
-        # Read data based on file type
+        # Read data based on file type, only the rows the app shows and converts unless all rows are processed
+        row_limit = None if process_all_rows else max(PREVIEW_ROWS, MAX_ROWS_TO_PROCESS)
         if '.dta' in tmp_filename or '.sav' in tmp_filename:
             print("Reading file using read_sav") 
-            df, df_meta, file_name, n_rows = read_sav(tmp_filename)
+            df, df_meta, file_name, n_rows = read_sav(tmp_filename, row_limit=row_limit)
             df2 = create_variable_view2(df_meta) if '.dta' in tmp_filename else create_variable_view(df_meta)
         elif '.csv' in tmp_filename:
             print("Reading file using read_csv")
             # Use automatic delimiter detection and handle date formats
-            df, df_meta, file_name, n_rows = read_csv(tmp_filename, delimiter=None, dayfirst=False)
+            df, df_meta, file_name, n_rows = read_csv(tmp_filename, delimiter=None, dayfirst=False, row_limit=row_limit)
             df2 = create_variable_view(df_meta)  # Use standard variable view for CSV
         elif '.json' in tmp_filename:
             print("Reading file using read_json")
-            df, df_meta, file_name, n_rows = read_json(tmp_filename, decompose_keys=decompose_keys)
+            df, df_meta, file_name, n_rows = read_json(tmp_filename, decompose_keys=decompose_keys, row_limit=row_limit)
             df2 = create_variable_view(df_meta)  # Use standard variable view for JSON
         else:
             raise ValueError(f"Unsupported file type. File must be .sav, .dta, .csv, or .json, got: {tmp_filename}")
@@ -1244,26 +1265,26 @@ def combined_callback(contents, selected_rows, include_metadata, decompose_keys,
             if include_metadata:
                 data_subset = df
                 if process_all_rows:
-                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include ALL {len(df)} rows."
-                elif len(df) > MAX_ROWS_TO_PROCESS:
-                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include up to {MAX_ROWS_TO_PROCESS} rows due to performance limitations."
+                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include ALL {df_meta.number_rows} rows."
+                elif df_meta.number_rows > MAX_ROWS_TO_PROCESS:
+                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include up to {MAX_ROWS_TO_PROCESS} rows due to performance limitations."
                 else:
-                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include all {len(df)} rows."
+                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include all {df_meta.number_rows} rows."
             else:
                 data_subset = df.head(0)
-                instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will not include any data rows."
+                instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will not include any data rows."
         else:
             # For other triggers, maintain the current state
             data_subset = df if include_metadata else df.head(0)
             if include_metadata:
                 if process_all_rows:
-                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include ALL {len(df)} rows."
-                elif len(df) > MAX_ROWS_TO_PROCESS:
-                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include up to {MAX_ROWS_TO_PROCESS} rows due to performance limitations."
+                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include ALL {df_meta.number_rows} rows."
+                elif df_meta.number_rows > MAX_ROWS_TO_PROCESS:
+                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include up to {MAX_ROWS_TO_PROCESS} rows due to performance limitations."
                 else:
-                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will include all {len(df)} rows."
+                    instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will include all {df_meta.number_rows} rows."
             else:
-                instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {len(df)} rows from the dataset '{filename}'. The generated JSON-LD output will not include any data rows."
+                instruction_text1 = f"The table below shows the first {PREVIEW_ROWS} of {df_meta.number_rows} rows from the dataset '{filename}'. The generated JSON-LD output will not include any data rows."
 
         # Create instruction text for table2 (column view)
         instruction_text2 = f"The table below shows all {len(df.columns)} columns from the dataset '{filename}'. Please select the appropriate role for each variable (column)."
@@ -1401,9 +1422,10 @@ def switch_table(n_clicks, style1, style2):
     [State('output-format-dropdown', 'value'),
      State('full-json-store', 'data'),
      State('json-ld-output', 'children'),
-     State('upload-data', 'filename')]
+     State('upload-data', 'filename'),
+     State('compact-json', 'value')]
 )
-def download_format(n_clicks, output_format, full_json, displayed_json, filename):
+def download_format(n_clicks, output_format, full_json, displayed_json, filename, compact=False):
     """Unified download callback for all RDF formats"""
     if n_clicks is None or n_clicks == 0:
         raise PreventUpdate
@@ -1424,6 +1446,21 @@ def download_format(n_clicks, output_format, full_json, displayed_json, filename
         # Get base URI from environment or use default
         base_uri = os.environ.get('DDI_BASE_URI', None)
 
+        # The stored document is pretty-printed for the preview
+        if compact and output_format in ('jsonld', 'bundle'):
+            json_data = compact_json_ld(json_data)
+
+        base_filename = os.path.splitext(filename)[0] if filename else 'output'
+
+        # All formats in one zip archive, converted from a single parse
+        if output_format == 'bundle':
+            archive = FormatConverter.bundle(json_data, base_uri=base_uri, basename=base_filename)
+            return dict(
+                content=base64.b64encode(archive).decode('ascii'),
+                filename=f"{base_filename}_DDICDI{FormatConverter.BUNDLE['extension']}",
+                base64=True
+            )
+
         # Convert to requested format using FormatConverter
         output_content = FormatConverter.convert(
             json_data,
@@ -1435,9 +1472,15 @@ def download_format(n_clicks, output_format, full_json, displayed_json, filename
         format_info = FormatConverter.get_format_info(output_format)
 
         # Create download filename
-        base_filename = os.path.splitext(filename)[0] if filename else 'output'
         download_filename = f"{base_filename}_DDICDI{format_info['extension']}"
 
+        if format_info.get('binary'):
+            return dict(
+                content=base64.b64encode(output_content).decode('ascii'),
+                filename=download_filename,
+                base64=True
+            )
+
         return dict(
             content=output_content.decode('utf-8'),
             filename=download_filename
@@ -1458,9 +1501,9 @@ def download_format(n_clicks, output_format, full_json, displayed_json, filename
 def show_performance_warning(data, include_metadata, process_all_rows):
     # Only show warning if we have data and include_metadata is True
     if data and include_metadata and 'df' in globals():
-        if len(df) > MAX_ROWS_TO_PROCESS:
+        if df_meta.number_rows > MAX_ROWS_TO_PROCESS:
             if process_all_rows:
-                warning_text = f"Warning: Processing all {len(df)} rows in chunks of {CHUNK_SIZE}. This may take significantly longer. The generated JSON-LD will include all rows."
+                warning_text = f"Warning: Processing all {df_meta.number_rows} rows in chunks of {CHUNK_SIZE}. This may take significantly longer. The generated JSON-LD will include all rows."
             else:
                 warning_text = f"Warning: For performance reasons, only the first {MAX_ROWS_TO_PROCESS} rows will be included in the JSON-LD output."
             
@@ -1496,8 +1539,8 @@ def toggle_process_all_rows(include_metadata, data):
     [Input('table1', 'data')]
 )
 def update_process_all_rows_label(data):
-    if 'df' in globals() and len(df) > 0:
-        return f"Process ALL {len(df)} rows in chunks of {CHUNK_SIZE} (may be slow for large datasets)"
+    if 'df' in globals() and df_meta.number_rows > 0:
+        return f"Process ALL {df_meta.number_rows} rows in chunks of {CHUNK_SIZE} (may be slow for large datasets)"
     else:
         return f"Process ALL rows in chunks of {CHUNK_SIZE} (may be slow for large datasets)"
 
@@ -1555,7 +1598,7 @@ def update_progress_info(include_metadata, process_all_rows, data, json_output,
         
         # Add completion time to the message
         if 'df' in globals():
-            row_count = len(df)
+            row_count = df_meta.number_rows
             if process_all_rows and row_count > MAX_ROWS_TO_PROCESS:
                 return f"✅ COMPLETED: All {row_count} rows processed successfully!{time_info} JSON-LD is ready for download.", base_style
             elif include_metadata:
@@ -1571,15 +1614,15 @@ def update_progress_info(include_metadata, process_all_rows, data, json_output,
         return "❌ Error: Processing failed. Please try again or check the logs.", base_style
     
     # If process_all_rows is True and we have a lot of data, show detailed message
-    if process_all_rows and 'df' in globals() and len(df) > MAX_ROWS_TO_PROCESS:
+    if process_all_rows and 'df' in globals() and df_meta.number_rows > MAX_ROWS_TO_PROCESS:
         # Calculate actual chunk size (it might be dynamic)
         try:
             actual_chunk_size = MemoryManager.optimize_chunk_size(df, df_meta)
         except:
             actual_chunk_size = CHUNK_SIZE
             
-        total_chunks = (len(df) + actual_chunk_size - 1) // actual_chunk_size
-        return f"⏳ Processing {len(df)} rows in {total_chunks} chunks of ~{actual_chunk_size} rows. Please wait...", base_style
+        total_chunks = (df_meta.number_rows + actual_chunk_size - 1) // actual_chunk_size
+        return f"⏳ Processing {df_meta.number_rows} rows in {total_chunks} chunks of ~{actual_chunk_size} rows. Please wait...", base_style
     
     # Default processing message
     return "⏳ Generating JSON-LD... Please wait...", base_style
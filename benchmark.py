@@ -0,0 +1,223 @@
+"""
+Performance benchmarks for the DDI-CDI converter
+
+Usage:
+    python benchmark.py [--variables N] [--conversion-variables N] [--conversion-rows N]
+                        [--encoding-variables N] [--encoding-rows N]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from rdflib import Graph, URIRef
+
+from DDICDI_converter_JSONLD_incremental import (
+    RoleIndex,
+    SchemaPlan,
+    _InstanceValueFrame,
+    _encode_items,
+    generate_complete_json_ld,
+    generate_WideDataStructure,
+    generate_MeasureComponent,
+    generate_IdentifierComponent,
+    generate_AttributeComponent,
+    generate_ComponentPosition,
+    generate_PrimaryKey,
+    generate_PrimaryKeyComponent
+)
+from format_converter import FormatConverter
+
+
+class BenchmarkMetadata:
+    """Minimal pyreadstat-like metadata for a wide schema"""
+    def __init__(self, n_variables):
+        self.column_names = [f"v{i}" for i in range(n_variables)]
+        # One identifier and attribute in ten, the rest are measures
+        self.identifier_vars = self.column_names[::10]
+        self.attribute_vars = self.column_names[5::10]
+        identifier_or_attribute = set(self.identifier_vars) | set(self.attribute_vars)
+        self.measure_vars = [v for v in self.column_names if v not in identifier_or_attribute]
+        self.contextual_vars = []
+        self.synthetic_id_vars = []
+        self.variable_value_vars = []
+
+        # Labels, types and measures as read from an SPSS file
+        self.column_labels = [f"Variable {i}" for i in range(n_variables)]
+        self.original_variable_types = {v: "F8.2" for v in self.column_names}
+        self.readstat_variable_types = {v: "double" for v in self.column_names}
+        self.variable_measure = {v: "nominal" for v in self.column_names}
+        # Every third variable is labelled, every other one has a missing value code
+        self.variable_value_labels = {
+            v: {1.0: "Yes", 2.0: "No", 9.0: "Don't know"} for v in self.column_names[::3]
+        }
+        self.missing_ranges = {v: [{"lo": 9.0, "hi": 9.0}] for v in self.column_names[::2]}
+        self.missing_user_values = {}
+        self.number_rows = 0
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    print(f"  {label:<32} {time.perf_counter() - start:8.3f} s")
+    return result
+
+
+def traced(label, func, *args):
+    """Like timed, also reporting the peak memory allocated by func"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<32} {elapsed:8.3f} s {peak / 2**20:8.1f} MiB peak")
+    return result
+
+
+def parse_via_temp_file(jsonld_string, base_uri):
+    """
+    The previous parse path of FormatConverter: write the document to a temp
+    file, parse it, and copy every triple into a second graph with the file:///
+    IRIs moved to the base URI
+    """
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.jsonld', delete=False, encoding='utf-8') as f:
+        f.write(jsonld_string)
+    try:
+        source_graph = Graph()
+        source_graph.parse(f.name, format='json-ld')
+    finally:
+        os.unlink(f.name)
+
+    def transform(term):
+        if str(term).startswith('file:///'):
+            return URIRef(base_uri + '#' + str(term).split('#', 1)[1])
+        return term
+
+    target_graph = Graph()
+    for s, p, o in source_graph:
+        target_graph.add((transform(s), p, transform(o)))
+    return target_graph
+
+
+def benchmark_role_index(n_variables):
+    """Structure component generation with a role index shared by all generators"""
+    print(f"Role index and structure components, {n_variables} variables")
+    meta = BenchmarkMetadata(n_variables)
+    start = time.perf_counter()
+    role_index = timed("RoleIndex", RoleIndex, meta)
+    timed("generate_WideDataStructure", generate_WideDataStructure, meta, role_index)
+    timed("generate_MeasureComponent", generate_MeasureComponent, meta, role_index)
+    timed("generate_IdentifierComponent", generate_IdentifierComponent, meta, role_index)
+    timed("generate_AttributeComponent", generate_AttributeComponent, meta, role_index)
+    timed("generate_PrimaryKey", generate_PrimaryKey, meta, role_index)
+    timed("generate_PrimaryKeyComponent", generate_PrimaryKeyComponent, meta, role_index)
+    timed("generate_ComponentPosition", generate_ComponentPosition, meta, role_index)
+    print(f"  {'total':<32} {time.perf_counter() - start:8.3f} s")
+
+
+def benchmark_schema_plan(n_variables):
+    """Metadata-only conversion, where all variable metadata comes from one schema plan"""
+    print(f"Schema plan and metadata-only conversion, {n_variables} variables")
+    meta = BenchmarkMetadata(n_variables)
+    df = pd.DataFrame(columns=meta.column_names)
+    timed("SchemaPlan", SchemaPlan, meta)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        generate_complete_json_ld(df, meta, "benchmark.sav", max_rows=0)
+        elapsed = time.perf_counter() - start
+    print(f"  {'generate_complete_json_ld':<32} {elapsed:8.3f} s")
+
+
+def offline_context(document):
+    """
+    A stand-in for the remote DDI-CDI context, so the parse benchmark runs
+    offline: the DDI-CDI vocabulary, and references for every property with
+    '#...' values
+    """
+    references = set()
+
+    def collect(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                values = value if isinstance(value, list) else [value]
+                if any(isinstance(v, str) and v.startswith('#') for v in values) and not key.startswith('@'):
+                    references.add(key)
+                collect(value)
+        elif isinstance(node, list):
+            for item in node:
+                collect(item)
+
+    collect(document)
+    context = {"@vocab": FormatConverter.DEFAULT_NAMESPACE_BINDINGS['ddi']}
+    context.update({key: {"@type": "@id"} for key in references})
+    return context
+
+
+def benchmark_format_conversion(n_variables, n_rows):
+    """Parsing the JSON-LD of a conversion into the graph serialized to Turtle and N-Triples"""
+    print(f"JSON-LD parsing for RDF output, {n_rows} rows x {n_variables} variables")
+    meta = BenchmarkMetadata(n_variables)
+    meta.number_rows = n_rows
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.integers(1, 10, size=(n_rows, n_variables)).astype(float),
+                      columns=meta.column_names)
+    with contextlib.redirect_stdout(io.StringIO()):
+        jsonld = generate_complete_json_ld(df, meta, "benchmark.sav", process_all_rows=True, indent=None)
+    document = json.loads(jsonld)
+    document["@context"] = offline_context(document)
+    jsonld = json.dumps(document, separators=(',', ':'))
+    print(f"  {'JSON-LD document':<32} {len(jsonld) / 2**20:8.1f} MiB")
+    base_uri = FormatConverter.DEFAULT_BASE_URI
+    previous = traced("temp file and graph copy", parse_via_temp_file, jsonld, base_uri)
+    graph = traced("FormatConverter.parse", FormatConverter.parse, jsonld, base_uri)
+    print(f"  {'triples':<32} {len(graph):8d} ({len(previous)} before)")
+
+
+def benchmark_row_encoding(n_variables, n_rows, chunk_size=1000):
+    """
+    JSON-LD of a conversion of all rows: InstanceValues encoded from one dict
+    per cell, as before, and column by column from an element template
+    """
+    print(f"Row-level JSON-LD encoding, {n_rows} rows x {n_variables} variables")
+    meta = BenchmarkMetadata(n_variables)
+    meta.number_rows = n_rows
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.integers(1, 10, size=(n_rows, n_variables)).astype(float),
+                      columns=meta.column_names)
+    frame = _InstanceValueFrame(df, meta)
+    # Elements of DDICDIModels are at depth 2 of the document
+    per_cell = timed("InstanceValue dicts", lambda: _encode_items(frame.elements(), 4, 2))
+    per_column = timed("InstanceValue columns", lambda: frame.encoded(0, n_rows, 4, 2))
+    assert per_cell == per_column
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        generate_complete_json_ld(df, meta, "benchmark.sav", process_all_rows=True, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+    print(f"  {'generate_complete_json_ld':<32} {elapsed:8.3f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DDI-CDI converter benchmarks")
+    parser.add_argument("--variables", type=int, default=50000,
+                        help="Number of variables in the synthetic schema (default: 50000)")
+    parser.add_argument("--conversion-variables", type=int, default=50,
+                        help="Number of variables of the RDF conversion benchmark (default: 50)")
+    parser.add_argument("--conversion-rows", type=int, default=100,
+                        help="Number of rows of the RDF conversion benchmark (default: 100)")
+    parser.add_argument("--encoding-variables", type=int, default=40,
+                        help="Number of variables of the row encoding benchmark (default: 40)")
+    parser.add_argument("--encoding-rows", type=int, default=20000,
+                        help="Number of rows of the row encoding benchmark (default: 20000)")
+    args = parser.parse_args()
+
+    benchmark_role_index(args.variables)
+    benchmark_schema_plan(args.variables)
+    benchmark_format_conversion(args.conversion_variables, args.conversion_rows)
+    benchmark_row_encoding(args.encoding_variables, args.encoding_rows)
@@ -6,9 +6,113 @@ RDF Format Conversion Utilities for DDI-CDI Converter
 Provides conversion between JSON-LD and other RDF serializations
 """
 
-from rdflib import Graph, URIRef
-import tempfile
+from rdflib import ConjunctiveGraph, Graph, Literal, URIRef
+from rdflib.plugins.parsers.jsonld import Parser as JsonLdParser
+from jsonld_context import rdflib_context, install_pyld_document_loader, iri_resolver
+from xml.sax.saxutils import escape as xml_escape, quoteattr
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import io
+import json
 import os
+import re
+import threading
+import zipfile
+import zlib
+
+# pyld resolves contexts through the same bundled copies and cache as rdflib
+install_pyld_document_loader()
+
+RDF_FIRST = '<http://www.w3.org/1999/02/22-rdf-syntax-ns#first>'
+RDF_REST = '<http://www.w3.org/1999/02/22-rdf-syntax-ns#rest>'
+RDF_NIL = '<http://www.w3.org/1999/02/22-rdf-syntax-ns#nil>'
+
+_BLANK_NODE = re.compile(r'_:(\w+)')
+
+
+def quote_literal(value):
+    """Quote a string as the lexical form of an N-Triples literal, exactly like rdflib"""
+    return '"%s"' % value.replace('\\', '\\\\').replace('\n', '\\n').replace(
+        '"', '\\"').replace('\r', '\\r')
+
+
+# Characters that may not appear as they are in the fragment of an IRI (RFC 3987)
+_IRI_UNSAFE = re.compile(r'[\x00-\x20<>"{}|\\^`#%\[\]\x7f]')
+
+
+def iri_segment(text):
+    """
+    Percent-encode a variable name or value for use in an element IRI, such as
+    '#instanceVariable-my%20id'. Only the characters that may not appear in an
+    IRI fragment are encoded (as UTF-8), so other names, non-ASCII ones
+    included, are used as they are.
+    """
+    text = str(text)
+    if not _IRI_UNSAFE.search(text):
+        return text
+    return _IRI_UNSAFE.sub(lambda match: ''.join('%%%02X' % byte for byte in match.group().encode('utf-8')), text)
+
+
+# Memory budget of the parsed-graph cache in MB, see GraphCache
+GRAPH_CACHE_ENV_VAR = 'DDI_GRAPH_CACHE_MB'
+DEFAULT_GRAPH_CACHE_MB = 256
+
+# Approximate memory of one triple in an rdflib in-memory graph, with its indexes
+GRAPH_BYTES_PER_TRIPLE = 1200
+
+
+class GraphCache:
+    """
+    LRU cache of parsed graphs, keyed by a hash of the JSON-LD document and
+    the base URI. Least recently used graphs are evicted once the estimated
+    size of the cached graphs exceeds max_bytes; larger graphs are not cached.
+
+    Cached graphs are shared, so they must only be read.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._graphs = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(jsonld, base_uri):
+        """Cache key of a JSON-LD string, or None for a parsed document"""
+        if isinstance(jsonld, str):
+            jsonld = jsonld.encode('utf-8')
+        elif not isinstance(jsonld, bytes):
+            return None
+        digest = hashlib.blake2b(jsonld, digest_size=16)
+        digest.update(b'\0' + base_uri.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._graphs.get(key)
+            if entry is None:
+                return None
+            self._graphs.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, graph):
+        size = len(graph) * GRAPH_BYTES_PER_TRIPLE
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._graphs:
+                self._size -= self._graphs.pop(key)[1]
+            self._graphs[key] = (graph, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._graphs.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._graphs.clear()
+            self._size = 0
 
 
 class FormatConverter:
@@ -38,11 +142,52 @@ class FormatConverter:
             'rdflib_format': 'nt',
             'requires_conversion': True,
             'description': 'W3C N-Triples RDF serialization (simple line-based)'
+        },
+        'nquads': {
+            'name': 'N-Quads',
+            'mimetype': 'application/n-quads',
+            'extension': '.nq',
+            'rdflib_format': 'nquads',
+            'requires_conversion': True,
+            'description': 'W3C N-Quads RDF serialization (N-Triples in a named graph per dataset)'
+        },
+        'rdfxml': {
+            'name': 'RDF/XML',
+            'mimetype': 'application/rdf+xml',
+            'extension': '.rdf',
+            'rdflib_format': 'xml',
+            'requires_conversion': True,
+            'description': 'W3C RDF/XML RDF serialization'
+        },
+        'binary': {
+            'name': 'Binary RDF',
+            'mimetype': 'application/vnd.ddicdi.rdf-binary',
+            'extension': '.rdfb',
+            'requires_conversion': True,
+            'binary': True,
+            'description': 'Dictionary-encoded, compressed binary triples (read back with iter_binary_rdf)'
         }
     }
 
+    # Identifiers of the dataset, the named graph of N-Quads output
+    DATASET_REFERENCES = ('#wideDataSet', '#keyValueDataStore')
+
+    # Zip archive with the document in several formats, see bundle()
+    BUNDLE = {
+        'name': 'Bundle (zip)',
+        'mimetype': 'application/zip',
+        'extension': '.zip',
+        'description': 'Zip archive with the document in each of the selected formats'
+    }
+
     DEFAULT_BASE_URI = 'http://example.org/ddi/'
 
+    # Graphs of recently converted documents, so converting the same document
+    # to another format skips parsing
+    graph_cache = GraphCache(
+        int(os.environ.get(GRAPH_CACHE_ENV_VAR, DEFAULT_GRAPH_CACHE_MB)) * 2**20
+    )
+
     # Standard namespace bindings for Turtle output
     DEFAULT_NAMESPACE_BINDINGS = {
         'ddi': 'http://ddialliance.org/Specification/DDI-CDI/1.0/RDF/',
@@ -53,13 +198,13 @@ class FormatConverter:
     }
 
     @classmethod
-    def convert(cls, jsonld_string, target_format, base_uri=None):
+    def convert(cls, jsonld, target_format, base_uri=None):
         """
         Convert JSON-LD to target RDF format
 
         Args:
-            jsonld_string: DDI-CDI JSON-LD document as string
-            target_format: Target format ('jsonld', 'turtle', 'ntriples')
+            jsonld: DDI-CDI JSON-LD document as string, or the parsed document
+            target_format: Target format ('jsonld', 'turtle', 'ntriples', 'nquads', 'rdfxml')
             base_uri: Optional base URI for instance data (defaults to http://example.org/ddi/)
 
         Returns:
@@ -80,120 +225,224 @@ class FormatConverter:
 
         # JSON-LD needs no conversion
         if not format_config['requires_conversion']:
-            return jsonld_string.encode('utf-8')
+            if not isinstance(jsonld, str):
+                jsonld = json.dumps(jsonld, indent=4)
+            return jsonld.encode('utf-8')
 
         # Convert via RDFlib
         base_uri = base_uri or cls.DEFAULT_BASE_URI
         return cls._convert_via_rdflib(
-            jsonld_string,
+            jsonld,
             target_format,
             base_uri
         )
 
     @classmethod
-    def _convert_via_rdflib(cls, jsonld_string, target_format, base_uri):
+    def parse(cls, jsonld, base_uri=None):
+        """
+        Parse JSON-LD into an RDF graph
+
+        Relative IRIs (the '#...' identifiers of the DDI-CDI components) are
+        resolved against base_uri while parsing, so the graph holds the final
+        IRIs and is serialized as is.
+
+        Args:
+            jsonld: DDI-CDI JSON-LD document as string, or the parsed document
+            base_uri: Optional base URI for instance data (defaults to http://example.org/ddi/)
+
+        Returns:
+            rdflib Graph with the namespace bindings of the output formats
+        """
+        base_uri = base_uri or cls.DEFAULT_BASE_URI
+        data = json.loads(jsonld) if isinstance(jsonld, (str, bytes)) else jsonld
+        graph = cls._parse_jsonld(data, base_uri)
+
+        # Add namespace bindings
+        # Determine prefix for base URI
+        base_prefix = cls._get_prefix_for_uri(base_uri)
+        graph.bind(base_prefix, base_uri)
+
+        for prefix, namespace in cls.DEFAULT_NAMESPACE_BINDINGS.items():
+            graph.bind(prefix, namespace)
+
+        return graph
+
+    @classmethod
+    def _convert_via_rdflib(cls, jsonld, target_format, base_uri):
         """
         Convert JSON-LD to other RDF formats using rdflib
 
         Args:
-            jsonld_string: JSON-LD document as string
-            target_format: Target format ('turtle', 'ntriples')
+            jsonld: JSON-LD document as string, or the parsed document
+            target_format: Target format ('turtle', 'ntriples', 'nquads', 'rdfxml')
             base_uri: Base URI for instance data
 
         Returns:
             Serialized RDF as bytes
         """
-        temp_file = None
         try:
-            # Write JSON-LD to temporary file for parsing
-            with tempfile.NamedTemporaryFile(
-                suffix='.jsonld',
-                delete=False,
-                mode='w',
-                encoding='utf-8'
-            ) as f:
-                f.write(jsonld_string)
-                temp_file = f.name
-
             # Parse JSON-LD into RDF graph
-            source_graph = Graph()
-            source_graph.parse(temp_file, format='json-ld')
-
-            # Transform URIs and create new graph
-            target_graph = Graph()
+            graph = cls._cached_graph(jsonld, base_uri)
+            return cls._serialize(graph, target_format, base_uri)
 
-            # Add namespace bindings
-            # Determine prefix for base URI
-            base_prefix = cls._get_prefix_for_uri(base_uri)
-            target_graph.bind(base_prefix, base_uri)
+        except Exception as e:
+            raise ValueError(
+                f"Failed to convert to {target_format}: {str(e)}"
+            )
 
-            for prefix, namespace in cls.DEFAULT_NAMESPACE_BINDINGS.items():
-                target_graph.bind(prefix, namespace)
+    @classmethod
+    def _cached_graph(cls, jsonld, base_uri):
+        """The graph of parse(), from graph_cache if the document was parsed recently"""
+        key = cls.graph_cache.key(jsonld, base_uri)
+        graph = cls.graph_cache.get(key) if key else None
+        if graph is None:
+            graph = cls.parse(jsonld, base_uri)
+            if key:
+                cls.graph_cache.put(key, graph)
+        return graph
 
-            # Transform URIs
-            for s, p, o in source_graph:
-                s = cls._transform_uri(s, base_uri)
-                o = cls._transform_uri(o, base_uri)
-                target_graph.add((s, p, o))
+    @classmethod
+    def _serialize(cls, graph, target_format, base_uri):
+        """Serialize a graph from parse() to an RDF format, as bytes"""
+        # Turtle, N-Quads and RDF/XML are written subject by subject instead of
+        # sorting the whole graph
+        if target_format == 'turtle':
+            writer = TurtleWriter(base_uri)
+        elif target_format == 'nquads':
+            writer = NQuadsWriter(cls._dataset_graph_iri(graph, base_uri))
+        elif target_format == 'rdfxml':
+            writer = RdfXmlWriter(base_uri)
+        elif target_format == 'binary':
+            return b''.join(BinaryRdfWriter().write(cls._iter_graph_ntriples(graph)))
+        else:
+            writer = None
+        if writer is not None:
+            return ''.join(writer.write(cls._iter_graph_ntriples(graph))).encode('utf-8')
 
-            # Serialize to target format
-            format_config = cls.FORMATS[target_format]
-            rdflib_format = format_config['rdflib_format']
+        # Serialize to target format
+        format_config = cls.FORMATS[target_format]
+        rdflib_format = format_config['rdflib_format']
 
-            output = target_graph.serialize(
-                format=rdflib_format,
-                encoding='utf-8'
-            )
+        output = graph.serialize(
+            format=rdflib_format,
+            encoding='utf-8'
+        )
 
-            # Handle different return types from rdflib versions
-            if isinstance(output, bytes):
-                return output
-            elif isinstance(output, str):
-                return output.encode('utf-8')
-            else:
-                # BytesIO or similar
-                return output.getvalue()
+        # Handle different return types from rdflib versions
+        if isinstance(output, bytes):
+            return output
+        elif isinstance(output, str):
+            return output.encode('utf-8')
+        else:
+            # BytesIO or similar
+            return output.getvalue()
 
-        except Exception as e:
-            raise ValueError(
-                f"Failed to convert to {target_format}: {str(e)}"
-            )
-        finally:
-            # Clean up temporary file
-            if temp_file and os.path.exists(temp_file):
-                try:
-                    os.unlink(temp_file)
-                except:
-                    pass
+    @classmethod
+    def _dataset_graph_iri(cls, graph, base_uri):
+        """IRI of the dataset described by a graph, or the base URI if there is none"""
+        resolve = iri_resolver(base_uri)
+        for reference in cls.DATASET_REFERENCES:
+            if (URIRef(resolve(reference)), None, None) in graph:
+                return resolve(reference)
+        return base_uri
 
-    @staticmethod
-    def _transform_uri(uri_ref, base_uri):
+    @classmethod
+    def bundle(cls, jsonld, formats=None, base_uri=None, basename='output'):
         """
-        Transform file:/// URIs to specified base URI
+        Convert JSON-LD to several formats at once, as a zip archive
+
+        The document is parsed into a graph once, and the formats are
+        serialized from it concurrently. Archive members are named
+        '<basename>_DDICDI<extension>'.
 
         Args:
-            uri_ref: rdflib URIRef or Literal
-            base_uri: Target base URI
+            jsonld: DDI-CDI JSON-LD document as string, or the parsed document
+            formats: Formats to include (default: all of FORMATS)
+            base_uri: Optional base URI for instance data (defaults to http://example.org/ddi/)
+            basename: Name of the archive members, without extension
+
+        Returns:
+            Zip archive as bytes
+
+        Raises:
+            ValueError: If a format is unsupported or conversion fails
+        """
+        formats = cls.bundle_formats(formats)
+        base_uri = base_uri or cls.DEFAULT_BASE_URI
+
+        try:
+            graph = None
+            if any(cls.FORMATS[fmt]['requires_conversion'] for fmt in formats):
+                graph = cls._cached_graph(jsonld, base_uri)
+
+            def serialize(fmt):
+                if cls.FORMATS[fmt]['requires_conversion']:
+                    return cls._serialize(graph, fmt, base_uri)
+                return cls.convert(jsonld, fmt)
+
+            # The graph is only read while serializing, so it is shared by the threads
+            with ThreadPoolExecutor(max_workers=len(formats)) as pool:
+                outputs = list(pool.map(serialize, formats))
+
+            return write_bundle(
+                (f"{basename}_DDICDI{cls.FORMATS[fmt]['extension']}", [output])
+                for fmt, output in zip(formats, outputs)
+            )
+
+        except Exception as e:
+            raise ValueError(f"Failed to create bundle: {str(e)}")
+
+    @classmethod
+    def bundle_formats(cls, formats=None):
+        """
+        Validate the formats of a bundle, given as a list or comma-separated string
 
         Returns:
-            Transformed URIRef or original value
+            List of format keys, without duplicates (default: all of FORMATS)
+
+        Raises:
+            ValueError: If a format is unsupported
         """
-        uri_str = str(uri_ref)
+        if isinstance(formats, str):
+            formats = [fmt.strip().lower() for fmt in formats.split(',') if fmt.strip()]
+        if not formats:
+            return list(cls.FORMATS)
 
-        # Only transform file:/// URIs
-        if uri_str.startswith('file:///'):
-            # Extract fragment/last segment
-            fragment = uri_str.split('/')[-1]
+        unsupported = [fmt for fmt in formats if fmt not in cls.FORMATS]
+        if unsupported:
+            supported = ', '.join(cls.FORMATS.keys())
+            raise ValueError(
+                f"Unsupported format '{unsupported[0]}'. "
+                f"Supported formats: {supported}"
+            )
+        return list(dict.fromkeys(formats))
 
-            # Remove .jsonld extension from temporary filenames
-            # e.g., tmpq7lxd77t.jsonld#v480004 -> #v480004
-            if '.jsonld#' in fragment:
-                # Extract just the fragment part after #
-                fragment = '#' + fragment.split('#', 1)[1]
+    @staticmethod
+    def _parse_jsonld(data, base):
+        """
+        Parse a JSON-LD document (parsed JSON) into a new graph.
 
-            return URIRef(base_uri + fragment)
+        Like rdflib's JSON-LD parser, except that the document's @context is
+        processed once per process (see jsonld_context.rdflib_context) and
+        remote contexts come from the bundled copies instead of the network.
+        """
+        context = None
+        if isinstance(data, dict) and '@context' in data:
+            data = dict(data)
+            context = data.pop('@context')
+        graph = Graph()
+        # rdflib's JSON-LD parser writes into a context-aware view of the graph
+        dataset = ConjunctiveGraph(store=graph.store, identifier=graph.identifier)
+        JsonLdParser().parse(data, rdflib_context(context, base), dataset)
+        return graph
 
-        return uri_ref
+    @staticmethod
+    def _iter_graph_ntriples(graph):
+        """N-Triples lines of a graph, grouped by subject and predicate"""
+        for subject in graph.subjects(unique=True):
+            subject_term = _nt_term(subject)
+            for predicate, obj in sorted(graph.predicate_objects(subject)):
+                yield f'{subject_term} {_nt_term(predicate)} {_nt_term(obj)} .\n'
 
     @staticmethod
     def _get_prefix_for_uri(uri):
@@ -228,3 +477,591 @@ class FormatConverter:
         if format_key:
             return cls.FORMATS.get(format_key, {})
         return cls.FORMATS
+
+
+def write_bundle(members, fileobj=None):
+    """
+    Write a zip archive of (filename, fragments) members, where fragments is
+    an iterable of str or bytes written one after the other, so a member can
+    be streamed into the archive without being held in memory as a whole.
+
+    Returns:
+        The archive as bytes, or None when written to fileobj
+    """
+    output = fileobj if fileobj is not None else io.BytesIO()
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for filename, fragments in members:
+            with archive.open(filename, 'w', force_zip64=True) as member:
+                for fragment in fragments:
+                    member.write(fragment.encode('utf-8') if isinstance(fragment, str) else fragment)
+    return output.getvalue() if fileobj is None else None
+
+
+def _nt_term(term):
+    """N-Triples form of an rdflib term, as rdflib's N-Triples serializer writes it"""
+    if isinstance(term, Literal):
+        encoded = quote_literal(term)
+        if term.language:
+            return f'{encoded}@{term.language}'
+        if term.datatype:
+            return f'{encoded}^^<{term.datatype}>'
+        return encoded
+    return term.n3()
+
+
+class TripleTemplate:
+    """
+    The N-Triples lines of one JSON-LD element, with placeholders for the values
+    that vary between elements of its kind.
+
+    The element is written with marker values in place of its fields and
+    converted once through FormatConverter, so the lines carry exactly the IRIs,
+    datatypes and literal forms of the regular rdflib conversion. format()
+    then renders an element for any field values without parsing JSON-LD.
+
+    Args:
+        element: JSON-LD element containing the markers
+        markers: Field name -> marker value used in the element
+        base_uri: Base URI for instance data
+        context: JSON-LD @context of the template document
+        literals: Fields whose marker is a whole string literal; their values
+            must be passed through quote_literal
+    """
+
+    def __init__(self, element, markers, base_uri, context, literals=()):
+        self.text = self._render(element, markers, base_uri, context, literals)
+        self.format = self.text.format
+
+    @staticmethod
+    def _convert(element, base_uri, context):
+        document = {'@context': context, 'DDICDIModels': [element]}
+        return FormatConverter.convert(document, 'ntriples', base_uri=base_uri).decode('utf-8')
+
+    @classmethod
+    def _render(cls, element, markers, base_uri, context, literals=()):
+        text = cls._convert(element, base_uri, context)
+        # Keep the text safe for str.format before the placeholders go in
+        text = text.replace('{', '{{').replace('}', '}}')
+        for name in literals:
+            text = text.replace('"%s"' % markers[name], '{%s}' % name)
+        for name, marker in markers.items():
+            text = text.replace(str(marker), '{%s}' % name)
+        # A blank node that is never an object is the document node, which
+        # some contexts link to every element; it is shared by the whole
+        # document. The other blank nodes (nested objects) get labels made
+        # unique by the bnode field.
+        subjects, objects = set(), set()
+        for line in text.splitlines():
+            subject, _, value = line.split(' ', 2)
+            subjects.add(subject)
+            objects.add(value.rsplit(' ', 1)[0])
+        labels = {}
+        for label in _BLANK_NODE.findall(text):
+            if label not in labels:
+                if '_:' + label in subjects - objects:
+                    labels[label] = '_:{document}'
+                else:
+                    labels[label] = '_:{bnode}b%d' % sum(1 for value in labels.values() if '{bnode}' in value)
+        text = _BLANK_NODE.sub(lambda match: labels[match.group(1)], text)
+        return ''.join(sorted(text.splitlines(keepends=True)))
+
+    @property
+    def document_predicates(self):
+        """Predicates that link the document node to the element"""
+        return {line.split(' ', 2)[1] for line in self.text.splitlines() if line.startswith('_:{document} ')}
+
+    def document_node(self, ntriples_text):
+        """
+        Label of the document node in N-Triples converted from the rest of the
+        same document, or None when the context links no document node
+        """
+        predicates = self.document_predicates
+        for line in ntriples_text.splitlines():
+            subject, predicate, _ = line.split(' ', 2)
+            if predicate in predicates and subject.startswith('_:'):
+                return subject[2:]
+        return None
+
+
+class CollectionTemplate:
+    """
+    The N-Triples lines that link an element to the members of one of its
+    array properties, for arrays that are too long to go through rdflib.
+
+    Depending on the JSON-LD context the array is a set of (subject, property,
+    member) triples or an RDF list; both are detected from a template element
+    and written member by member.
+
+    Args:
+        element: JSON-LD element whose array property holds the single member
+            '#' + item_marker; other varying values are markers
+        item_marker: Marker of the member, its fragment without '#'
+        markers: Field name -> marker value for the other fields
+        base_uri: Base URI for instance data
+        context: JSON-LD @context of the template document
+    """
+
+    def __init__(self, element, item_marker, markers, base_uri, context):
+        markers = dict(markers, item=item_marker)
+        lines = TripleTemplate._render(element, markers, base_uri, context).splitlines(keepends=True)
+        self.is_list = any(RDF_FIRST in line for line in lines)
+        if self.is_list:
+            # Head of the list: '<subject> <property> _:{bnode}b0 .'
+            head = next(line for line in lines if line.split(' ', 2)[2].startswith('_:') and RDF_FIRST not in line
+                        and RDF_REST not in line)
+            self.head = head.split(' _:', 1)[0]
+            self.member = next(line for line in lines if RDF_FIRST in line).split(' ', 2)[2]
+        else:
+            self.member = ''.join(line for line in lines if '{item}' in line)
+
+    def lines(self, items, node_prefix, **fields):
+        """
+        Yield the N-Triples text of the collection of items (member fragments
+        without '#'). node_prefix makes the list node labels unique within a document.
+        """
+        render = self.member.format
+        if not self.is_list:
+            for item in items:
+                yield render(item=item, **fields)
+            return
+
+        node = 0
+        previous = self.head.format(**fields)
+        for item in items:
+            label = f'_:{node_prefix}l{node}'
+            yield f'{previous} {label} .\n{label} {RDF_FIRST} {render(item=item, **fields)}'
+            previous = f'{label} {RDF_REST}'
+            node += 1
+        yield f'{previous} {RDF_NIL} .\n'
+
+
+def _iter_ntriples_lines(ntriples_fragments):
+    """
+    The lines of N-Triples text given in fragments, which may split lines
+    anywhere, as one list of complete, non-empty lines per fragment
+    """
+    pending = ''
+    for fragment in ntriples_fragments:
+        if isinstance(fragment, bytes):
+            fragment = fragment.decode('utf-8')
+        lines = (pending + fragment).split('\n')
+        pending = lines.pop()
+        yield [line for line in lines if line]
+    if pending.strip():
+        raise ValueError(f"Incomplete N-Triples line: {pending!r}")
+
+
+# An N-Triples line, term by term: IRIs and literals may contain spaces
+_NT_IRI_TERM = r'<[^>]*>'
+_NT_BLANK_TERM = r'_:[^\s]+'
+_NT_LITERAL_TERM = r'"(?:[^"\\]|\\.)*"(?:@[A-Za-z0-9-]+|\^\^<[^>]*>)?'
+_NT_TRIPLE = re.compile(
+    rf'[ \t]*({_NT_IRI_TERM}|{_NT_BLANK_TERM})[ \t]*({_NT_IRI_TERM})[ \t]*'
+    rf'({_NT_IRI_TERM}|{_NT_BLANK_TERM}|{_NT_LITERAL_TERM})[ \t]*\.[ \t]*\r?\Z'
+)
+
+
+def _split_triple(line):
+    """Subject, predicate and object of an N-Triples line"""
+    # Fast path: split on the first two spaces, which is right unless the
+    # subject or predicate holds a space, i.e. doesn't end where the split does
+    parts = line[:-2].rstrip().split(' ', 2)
+    if len(parts) == 3 and parts[1][-1:] == '>' and (parts[0][-1:] == '>' or parts[0][:2] == '_:') \
+            and parts[1][:1] == '<' and line[-2:] == ' .':
+        return parts
+    match = _NT_TRIPLE.match(line)
+    if match is None:
+        raise ValueError(f"Invalid N-Triples line: {line!r}")
+    return match.groups()
+
+
+# Local parts of prefixed names: characters allowed in Turtle, and those that
+# must be escaped with a backslash
+_PN_LOCAL = re.compile(r"[A-Za-z0-9_\-.:~!$&'()*+,;=/?#@%]*\Z")
+_PN_LOCAL_ESCAPES = re.compile(r"([~.!$&'()*+,;=/?#@%])")
+_TURTLE_INTEGER = re.compile(r'"[+-]?[0-9]+"\^\^<http://www\.w3\.org/2001/XMLSchema#integer>\Z')
+_TURTLE_BOOLEAN = re.compile(r'"(true|false)"\^\^<http://www\.w3\.org/2001/XMLSchema#boolean>\Z')
+_RDF_TYPE = '<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>'
+
+
+class TurtleWriter:
+    """
+    Streaming Turtle serializer for N-Triples input.
+
+    Consecutive triples of a subject are written as one subject block, and
+    consecutive objects of a predicate as an object list, in the order the
+    triples arrive. Nothing but the current line is held, so memory stays
+    bounded however large the output; unlike rdflib's serializer, the graph is
+    never sorted or grouped as a whole. IRIs are abbreviated with the
+    namespace bindings of FormatConverter, integers and booleans are written
+    bare and rdf:type as 'a'. Blank nodes keep their N-Triples labels.
+
+    Args:
+        base_uri: Base URI for instance data, bound to its usual prefix
+        namespaces: Prefix -> namespace bindings (default: DEFAULT_NAMESPACE_BINDINGS)
+    """
+
+    def __init__(self, base_uri=None, namespaces=None):
+        base_uri = base_uri or FormatConverter.DEFAULT_BASE_URI
+        self.namespaces = {FormatConverter._get_prefix_for_uri(base_uri): base_uri}
+        self.namespaces.update(namespaces or FormatConverter.DEFAULT_NAMESPACE_BINDINGS)
+        # Longest namespace first, so the most specific prefix wins
+        self._by_length = sorted(self.namespaces.items(), key=lambda item: -len(item[1]))
+        self._names = {}
+
+    def prefixes(self):
+        """The @prefix directives"""
+        return ''.join(f'@prefix {prefix}: <{namespace}> .\n' for prefix, namespace in self.namespaces.items()) + '\n'
+
+    def _name(self, iri):
+        """Prefixed name of an IRI without its angle brackets, or None"""
+        for prefix, namespace in self._by_length:
+            if iri.startswith(namespace):
+                local = iri[len(namespace):]
+                if not _PN_LOCAL.match(local):
+                    return None
+                local = _PN_LOCAL_ESCAPES.sub(r'\\\1', local)
+                if local.startswith('-'):
+                    local = '\\' + local
+                return f'{prefix}:{local}'
+        return None
+
+    def term(self, term):
+        """Turtle form of an N-Triples term"""
+        if term.startswith('<'):
+            name = self._names.get(term)
+            if name is None:
+                if len(self._names) > 100000:
+                    # Only repeated IRIs (predicates, types, shared references) are worth keeping
+                    self._names.clear()
+                name = self._names[term] = self._name(term[1:-1]) or term
+            return name
+        if term.startswith('"'):
+            if _TURTLE_INTEGER.match(term):
+                return term[1:term.index('"', 1)]
+            if _TURTLE_BOOLEAN.match(term):
+                return term[1:term.index('"', 1)]
+            if term.endswith('>') and '"^^<' in term:
+                lexical, datatype = term.rsplit('^^', 1)
+                return f'{lexical}^^{self.term(datatype)}'
+        return term
+
+    def write(self, ntriples_fragments):
+        """
+        Yield the Turtle document of N-Triples text given in fragments, which
+        may split lines anywhere.
+        """
+        yield self.prefixes()
+        subject = predicate = None
+        out = []
+        for lines in _iter_ntriples_lines(ntriples_fragments):
+            for line in lines:
+                s, p, o = _split_triple(line)
+                if s == subject:
+                    if p == predicate:
+                        out.append(' ,\n        ' + self.term(o))
+                    else:
+                        out.append(' ;\n    ' + ('a' if p == _RDF_TYPE else self.term(p)) + ' ' + self.term(o))
+                else:
+                    if subject is not None:
+                        out.append(' .\n\n')
+                    out.append(self.term(s) + ' ' + ('a' if p == _RDF_TYPE else self.term(p)) + ' ' + self.term(o))
+                subject, predicate = s, p
+            if out:
+                yield ''.join(out)
+                out = []
+        if subject is not None:
+            yield ' .\n'
+
+
+class NQuadsWriter:
+    """
+    Streaming N-Quads serializer for N-Triples input: every triple is written
+    in the named graph graph_iri, line by line as the triples arrive.
+    """
+
+    def __init__(self, graph_iri):
+        self.graph_term = f'<{graph_iri}>'
+
+    def write(self, ntriples_fragments):
+        """Yield the N-Quads document of N-Triples text given in fragments"""
+        suffix = f' {self.graph_term} .\n'
+        for lines in _iter_ntriples_lines(ntriples_fragments):
+            if lines:
+                yield ''.join(line[:-1].rstrip() + suffix for line in lines)
+
+
+_NT_LITERAL = re.compile(r'"(.*)"(?:@([A-Za-z0-9-]+)|\^\^<([^>]*)>)?\Z', re.DOTALL)
+_NT_ESCAPE = re.compile(r'\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)')
+_NT_ESCAPES = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+_XML_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_.-]*\Z')
+
+
+def _unquote_literal(lexical):
+    """Value of the quoted lexical form of an N-Triples literal, the inverse of quote_literal"""
+    def unescape(match):
+        escape = match.group(1)
+        if len(escape) > 1:
+            return chr(int(escape[1:], 16))
+        return _NT_ESCAPES.get(escape, escape)
+    return _NT_ESCAPE.sub(unescape, lexical)
+
+
+class RdfXmlWriter:
+    """
+    Streaming RDF/XML serializer for N-Triples input.
+
+    Consecutive triples of a subject are written as one rdf:Description, in
+    the order the triples arrive, so memory stays bounded as with TurtleWriter.
+    Predicates are written as qualified names of the namespace bindings of
+    FormatConverter; other namespaces are declared on the property element.
+
+    Args:
+        base_uri: Base URI for instance data, bound to its usual prefix
+        namespaces: Prefix -> namespace bindings (default: DEFAULT_NAMESPACE_BINDINGS)
+    """
+
+    def __init__(self, base_uri=None, namespaces=None):
+        base_uri = base_uri or FormatConverter.DEFAULT_BASE_URI
+        self.namespaces = {FormatConverter._get_prefix_for_uri(base_uri): base_uri}
+        self.namespaces.update(namespaces or FormatConverter.DEFAULT_NAMESPACE_BINDINGS)
+        self.namespaces.setdefault('rdf', 'http://www.w3.org/1999/02/22-rdf-syntax-ns#')
+        # Longest namespace first, so the most specific prefix wins
+        self._by_length = sorted(self.namespaces.items(), key=lambda item: -len(item[1]))
+        self._elements = {}
+
+    def header(self):
+        """XML declaration and rdf:RDF start tag with the namespace declarations"""
+        declarations = ''.join(f'\n   xmlns:{prefix}={quoteattr(namespace)}'
+                               for prefix, namespace in self.namespaces.items())
+        return f'<?xml version="1.0" encoding="utf-8"?>\n<rdf:RDF{declarations}\n>\n'
+
+    def _element(self, predicate):
+        """Start and end tag names of the property element of a predicate IRI"""
+        element = self._elements.get(predicate)
+        if element is None:
+            iri = predicate[1:-1]
+            for prefix, namespace in self._by_length:
+                if iri.startswith(namespace) and _XML_NAME.match(iri[len(namespace):]):
+                    name = f'{prefix}:{iri[len(namespace):]}'
+                    element = (name, name)
+                    break
+            else:
+                # Split off the longest local name and declare its namespace in place
+                match = _XML_NAME.search(iri)
+                if not match or match.start() == 0:
+                    raise ValueError(f"Predicate {iri} can't be written in RDF/XML")
+                namespace = iri[:match.start()]
+                element = (f'ns0:{match.group()} xmlns:ns0={quoteattr(namespace)}', f'ns0:{match.group()}')
+            if len(self._elements) > 100000:
+                self._elements.clear()
+            self._elements[predicate] = element
+        return element
+
+    @staticmethod
+    def _node(term, about='rdf:about'):
+        """Attribute naming the node of an N-Triples IRI or blank node"""
+        if term.startswith('_:'):
+            label = term[2:]
+            if not _XML_NAME.match(label):
+                label = 'b' + label
+            return f'rdf:nodeID={quoteattr(label)}'
+        return f'{about}={quoteattr(term[1:-1])}'
+
+    def _property(self, p, o):
+        """Property element of a predicate and object"""
+        start, end = self._element(p)
+        if o.startswith('"'):
+            match = _NT_LITERAL.match(o)
+            if not match:
+                raise ValueError(f"Invalid N-Triples literal: {o!r}")
+            lexical, language, datatype = match.groups()
+            if language:
+                start += f' xml:lang={quoteattr(language)}'
+            elif datatype:
+                start += f' rdf:datatype={quoteattr(datatype)}'
+            return f'    <{start}>{xml_escape(_unquote_literal(lexical))}</{end}>\n'
+        return f'    <{start} {self._node(o, "rdf:resource")}/>\n'
+
+    def write(self, ntriples_fragments):
+        """
+        Yield the RDF/XML document of N-Triples text given in fragments, which
+        may split lines anywhere.
+        """
+        yield self.header()
+        subject = None
+        out = []
+        for lines in _iter_ntriples_lines(ntriples_fragments):
+            for line in lines:
+                s, p, o = _split_triple(line)
+                if s != subject:
+                    if subject is not None:
+                        out.append('  </rdf:Description>\n')
+                    out.append(f'  <rdf:Description {self._node(s)}>\n')
+                    subject = s
+                out.append(self._property(p, o))
+            if out:
+                yield ''.join(out)
+                out = []
+        if subject is not None:
+            yield '  </rdf:Description>\n'
+        yield '</rdf:RDF>\n'
+
+
+# Binary RDF: magic header, then a zlib stream of triple records, see BinaryRdfWriter
+BINARY_RDF_MAGIC = b'DDICDI-RDF\x01\n'
+BINARY_RDF_MAX_TERMS = 1000000
+
+# Term references of a triple record
+_TERM_SAME = 0
+_TERM_NEW = 1
+_DICTIONARY_RESET = 2
+_FIRST_TERM_ID = 3
+
+
+def _varint(value):
+    """Unsigned LEB128 encoding of an integer"""
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return out
+
+
+class BinaryRdfWriter:
+    """
+    Streaming writer of the dictionary-encoded binary RDF format.
+
+    Every triple is a record of three term references, subject, predicate and
+    object: 0 repeats the term of the previous triple at that position, 1 is
+    followed by the length-prefixed UTF-8 N-Triples text of a new term, which
+    gets the next ID of the term dictionary, and IDs from 3 refer to terms
+    written before. References are varints, and the records are compressed
+    with zlib after the BINARY_RDF_MAGIC header. Once the dictionary holds
+    max_terms terms, a 2 in place of a subject reference resets it on both
+    sides, so memory stays bounded however many distinct terms there are.
+
+    Args:
+        max_terms: Size of the term dictionary before it is reset
+        level: zlib compression level
+    """
+
+    def __init__(self, max_terms=BINARY_RDF_MAX_TERMS, level=6):
+        self.max_terms = max_terms
+        self.level = level
+
+    def write(self, ntriples_fragments):
+        """Yield the binary file of N-Triples text given in fragments, as bytes"""
+        compressor = zlib.compressobj(self.level)
+        ids = {}
+        previous = [None, None, None]
+        # The header goes out with the first data, once the input has started
+        header = BINARY_RDF_MAGIC
+        for lines in _iter_ntriples_lines(ntriples_fragments):
+            out = bytearray()
+            for line in lines:
+                if len(ids) >= self.max_terms:
+                    out.append(_DICTIONARY_RESET)
+                    ids.clear()
+                    previous = [None, None, None]
+                for position, term in enumerate(_split_triple(line)):
+                    if term == previous[position]:
+                        out.append(_TERM_SAME)
+                        continue
+                    previous[position] = term
+                    term_id = ids.get(term)
+                    if term_id is None:
+                        ids[term] = len(ids) + _FIRST_TERM_ID
+                        data = term.encode('utf-8')
+                        out.append(_TERM_NEW)
+                        out += _varint(len(data))
+                        out += data
+                    else:
+                        out += _varint(term_id)
+            compressed = compressor.compress(bytes(out))
+            if compressed:
+                yield header + compressed
+                header = b''
+        yield header + compressor.flush()
+
+
+class _IncompleteRecord(Exception):
+    """The decompressed data ends within a record"""
+
+
+def iter_binary_rdf(source, chunk_size=65536):
+    """
+    Stream the triples of a binary RDF file (see BinaryRdfWriter) back out as
+    N-Triples text fragments.
+
+    Args:
+        source: Binary file object, or the file content as bytes
+        chunk_size: Bytes read from the file at a time
+
+    Raises:
+        ValueError: If source is not a binary RDF file or is truncated
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    if source.read(len(BINARY_RDF_MAGIC)) != BINARY_RDF_MAGIC:
+        raise ValueError("Not a binary RDF file")
+
+    decompressor = zlib.decompressobj()
+    terms = [None] * _FIRST_TERM_ID
+    previous = [None, None, None]
+    buffer = b''
+
+    def read_varint(position):
+        value = shift = 0
+        while True:
+            if position >= len(buffer):
+                raise _IncompleteRecord
+            byte = buffer[position]
+            position += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return value, position
+            shift += 7
+
+    while True:
+        chunk = source.read(chunk_size)
+        buffer += decompressor.decompress(chunk) if chunk else decompressor.flush()
+        position = 0
+        lines = []
+        try:
+            while position < len(buffer):
+                record_start = position
+                # Terms defined by a record may be referenced again within it
+                known_terms = len(terms)
+                reference, position = read_varint(position)
+                if reference == _DICTIONARY_RESET:
+                    del terms[_FIRST_TERM_ID:]
+                    previous = [None, None, None]
+                    continue
+                triple = list(previous)
+                for index in range(3):
+                    if index:
+                        reference, position = read_varint(position)
+                    if reference == _TERM_NEW:
+                        length, position = read_varint(position)
+                        if position + length > len(buffer):
+                            raise _IncompleteRecord
+                        triple[index] = buffer[position:position + length].decode('utf-8')
+                        terms.append(triple[index])
+                        position += length
+                    elif reference != _TERM_SAME:
+                        triple[index] = terms[reference]
+                previous = triple
+                lines.append(f'{triple[0]} {triple[1]} {triple[2]} .\n')
+        except _IncompleteRecord:
+            del terms[known_terms:]
+            position = record_start
+        buffer = buffer[position:]
+        if lines:
+            yield ''.join(lines)
+        if not chunk:
+            break
+
+    if buffer or not decompressor.eof:
+        raise ValueError("Truncated binary RDF file")
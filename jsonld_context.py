@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+JSON-LD Context Loading for DDI-CDI Converter
+Resolves remote JSON-LD contexts from copies of the published documents
+vendored with the application, fetching the others once, caches every loaded
+document for the lifetime of the process, and memoizes processed contexts and
+resolved IRIs, for both rdflib and pyld.
+
+Vendor (or refresh) the published copies with:
+    python jsonld_context.py --refresh
+"""
+
+from collections import OrderedDict
+import json
+import os
+import re
+import threading
+import urllib.request
+
+from rdflib.plugins.shared.jsonld.context import Context
+from rdflib.plugins.shared.jsonld.util import norm_url
+
+DDI_CDI_CONTEXT_URL = 'https://docs.ddialliance.org/DDI-CDI/1.0/model/encoding/json-ld/ddi-cdi.jsonld'
+
+# Directory of the vendored contexts, byte-for-byte copies of the published documents
+CONTEXT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'contexts')
+
+# Remote contexts that may be vendored, URL -> file in CONTEXT_DIR. Missing
+# files are fetched like any other context
+BUNDLED_CONTEXTS = {
+    DDI_CDI_CONTEXT_URL: 'ddi-cdi.jsonld'
+}
+
+# Set to 'true' to never fetch contexts that are not bundled, e.g. in air-gapped deployments
+OFFLINE_ENV_VAR = 'DDI_JSONLD_OFFLINE'
+
+FETCH_TIMEOUT = 30
+
+# Processed rdflib contexts kept per process, see rdflib_context
+PROCESSED_CONTEXT_CACHE_SIZE = 32
+
+# Resolved IRIs kept per base IRI, see IriResolver
+RESOLVED_IRI_CACHE_SIZE = 100000
+
+# Characters urllib drops from URLs, fragments with them take the slow path
+_URL_UNSAFE = re.compile('[\t\r\n]')
+
+_documents = {}
+_processed_contexts = OrderedDict()
+_lock = threading.Lock()
+
+
+def _download(url):
+    """The published bytes of a JSON-LD document"""
+    request = urllib.request.Request(url, headers={'Accept': 'application/ld+json, application/json'})
+    with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+        return response.read()
+
+
+def _fetch(url):
+    """Fetch a JSON-LD document over the network"""
+    return json.loads(_download(url).decode('utf-8'))
+
+
+def load_document(url):
+    """
+    Load a JSON-LD document (usually a context) by URL.
+
+    Vendored copies are read from CONTEXT_DIR, other URLs are fetched unless
+    DDI_JSONLD_OFFLINE is set. Every document is kept once loaded; the fetch
+    runs outside the lock, so a slow server never blocks lookups of other
+    documents (two threads may then both fetch the same URL, the first to
+    finish wins).
+
+    Raises:
+        ValueError: If the document is not vendored and can't be fetched
+    """
+    document = _documents.get(url)
+    if document is not None:
+        return document
+
+    bundled = BUNDLED_CONTEXTS.get(url)
+    path = os.path.join(CONTEXT_DIR, bundled) if bundled else None
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            document = json.load(f)
+    elif os.environ.get(OFFLINE_ENV_VAR, 'false').lower() == 'true':
+        hint = " (vendor it with: python jsonld_context.py --refresh)" if bundled else ""
+        raise ValueError(
+            f"JSON-LD document {url} is not vendored in {CONTEXT_DIR}{hint} "
+            f"and {OFFLINE_ENV_VAR} forbids fetching it"
+        )
+    else:
+        try:
+            document = _fetch(url)
+        except Exception as e:
+            raise ValueError(f"Failed to load JSON-LD document {url}: {str(e)}")
+
+    with _lock:
+        return _documents.setdefault(url, document)
+
+
+class _DocumentCache(dict):
+    """
+    rdflib's remote context cache, backed by load_document: rdflib looks a
+    context URL up here before fetching it, and every lookup is answered
+    """
+
+    def __contains__(self, url):
+        if not dict.__contains__(self, url):
+            self[url] = load_document(url)
+        return True
+
+
+_rdflib_documents = _DocumentCache()
+
+
+class IriResolver:
+    """
+    Resolves IRIs against a base IRI exactly like rdflib's JSON-LD parser
+    (norm_url), memoized per source IRI.
+
+    Fragment references, the '#...' identifiers of the DDI-CDI elements, are
+    appended to the base document IRI computed once up front instead of being
+    split and joined by urllib. Every other IRI goes through norm_url once.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self._document = norm_url(base, '#') if base else None
+        self._resolved = {}
+
+    def __call__(self, iri):
+        resolved = self._resolved.get(iri)
+        if resolved is None:
+            if self._document is not None and iri.startswith('#') and not _URL_UNSAFE.search(iri):
+                resolved = self._document + iri[1:]
+            else:
+                resolved = norm_url(self.base, iri)
+            if len(self._resolved) > RESOLVED_IRI_CACHE_SIZE:
+                # Only repeated IRIs (references, vocabulary terms) are worth keeping
+                self._resolved.clear()
+            self._resolved[iri] = resolved
+        return resolved
+
+
+_iri_resolvers = {}
+
+
+def iri_resolver(base):
+    """The IriResolver of a base IRI, shared by every parse against that base"""
+    resolver = _iri_resolvers.get(base)
+    if resolver is None:
+        if len(_iri_resolvers) >= PROCESSED_CONTEXT_CACHE_SIZE:
+            _iri_resolvers.clear()
+        resolver = _iri_resolvers[base] = IriResolver(base)
+    return resolver
+
+
+class _ResolvingContext(Context):
+    """rdflib Context resolving IRIs through iri_resolver"""
+
+    def resolve_iri(self, iri):
+        return iri_resolver(self._base)(iri)
+
+    def _subcontext(self, source, propagate):
+        # rdflib builds scoped contexts as plain Contexts
+        ctx = super()._subcontext(source, propagate)
+        ctx.__class__ = _ResolvingContext
+        return ctx
+
+
+def rdflib_context(context, base):
+    """
+    The rdflib Context for a document's @context value and base IRI, processed
+    once per process and shared by every parse.
+
+    Remote contexts are resolved through load_document. The Context is only
+    read while parsing, so it can be reused; the most recently used
+    PROCESSED_CONTEXT_CACHE_SIZE contexts are kept. IRIs are resolved through
+    iri_resolver.
+    """
+    key = (json.dumps(context, sort_keys=True), base)
+    with _lock:
+        processed = _processed_contexts.get(key)
+        if processed is not None:
+            _processed_contexts.move_to_end(key)
+            return processed
+
+    processed = _ResolvingContext(base=base, version=1.1)
+    processed._context_cache = _rdflib_documents
+    if context:
+        processed.load(context, base)
+
+    with _lock:
+        _processed_contexts[key] = processed
+        while len(_processed_contexts) > PROCESSED_CONTEXT_CACHE_SIZE:
+            _processed_contexts.popitem(last=False)
+    return processed
+
+
+def pyld_document_loader(url, options=None):
+    """
+    pyld document loader serving documents through load_document. pyld keeps
+    its own cache of processed contexts, so they are resolved once per process.
+    """
+    from pyld.jsonld import JsonLdError
+
+    try:
+        document = load_document(url)
+    except ValueError as e:
+        raise JsonLdError(str(e), 'jsonld.LoadDocumentError', code='loading document failed')
+    return {
+        'contentType': 'application/ld+json',
+        'contextUrl': None,
+        'documentUrl': url,
+        'document': document
+    }
+
+
+def install_pyld_document_loader():
+    """Make pyld load every document through pyld_document_loader"""
+    from pyld import jsonld
+
+    jsonld.set_document_loader(pyld_document_loader)
+
+
+def refresh_bundled_contexts():
+    """Download the published version of every bundled context into CONTEXT_DIR, byte for byte"""
+    os.makedirs(CONTEXT_DIR, exist_ok=True)
+    for url, filename in BUNDLED_CONTEXTS.items():
+        published = _download(url)
+        json.loads(published.decode('utf-8'))
+        path = os.path.join(CONTEXT_DIR, filename)
+        with open(path, 'wb') as f:
+            f.write(published)
+        print(f"Saved {url} to {path}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Vendored JSON-LD contexts')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Download the published contexts into CONTEXT_DIR')
+    args = parser.parse_args()
+
+    if args.refresh:
+        refresh_bundled_contexts()
+    else:
+        for url, filename in BUNDLED_CONTEXTS.items():
+            path = os.path.join(CONTEXT_DIR, filename)
+            print(f"{url} -> {path} ({'present' if os.path.exists(path) else 'missing'})")
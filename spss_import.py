@@ -1,9 +1,12 @@
 from __future__ import annotations
 from pathlib import Path
+import os
 import pandas as pd
 import numpy as np
 import pyreadstat as pyr
+import codecs
 import json
+import re
 
 # Set pandas options
 pd.set_option('display.max_rows', 2500)
@@ -16,9 +19,102 @@ ENCODINGS = ["utf-8", "LATIN1", "cp1252", "iso-8859-1"]
 MISSING_DATE = "1582-10-14"
 REPLACEMENT_DATE = "1678-01-01"
 
+# Bytes of a text file sniff_encoding decodes to detect its encoding
+ENCODING_SAMPLE_BYTES = 1 << 20
+
+# Rows read to infer column types when a reader is given a row_limit
+TYPE_INFERENCE_ROWS = 10000
+
+# Rows per chunk of read_sav_chunks
+CHUNK_ROWS = 100000
+
+# File size per reader process when read_sav chooses num_processes itself
+MULTIPROCESS_BYTES = 256 * 1024 * 1024
+
+# SPSS and Stata display formats pyreadstat reads as datetimes, or as date/time objects
+DATETIME_FORMATS = re.compile(r'^(DATETIME|YMDHMS|%-?tc)', re.IGNORECASE)
+DATE_FORMATS = re.compile(r'^([AEJS]?DATE|DTIME|TIME|QYR|MOYR|WKYR|%-?t)', re.IGNORECASE)
+
+
+def empty_typed_frame(meta):
+    """
+    Empty DataFrame with the columns of a pyreadstat metadata object, typed the
+    way read_sav types them after a full read: strings and dates as object,
+    datetimes as datetime64, integer storage as Int64 and other numbers as Float64.
+    Whether a double column only holds integers is not known without the data.
+    """
+    dtypes = {}
+    for col in meta.column_names:
+        storage = meta.readstat_variable_types.get(col, 'double')
+        display_format = str(meta.original_variable_types.get(col) or '')
+        if DATETIME_FORMATS.match(display_format):
+            dtypes[col] = 'datetime64[ns]'
+        elif storage == 'string' or DATE_FORMATS.match(display_format):
+            dtypes[col] = 'object'
+        elif storage.startswith('int'):
+            dtypes[col] = 'Int64'
+        else:
+            dtypes[col] = 'Float64'
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in dtypes.items()},
+                        columns=meta.column_names)
+
+
+def sav_num_processes(filename):
+    """
+    Number of processes read_sav uses to read a whole file: one per
+    MULTIPROCESS_BYTES of file size, at most one per CPU.
+    """
+    size = Path(filename).stat().st_size
+    return max(1, min(os.cpu_count() or 1, size // MULTIPROCESS_BYTES))
+
+
+def _sav_header(read, filename, **kwargs):
+    """
+    Read the header of an SPSS or Stata file with read (pyr.read_sav or
+    pyr.read_dta) and decide the encoding of the file from it: the encoding the
+    header records, which SPSS files usually have, or else the first of
+    ENCODINGS the header can be read with. Returns the metadata and encoding.
+    """
+    try:
+        meta = read(filename, metadataonly=True, **kwargs)[1]
+    except Exception as e:
+        print(f"Failed to read file header with its own encoding: {e}")
+    else:
+        if meta.file_encoding:
+            return meta, meta.file_encoding
+
+    for encoding in ENCODINGS:
+        try:
+            return read(filename, encoding=encoding, metadataonly=True, **kwargs)[1], encoding
+        except Exception as e:
+            print(f"Failed to read file with encoding {encoding}: {e}")
+            continue
+    raise ValueError("Could not read file with any encoding!")
+
 
 # import of spss and stata files
-def read_sav(filename: Path, missings=True, disable_datetime_conversion=True):
+def read_sav(filename: Path, missings=True, disable_datetime_conversion=True, metadata_only=False,
+             row_limit=None, inference_rows=TYPE_INFERENCE_ROWS, num_processes=None):
+    """
+    Read an SPSS (.sav) or Stata (.dta) file.
+
+    With metadata_only=True only the file header is read: the returned frame is
+    empty (see empty_typed_frame) while meta, including number_rows, is complete.
+    Use it for structure-only conversions, where no data rows are generated.
+
+    With a row_limit only the first max(row_limit, inference_rows) rows are read
+    and typed, and the first row_limit of them returned. meta.number_rows still
+    counts every row in the file.
+
+    The encoding is decided from the file header (see _sav_header) and recorded
+    as meta.file_encoding, so the data is parsed once.
+
+    Whole files are read by num_processes processes, each reading a share of
+    the rows with pyreadstat.read_file_multiprocessing; by default
+    sav_num_processes picks the number from the file size and CPU count.
+    Header-only and row-limited reads always use a single process.
+    """
+    rows_to_read = ROW_LIMIT if row_limit is None else min(ROW_LIMIT, max(row_limit, inference_rows))
     kwargs = dict(
         user_missing=missings,
         dates_as_pandas_datetime=False,  # Do not interpret dates initially
@@ -29,29 +125,91 @@ def read_sav(filename: Path, missings=True, disable_datetime_conversion=True):
     if extension not in ['.sav', '.dta']:
         raise ValueError(f"Unsupported file type for read_sav! Expected .sav or .dta, got: {extension}")
 
-    # Try reading the file with different encodings
-    for encoding in ENCODINGS:
-        try:
-            if extension == '.sav':
-                df, meta = pyr.read_sav(filename, encoding=encoding, row_limit=ROW_LIMIT, **kwargs)
-            elif extension == '.dta':
-                df, meta = pyr.read_dta(filename, encoding=encoding, row_limit=ROW_LIMIT, **kwargs)
-            
-            # Fill NA values based on the data type of each column
-            for col in df.columns:
-                if df[col].dtype.kind in 'biufc':
-                    df[col].fillna(pd.NA, inplace=True)
-                    # Only convert to Int64 if all values are integers
-                    if all(df[col].dropna().astype(float).map(float.is_integer)):
-                        df[col] = df[col].astype('Int64')
-                else:
-                    df[col].fillna(np.nan, inplace=True)
-            break
-        except Exception as e:
-            print(f"Failed to read file with encoding {encoding}: {e}")
-            continue
-    else:
-        raise ValueError("Could not read file with any encoding!")
+    read = pyr.read_sav if extension == '.sav' else pyr.read_dta
+    header, encoding = _sav_header(read, filename, user_missing=missings)
+
+    if metadata_only:
+        header.datafile = filename
+        header.file_encoding = encoding
+        return empty_typed_frame(header), header, str(filename), header.number_rows
+
+    if row_limit is not None:
+        num_processes = 1
+    elif num_processes is None:
+        num_processes = sav_num_processes(filename)
+
+    try:
+        df, meta = _read_sav_rows(read, filename, encoding, rows_to_read, num_processes,
+                                  header.number_rows, **kwargs)
+    except Exception as e:
+        raise ValueError(f"Could not read file with encoding {encoding}: {e}") from e
+
+    df, _ = _type_sav_frame(df)
+
+    if row_limit is not None:
+        # pyreadstat counts the rows it read, the header knows the file's
+        if header.number_rows is not None:
+            meta.number_rows = header.number_rows
+        df = df.head(row_limit)
+
+    # Store filename and encoding in meta
+    meta.datafile = filename
+    meta.file_encoding = encoding
+    
+    # Return all expected values
+    return df, meta, str(filename), meta.number_rows
+
+
+def _read_sav_rows(read, filename, encoding, row_limit, num_processes, number_rows, **kwargs):
+    """
+    Read up to row_limit rows with read (pyr.read_sav or pyr.read_dta). With
+    num_processes > 1 the rows are split across processes, unless number_rows,
+    the number of rows in the file header, is None or exceeds row_limit.
+    """
+    if num_processes > 1:
+        if number_rows is not None and number_rows <= row_limit:
+            return pyr.read_file_multiprocessing(read, filename, num_processes=num_processes,
+                                                 num_rows=number_rows, encoding=encoding, **kwargs)
+    return read(filename, encoding=encoding, row_limit=row_limit, **kwargs)
+
+
+def _int64_array(column):
+    """
+    The values of a numeric column as an Int64 array, or None if not all of its
+    values are integers. Vectorised, as columns can hold millions of rows.
+    """
+    missing = column.isna().to_numpy()
+    values = column.to_numpy(dtype=float, na_value=0.0)
+    if not (np.isfinite(values).all() and (values == np.floor(values)).all()
+            and (np.abs(values) < 2.0 ** 63).all()):
+        return None
+    return pd.arrays.IntegerArray(values.astype('int64'), missing)
+
+
+def _type_sav_frame(df, integer_columns=None):
+    """
+    Type a frame read by pyreadstat the way read_sav returns it. Numeric columns
+    whose values are all integers become Int64. With integer_columns given, the
+    Int64 columns are decided by the caller instead: those columns become Int64
+    and other numeric columns Float64, whatever values this frame holds.
+    Returns the frame and its Int64 columns.
+    """
+    # Fill NA values based on the data type of each column
+    int64_columns = set()
+    for col in df.columns:
+        if df[col].dtype.kind in 'biufc':
+            df[col].fillna(pd.NA, inplace=True)
+            # Only convert to Int64 if all values are integers
+            values = None
+            if integer_columns is None or col in integer_columns:
+                values = _int64_array(df[col])
+            if values is not None:
+                df[col] = values
+                int64_columns.add(col)
+            elif integer_columns is not None:
+                df[col] = df[col].astype('Float64')
+        else:
+            df[col].fillna(np.nan, inplace=True)
 
     # Manually handle the problematic date columns
     for col in df.columns:
@@ -70,11 +228,118 @@ def read_sav(filename: Path, missings=True, disable_datetime_conversion=True):
             df[col] = df[col].convert_dtypes()
     
     df.replace({np.nan: None, pd.NA: None}, inplace=True)
+    return df, int64_columns
+
+
+class ChunkedFrame:
+    """
+    The rows of an SPSS or Stata file, read chunk by chunk with pyreadstat.
+
+    Iterating yields typed DataFrames of up to chunksize rows in row order,
+    reading the file again on every iteration, so only one chunk is in memory
+    at a time. Every chunk types a column the way read_sav types it after
+    reading the whole file: the first iteration decides the Int64 columns (see
+    integer_columns) before any chunk is typed. len() is the number of rows in
+    the file and head(n) the first n rows, so DDICDI_converter_JSONLD_incremental
+    accepts a ChunkedFrame wherever it takes a DataFrame.
+    """
+
+    def __init__(self, filename, meta, encoding, chunksize=CHUNK_ROWS, missings=True):
+        self.filename = Path(filename)
+        self.meta = meta
+        self.encoding = encoding
+        self.chunksize = chunksize
+        self.missings = missings
+        self.columns = pd.Index(meta.column_names)
+        self._integer_columns = None
+
+    def __len__(self):
+        return self.meta.number_rows
+
+    def __iter__(self):
+        read = pyr.read_sav if self.filename.suffix.lower() == '.sav' else pyr.read_dta
+        chunks = pyr.read_file_in_chunks(read, self.filename, chunksize=self.chunksize,
+                                         encoding=self.encoding, user_missing=self.missings,
+                                         dates_as_pandas_datetime=False)
+        integer_columns = self.integer_columns()
+        for df, _ in chunks:
+            df, _ = _type_sav_frame(df, integer_columns)
+            yield df
+
+    def integer_columns(self):
+        """
+        The columns read_sav would make Int64: those the header stores as
+        integers, and the numeric ones whose values are all integers, which a
+        single pass over the numeric columns of the file decides. Cached.
+        """
+        if self._integer_columns is not None:
+            return self._integer_columns
+        integer_columns = set()
+        candidates = []
+        for col in self.meta.column_names:
+            storage = self.meta.readstat_variable_types.get(col, 'double')
+            display_format = str(self.meta.original_variable_types.get(col) or '')
+            if storage == 'string' or DATETIME_FORMATS.match(display_format) \
+                    or DATE_FORMATS.match(display_format):
+                continue
+            if storage.startswith('int'):
+                integer_columns.add(col)
+            else:
+                candidates.append(col)
+        if candidates:
+            read = pyr.read_sav if self.filename.suffix.lower() == '.sav' else pyr.read_dta
+            chunks = pyr.read_file_in_chunks(read, self.filename, chunksize=self.chunksize,
+                                             encoding=self.encoding, user_missing=self.missings,
+                                             dates_as_pandas_datetime=False, usecols=candidates)
+            integer_candidates = set(candidates)
+            for df, _ in chunks:
+                integer_candidates = {col for col in integer_candidates
+                                      if df[col].dtype.kind in 'biufc' and _int64_array(df[col]) is not None}
+                if not integer_candidates:
+                    break
+            integer_columns |= integer_candidates
+        self._integer_columns = integer_columns
+        return integer_columns
+
+    def head(self, n=5):
+        if n <= 0:
+            return empty_typed_frame(self.meta)
+        chunks = []
+        rows = 0
+        for chunk in self:
+            chunks.append(chunk)
+            rows += len(chunk)
+            if rows >= n:
+                break
+        if not chunks:
+            return empty_typed_frame(self.meta)
+        return pd.concat(chunks, ignore_index=True).head(n)
+
+
+def read_sav_chunks(filename: Path, missings=True, chunksize=CHUNK_ROWS):
+    """
+    Read an SPSS (.sav) or Stata (.dta) file for a conversion of all its rows,
+    without loading it: only the header is read here, the rows are read chunk
+    by chunk while they are converted. Returns the same tuple as read_sav, with
+    a ChunkedFrame in place of the DataFrame.
+
+    Files whose header doesn't record the number of rows are read with read_sav.
+    """
+    filename = Path(filename)  # Ensure filename is a Path object
+    extension = filename.suffix.lower()
+
+    if extension not in ['.sav', '.dta']:
+        raise ValueError(f"Unsupported file type for read_sav_chunks! Expected .sav or .dta, got: {extension}")
+
+    read = pyr.read_sav if extension == '.sav' else pyr.read_dta
+    meta, encoding = _sav_header(read, filename, user_missing=missings)
+
+    if meta.number_rows is None:
+        return read_sav(filename, missings=missings)
 
-    # Store filename in meta
     meta.datafile = filename
-    
-    # Return all expected values
+    meta.file_encoding = encoding
+    df = ChunkedFrame(filename, meta, encoding, chunksize=chunksize, missings=missings)
     return df, meta, str(filename), meta.number_rows
 
 
@@ -130,7 +395,70 @@ def detect_delimiter(filename, sample_size=5):
     return detected_delimiter
 
 
-def read_csv(filename: Path, delimiter=None, header=0, encoding=None, infer_types=True, date_format=None, dayfirst=False, **kwargs):
+def sniff_encoding(filename, sample_bytes=ENCODING_SAMPLE_BYTES):
+    """
+    Detect the encoding of a text file from its first sample_bytes: utf-8-sig
+    if it starts with a UTF-8 byte order mark, otherwise the first of ENCODINGS
+    that decodes the sample.
+    """
+    with open(filename, 'rb') as f:
+        sample = f.read(sample_bytes)
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    for encoding in ENCODINGS:
+        try:
+            # A multi-byte character may be cut off at the end of the sample
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=len(sample) < sample_bytes)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("Could not read file with any encoding!")
+
+
+def _read_text(read, filename, encoding=None):
+    """
+    Parse a text file once with read(encoding), using the given encoding or the
+    one sniff_encoding detects. Only if the file turns out to hold bytes past
+    the sample that the sniffed encoding can't decode is it parsed again, as
+    LATIN1, which decodes any byte. Returns read's result and the encoding.
+    """
+    encodings = [encoding] if encoding else [sniff_encoding(filename), 'LATIN1']
+    for encoding in encodings:
+        try:
+            return read(encoding), encoding
+        except UnicodeDecodeError as e:
+            print(f"Failed to read file with encoding {encoding}: {e}")
+        except Exception as e:
+            raise ValueError(f"Could not read file with encoding {encoding}: {e}") from e
+    raise ValueError("Could not read file with any encoding!")
+
+
+def count_lines(filename, chunk_size=1 << 20):
+    """
+    Count the lines of a text file on its raw bytes, without parsing it.
+    
+    Parameters:
+    -----------
+    filename : Path
+        Path to the file
+    chunk_size : int, default 1 MiB
+        Number of bytes read at a time
+        
+    Returns:
+    --------
+    int : The number of lines, including a last line without a line break
+    """
+    lines = 0
+    last = b'\n'
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    return lines + (last != b'\n')
+
+
+def read_csv(filename: Path, delimiter=None, header=0, encoding=None, infer_types=True, date_format=None, dayfirst=False,
+             row_limit=None, inference_rows=TYPE_INFERENCE_ROWS, **kwargs):
     """
     Read CSV file and create a metadata structure compatible with what pyreadstat returns
     
@@ -143,13 +471,19 @@ def read_csv(filename: Path, delimiter=None, header=0, encoding=None, infer_type
     header : int, default 0
         Row number to use as column names
     encoding : str, default None
-        File encoding (will try multiple encodings if None)
+        File encoding (detected with sniff_encoding if None)
     infer_types : bool, default True
         Attempt to infer data types from the data
     date_format : str, default None
         Format string for parsing dates (e.g., '%d/%m/%Y'). If None, tries to infer.
     dayfirst : bool, default False
         When parsing dates without a specified format, interpret the first value as day (European style)
+    row_limit : int, default None
+        Return only the first row_limit rows. Only max(row_limit, inference_rows) rows are
+        parsed, and number_rows is counted from the line breaks in the file (a line break
+        inside a quoted value counts as a row).
+    inference_rows : int, default TYPE_INFERENCE_ROWS
+        Number of rows used to infer data types when row_limit is set
     **kwargs : dict
         Additional arguments passed to pandas read_csv function
         
@@ -164,24 +498,13 @@ def read_csv(filename: Path, delimiter=None, header=0, encoding=None, infer_type
         delimiter = detect_delimiter(filename)
         print(f"Detected delimiter: '{delimiter}'")
     
-    # Try reading the file with different encodings if not specified
-    if encoding:
-        encodings = [encoding]
-    else:
-        encodings = ENCODINGS
-    
-    df = None
-    for enc in encodings:
-        try:
-            df = pd.read_csv(filename, delimiter=delimiter, header=header, encoding=enc, 
-                            low_memory=False, **kwargs)
-            break
-        except Exception as e:
-            print(f"Failed to read file with encoding {enc}: {e}")
-            continue
+    if row_limit is not None:
+        kwargs['nrows'] = max(row_limit, inference_rows)
     
-    if df is None:
-        raise ValueError("Could not read file with any encoding!")
+    df, encoding = _read_text(
+        lambda enc: pd.read_csv(filename, delimiter=delimiter, header=header, encoding=enc,
+                                low_memory=False, **kwargs),
+        filename, encoding)
     
     # Create a custom mutable metadata class instead of a namedtuple
     class CSVMetadata:
@@ -205,6 +528,7 @@ def read_csv(filename: Path, delimiter=None, header=0, encoding=None, infer_type
             self.attribute_vars = attribute_vars
             self.file_format = 'csv'  # Add a flag to identify this as a CSV file
             self.delimiter = ','      # Default delimiter - will be updated when file is read
+            self.file_encoding = None  # Will be updated when file is read
     
     # Infer data types if requested
     if infer_types:
@@ -337,6 +661,13 @@ def read_csv(filename: Path, delimiter=None, header=0, encoding=None, infer_type
     # Replace NaN with None
     df.replace({np.nan: None, pd.NA: None}, inplace=True)
     
+    number_rows = len(df)
+    if row_limit is not None:
+        if number_rows >= kwargs['nrows']:
+            header_lines = header + 1 if isinstance(header, int) else 0
+            number_rows = max(number_rows, count_lines(filename) - header_lines)
+        df = df.head(row_limit)
+    
     # Create metadata
     meta = CSVMetadata(
         column_names=column_names,
@@ -345,7 +676,7 @@ def read_csv(filename: Path, delimiter=None, header=0, encoding=None, infer_type
         variable_value_labels=value_labels,
         missing_ranges=missing_ranges,
         variable_measure=measure_types,
-        number_rows=len(df),
+        number_rows=number_rows,
         datafile=filename,
         missing_user_values=missing_user_values,
         measure_vars=column_names,  # By default, treat all columns as measure variables
@@ -353,13 +684,324 @@ def read_csv(filename: Path, delimiter=None, header=0, encoding=None, infer_type
         attribute_vars=[]           # Start with empty list of attributes
     )
     
-    # Update delimiter in metadata to match what was used to read the file
+    # Update delimiter and encoding in metadata to match what was used to read the file
     meta.delimiter = delimiter
+    meta.file_encoding = encoding
     
     return df, meta, str(filename), meta.number_rows
 
 
-def read_json(filename: Path, encoding=None, decompose_keys=True, **kwargs):
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Complete strings, the opening quote of a string that continues past the
+# buffer, and brackets
+_JSON_STRUCTURE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[][{}"]')
+
+
+class _JsonObjectReader:
+    """
+    Incremental parser for the top-level object of a JSON text file, read in chunks
+    of at least chunk_size characters: keys() yields its keys one at a time, and the
+    caller reads each value with read() or read_head(), or moves past it with skip().
+    object_keys() and array_items() walk the objects and arrays within a value.
+    """
+
+    def __init__(self, f, chunk_size=1 << 20):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        # Read at least as much as is buffered, so a large value is re-scanned
+        # a bounded number of times
+        chunk = self.f.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+
+    def _skip_whitespace(self):
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or self.eof:
+                return
+            self._fill()
+
+    def _expect(self, chars):
+        self._skip_whitespace()
+        char = self.buffer[self.pos:self.pos + 1]
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}", self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+    def _decode(self):
+        # A value only counts once something other than the rest of a number
+        # follows it: a number at the end of the buffer, or cut at its '.' or
+        # exponent, may continue in the next chunk
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(self.buffer, self.pos)
+                if end < len(self.buffer) and self.buffer[end] not in '.eE' or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def _scan(self, depth):
+        # Move past the end of the arrays and objects open at the given depth
+        # without decoding them: only strings and brackets are matched, and the
+        # commas between them counted at that depth. Returns the count
+        commas = 0
+        while True:
+            for match in _JSON_STRUCTURE.finditer(self.buffer, self.pos):
+                if depth == 1:
+                    commas += self.buffer.count(',', self.pos, match.start())
+                token = match.group()
+                if token == '"':
+                    # A string that continues in the next chunk
+                    self.pos = match.start()
+                    break
+                self.pos = match.end()
+                if token in '[{':
+                    depth += 1
+                elif token in ']}':
+                    depth -= 1
+                    if not depth:
+                        return commas
+            else:
+                if depth == 1:
+                    commas += self.buffer.count(',', self.pos)
+                self.pos = len(self.buffer)
+            if self.eof:
+                raise json.JSONDecodeError("Unterminated array or object", self.buffer, self.pos)
+            self._fill()
+
+    def peek(self):
+        """The first character of the next value ('' at the end of the file)"""
+        self._skip_whitespace()
+        return self.buffer[self.pos:self.pos + 1]
+
+    def object_keys(self):
+        """Keys of the object that comes next; the caller reads or skips each value"""
+        self._expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self._decode()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expecting property name", self.buffer, self.pos)
+            self._expect(':')
+            yield key
+            if self._expect(',}') == '}':
+                return
+
+    def keys(self):
+        """Keys of the top-level object; the caller reads or skips each value"""
+        self._fill()
+        yield from self.object_keys()
+        self._skip_whitespace()
+        if self.pos < len(self.buffer):
+            raise json.JSONDecodeError("Extra data", self.buffer, self.pos)
+
+    def read(self):
+        """The next value"""
+        return self._decode()
+
+    def read_head(self, n):
+        """
+        The next value, an array cut at n items, and its number of items (None
+        if it is not an array). Items past the first n are counted, not decoded.
+        """
+        if self.peek() != '[':
+            return self._decode(), None
+        self.pos += 1
+        items = []
+        if self.peek() == ']':
+            self.pos += 1
+            return items, 0
+        while True:
+            items.append(self._decode())
+            if self._expect(',]') == ']':
+                return items, len(items)
+            if len(items) >= n:
+                return items, len(items) + 1 + self._scan(1)
+
+    def array_items(self):
+        """Yields once per item of the array that comes next; the caller reads or skips each item"""
+        self._expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self._expect(',]') == ']':
+                return
+
+    def skip(self):
+        """Move past the next value without decoding it; its number of items if it is an array, else None"""
+        char = self.peek()
+        if char not in ('[', '{') or not char:
+            self._decode()
+            return None
+        self.pos += 1
+        empty = self.peek() == (']' if char == '[' else '}')
+        commas = self._scan(1)
+        if char == '{':
+            return None
+        return 0 if empty else commas + 1
+
+
+def _json_layout(sample_values):
+    """Layout of a JSON key-value file ('array', 'deep_nested', 'nested' or 'flat') from its first values"""
+    # Check for array structures (e.g., {"animals": [...]})
+    if any(isinstance(val, list) for val in sample_values):
+        return 'array'
+    
+    # Check for nested objects (dictionaries)
+    if any(isinstance(val, dict) for val in sample_values):
+        # Check if nested objects contain other objects (deep nesting)
+        for val in sample_values:
+            if isinstance(val, dict) and any(isinstance(nested_val, dict) for nested_val in val.values()):
+                return 'deep_nested'
+        return 'nested'
+    
+    return 'flat'
+
+
+def _read_variables_sample(reader, max_rows):
+    """
+    The 'variables' member of a structured JSON file, with the values of each
+    variable cut at max_rows, and the number of rows (the most values of a variable)
+    """
+    if reader.peek() != '{':
+        return reader.read(), 0
+    variables = {}
+    number_rows = 0
+    for var_name in reader.object_keys():
+        if reader.peek() != '{':
+            variables[var_name] = reader.read()
+            continue
+        var_info = variables[var_name] = {}
+        for field in reader.object_keys():
+            if field == 'values':
+                var_info[field], items = reader.read_head(max_rows)
+                number_rows = max(number_rows, items or 0)
+            else:
+                var_info[field] = reader.read()
+    return variables, number_rows
+
+
+def _flat_keys(value):
+    """Column names of a JSON value as the array and deep nested readers flatten it"""
+    if not isinstance(value, dict):
+        return {'value'}
+    keys = set()
+    
+    def flatten(d, parent_key):
+        for k, v in d.items():
+            new_key = f"{parent_key}.{k}" if parent_key else k
+            if isinstance(v, dict):
+                flatten(v, new_key)
+            else:
+                keys.add(new_key)
+    
+    flatten(value, '')
+    return keys
+
+
+def _read_json_sample(f, max_rows):
+    """
+    Read the members of a JSON key-value file needed for its first max_rows rows.
+    
+    The first 5 members (which determine the layout) and the 'variables' member are
+    always kept, as is every member of the single-row 'nested' layout. Arrays, and the
+    values of each variable in 'variables', are cut at max_rows items.
+    
+    Past the first max_rows rows, the rows are counted but only kept if they add a
+    column, so the sample has the columns of the whole file: array items with a new
+    property or from a second array (the array_source column), 'deep_nested' objects
+    with a new property, and flat keys with more '/' levels. These rows come after the
+    first max_rows. Array items are decoded one at a time to find their properties;
+    flat members past the sample are scanned without being decoded.
+    
+    Returns:
+    --------
+    tuple : (dict of kept members, number of rows in the file)
+    """
+    reader = _JsonObjectReader(f)
+    members = {}
+    first_values = []
+    layout = None
+    kept_items = kept_members = 0
+    array_rows = member_rows = 0
+    variable_rows = None
+    item_columns, object_columns, sources = set(), set(), set()
+    key_levels = 0
+
+    def read_array(key):
+        nonlocal kept_items, array_rows
+        items = []
+        for _ in reader.array_items():
+            item = reader.read()
+            array_rows += 1
+            keys = _flat_keys(item)
+            if kept_items < max_rows:
+                kept_items += 1
+            elif keys <= item_columns and (key in sources or len(sources) > 1):
+                continue
+            items.append(item)
+            item_columns.update(keys)
+            sources.add(key)
+        return items
+
+    for key in reader.keys():
+        if key == 'variables':
+            value, variable_rows = _read_variables_sample(reader, max_rows)
+        elif layout in (None, 'array') and reader.peek() == '[':
+            value = read_array(key)
+        elif layout in (None, 'nested') or (kept_items if layout == 'array' else kept_members) < max_rows:
+            value = reader.read()
+        elif layout == 'deep_nested':
+            value = reader.read()
+            if _flat_keys(value) <= object_columns:
+                member_rows += 1
+                continue
+        elif layout == 'flat' and len(key.split('/')) > key_levels:
+            value = reader.read()
+        else:
+            # Past the sample: only counted
+            reader.skip()
+            member_rows += 1
+            continue
+        
+        members[key] = value
+        member_rows += 1
+        kept_members += 1
+        if not isinstance(value, list):
+            object_columns.update(_flat_keys(value))
+            key_levels = max(key_levels, len(key.split('/')))
+        if layout is None:
+            first_values.append(value)
+            if len(first_values) == 5:
+                layout = _json_layout(first_values)
+    
+    if variable_rows is not None:
+        # Structured layout: rows are the values of each variable
+        return members, variable_rows
+    if layout is None:
+        # Fewer than 5 members, all kept
+        layout = _json_layout(first_values)
+    return members, array_rows if layout == 'array' else member_rows
+
+
+def read_json(filename: Path, encoding=None, decompose_keys=True, row_limit=None,
+              inference_rows=TYPE_INFERENCE_ROWS, **kwargs):
     """
     Read JSON key-value file and create a metadata structure compatible with what pyreadstat returns
     
@@ -389,9 +1031,15 @@ def read_json(filename: Path, encoding=None, decompose_keys=True, **kwargs):
     filename : Path
         Path to the JSON file
     encoding : str, default None
-        File encoding (will try multiple encodings if None)
+        File encoding (detected with sniff_encoding if None)
     decompose_keys : bool, default True
         Whether to decompose hierarchical keys (with '/') into separate columns
+    row_limit : int, default None
+        Return only the first row_limit rows. The file is parsed incrementally and only
+        the first max(row_limit, inference_rows) rows are kept, plus the rows past them
+        that add a column, so the columns are those of the whole file.
+    inference_rows : int, default TYPE_INFERENCE_ROWS
+        Number of rows used to infer data types when row_limit is set
     **kwargs : dict
         Additional arguments (for compatibility)
         
@@ -401,24 +1049,13 @@ def read_json(filename: Path, encoding=None, decompose_keys=True, **kwargs):
     """
     filename = Path(filename)  # Ensure filename is a Path object
     
-    # Try reading the file with different encodings if not specified
-    if encoding:
-        encodings = [encoding]
-    else:
-        encodings = ENCODINGS
-    
-    json_data = None
-    for enc in encodings:
-        try:
-            with open(filename, 'r', encoding=enc) as f:
-                json_data = json.load(f)
-            break
-        except Exception as e:
-            print(f"Failed to read file with encoding {enc}: {e}")
-            continue
-    
-    if json_data is None:
-        raise ValueError("Could not read JSON file with any encoding!")
+    def load(enc):
+        with open(filename, 'r', encoding=enc) as f:
+            if row_limit is None:
+                return json.load(f), None
+            return _read_json_sample(f, max(row_limit, inference_rows))
+
+    (json_data, number_rows), encoding = _read_text(load, filename, encoding)
     
     # Check format type: structured (has 'variables' key), nested objects, or simple flat key-value format
     if 'variables' in json_data:
@@ -426,42 +1063,38 @@ def read_json(filename: Path, encoding=None, decompose_keys=True, **kwargs):
         variables = json_data['variables']
         if not variables:
             raise ValueError("JSON file must contain at least one variable in the 'variables' section")
-        return _read_structured_json(json_data, filename)
+        layout = 'structured'
+        result = _read_structured_json(json_data, filename)
     else:
         if not json_data:
             raise ValueError("JSON file must contain at least one key-value pair")
         
         # Analyze JSON structure to determine format type
         sample_values = list(json_data.values())[:5]  # Check first 5 values for efficiency
+        layout = _json_layout(sample_values)
         
-        # Check for array structures (e.g., {"animals": [...]})
-        has_arrays = any(isinstance(val, list) for val in sample_values)
-        if has_arrays:
-            return _read_array_json(json_data, filename)
-        
-        # Check for nested objects (dictionaries)
-        has_nested_objects = any(isinstance(val, dict) for val in sample_values)
-        if has_nested_objects:
-            # Check if nested objects contain other objects (deep nesting)
-            has_deep_nesting = False
-            for val in sample_values:
-                if isinstance(val, dict):
-                    for nested_val in val.values():
-                        if isinstance(nested_val, dict):
-                            has_deep_nesting = True
-                            break
-                if has_deep_nesting:
-                    break
-            
-            if has_deep_nesting:
-                # Deep nested format - flatten nested hierarchies with dot notation
-                return _read_deep_nested_json(json_data, filename)
-            else:
-                # Simple nested object format - flatten objects into separate columns
-                return _read_nested_json(json_data, filename)
+        if layout == 'array':
+            result = _read_array_json(json_data, filename)
+        elif layout == 'deep_nested':
+            # Deep nested format - flatten nested hierarchies with dot notation
+            result = _read_deep_nested_json(json_data, filename)
+        elif layout == 'nested':
+            # Simple nested object format - flatten objects into separate columns
+            result = _read_nested_json(json_data, filename)
         else:
             # Simple flat key-value format
-            return _read_flat_json(json_data, filename, decompose_keys)
+            result = _read_flat_json(json_data, filename, decompose_keys)
+    
+    # Record the encoding the file was read with
+    result[1].file_encoding = encoding
+    
+    if row_limit is None:
+        return result
+    
+    df, meta, filename, _ = result
+    if layout != 'nested':  # The single row of the nested layout holds the whole file
+        meta.number_rows = number_rows
+    return df.head(row_limit), meta, filename, meta.number_rows
 
 
 def _read_flat_json(json_data, filename, decompose_keys=True):
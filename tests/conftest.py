@@ -0,0 +1,46 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+import jsonld_context
+from spss_import import read_csv
+
+
+# Used in place of the DDI-CDI context when the published copy is not vendored
+# in contexts/ (see jsonld_context.py --refresh), so the converter can be tested
+# offline. It only maps terms onto the vocabulary: tests of the vocabulary
+# itself read the vendored copy and skip without it
+STAND_IN_CONTEXT = {'@context': {'@vocab': 'http://ddialliance.org/Specification/DDI-CDI/1.0/RDF/'}}
+
+
+def vendored_context_path():
+    """Path of the vendored DDI-CDI context, or None if it is not vendored"""
+    filename = jsonld_context.BUNDLED_CONTEXTS[jsonld_context.DDI_CDI_CONTEXT_URL]
+    path = os.path.join(jsonld_context.CONTEXT_DIR, filename)
+    return path if os.path.exists(path) else None
+
+
+def quietly(function, *args, **kwargs):
+    """Call function without the progress output the converter prints"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def ddi_cdi_context(monkeypatch):
+    """Serve STAND_IN_CONTEXT for the DDI-CDI context unless the published one is vendored"""
+    if vendored_context_path() is None:
+        monkeypatch.setitem(jsonld_context._documents, jsonld_context.DDI_CDI_CONTEXT_URL, STAND_IN_CONTEXT)
+
+
+@pytest.fixture
+def csv_dataset(tmp_path):
+    """Write a CSV file and read it like the API does: (df, meta, path)"""
+    def read(text, name='data.csv'):
+        path = tmp_path / name
+        path.write_text(text, encoding='utf-8')
+        df, meta, _, _ = quietly(read_csv, path)
+        return df, meta, str(path)
+    return read
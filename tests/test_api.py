@@ -0,0 +1,68 @@
+import io
+import json
+import zipfile
+
+import pytest
+from flask import Flask
+
+import api
+import DDICDI_converter_JSONLD_incremental as converter
+from DDICDI_converter_JSONLD_incremental import generate_complete_json_ld
+from format_converter import FormatConverter
+from conftest import quietly
+
+CSV = 'my id,score\n1,2.5\n2,3.5\n3,4.0\n'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.delenv(api.API_KEY_ENV_VAR, raising=False)
+    monkeypatch.delenv(api.WORKERS_ENV_VAR, raising=False)
+    server = Flask(__name__)
+    api.register_api_routes(server)
+    return server.test_client()
+
+
+def convert(client, **form):
+    form['file'] = (io.BytesIO(CSV.encode('utf-8')), 'data.csv')
+    return quietly(client.post, '/api/convert', data=form)
+
+
+def test_jsonld_of_all_rows_is_streamed(client, csv_dataset, monkeypatch):
+    def joined(*args, **kwargs):
+        raise AssertionError('the whole document was joined in memory')
+    monkeypatch.setattr(api, 'generate_complete_json_ld', joined)
+    response = convert(client, output_format='jsonld', process_all_rows='true')
+    assert response.status_code == 200
+    body = quietly(response.get_data, as_text=True)
+
+    df, meta, _ = csv_dataset(CSV)
+    meta.measure_vars = list(meta.column_names)
+    expected = quietly(generate_complete_json_ld, df, meta, 'data.csv', process_all_rows=True)
+    assert json.loads(body) == json.loads(expected)
+
+
+@pytest.mark.parametrize('workers', [None, '2'])
+def test_bundle_generates_the_triples_once(client, monkeypatch, workers):
+    formats = ['jsonld', 'ntriples', 'turtle', 'nquads', 'rdfxml', 'binary']
+    expected = {fmt: quietly(convert(client, output_format=fmt, process_all_rows='true').get_data)
+                for fmt in formats}
+    if workers:
+        # The RDF writers run on worker processes
+        monkeypatch.setenv(api.WORKERS_ENV_VAR, workers)
+
+    calls = []
+    generate = converter.iter_complete_ntriples
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return generate(*args, **kwargs)
+    monkeypatch.setattr(converter, 'iter_complete_ntriples', counted)
+    response = convert(client, output_format='bundle', process_all_rows='true')
+    assert response.status_code == 200
+    assert len(calls) == 1
+
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+        for fmt in formats:
+            name = 'data_DDICDI' + FormatConverter.FORMATS[fmt]['extension']
+            assert archive.read(name) == expected[fmt]
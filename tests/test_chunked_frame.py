@@ -0,0 +1,27 @@
+import pandas as pd
+import pyreadstat
+
+from DDICDI_converter_JSONLD_incremental import generate_complete_json_ld, iter_complete_ntriples
+from spss_import import read_sav, read_sav_chunks
+from conftest import quietly
+
+
+def test_chunks_type_columns_like_a_full_read(tmp_path):
+    # score only holds integers in the first chunk of 3 rows
+    path = tmp_path / 'data.sav'
+    frame = pd.DataFrame({'id': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0],
+                          'score': [2.0, None, 4.0, 5.0, 6.5, 7.0, 8.0]})
+    pyreadstat.write_sav(frame, str(path))
+
+    df, meta, _, _ = quietly(read_sav, path)
+    chunks, chunks_meta, _, _ = quietly(read_sav_chunks, path, chunksize=3)
+    for column in ('id', 'score'):
+        values = [repr(value) for chunk in chunks for value in chunk[column]]
+        assert values == [repr(value) for value in df[column]]
+
+    for options in ({'process_all_rows': True, 'chunk_size': 2}, {'max_rows': 5}):
+        expected = quietly(generate_complete_json_ld, df, meta, str(path), **options)
+        assert quietly(generate_complete_json_ld, chunks, chunks_meta, str(path), **options) == expected
+        expected = ''.join(quietly(iter_complete_ntriples, df, meta, str(path), **options))
+        assert ''.join(quietly(iter_complete_ntriples, chunks, chunks_meta, str(path), **options)) == expected
+        assert '"2.0"' in expected
@@ -0,0 +1,74 @@
+import io
+import json
+
+import pytest
+
+from spss_import import _JsonObjectReader, read_json
+from conftest import quietly
+
+
+VALUES = [
+    [],
+    [1, -2.5e3, 'a"b', 'x\\"]}', {'k,': [True, None]}, [[], {}]],
+    {'k"': '[,{', 'n': [1, 2]},
+    '\\u00e9,[',
+    -2500.0,
+]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 64])
+def test_reader_skips_and_counts_values_split_across_chunks(chunk_size):
+    for value in VALUES:
+        text = '{"a": ' + json.dumps(value) + ' , "b": 7}'
+        reader = _JsonObjectReader(io.StringIO(text), chunk_size=chunk_size)
+        keys = reader.keys()
+        assert next(keys) == 'a'
+        assert reader.skip() == (len(value) if isinstance(value, list) else None)
+        assert next(keys) == 'b' and reader.read() == 7
+        assert list(keys) == []
+
+        reader = _JsonObjectReader(io.StringIO(text), chunk_size=chunk_size)
+        keys = reader.keys()
+        next(keys)
+        if isinstance(value, list):
+            assert reader.read_head(2) == (value[:2], len(value))
+        else:
+            assert reader.read_head(2) == (value, None)
+        assert next(keys) == 'b' and reader.read() == 7
+
+
+def test_preview_counts_the_rows_of_the_whole_file(tmp_path):
+    layouts = {
+        'array': {'rows': [{'id': i, 'name': f'n{i}'} for i in range(40)], 'more': [{'id': 1}] * 5},
+        'structured': {'dataset_name': 'D',
+                       'variables': {'id': {'type': 'identifier', 'values': list(range(40))},
+                                     'name': {'type': 'measure', 'values': [f'n{i}' for i in range(40)]}}},
+        'flat': {f'k{i}': i for i in range(40)},
+    }
+    for name, data in layouts.items():
+        path = tmp_path / f'{name}.json'
+        path.write_text(json.dumps(data), encoding='utf-8')
+        df, meta, _, number_rows = quietly(read_json, path)
+        sample, sample_meta, _, sample_rows = quietly(read_json, path, row_limit=3, inference_rows=5)
+        assert sample_rows == sample_meta.number_rows == number_rows
+        assert sample.to_dict('list') == df.head(3).to_dict('list')
+
+
+def test_preview_has_the_columns_of_the_whole_file(tmp_path):
+    layouts = {
+        # Later arrays add a property and the array_source column
+        'arrays': {'rows': [{'kind': 'a', 'n': i} for i in range(40)],
+                   **{f'more{i}': [{'kind': 'b', 'n': i, 'extra': 'x'}] for i in range(6)}},
+        'many_arrays': {f'a{i}': [{'kind': 'a', 'n': i}] for i in range(30)},
+        'hierarchical_keys': {**{f'group/k{i}': i for i in range(40)}, 'x/y/z/w': 1},
+        'deep_nested': {**{f'r{i}': {'a': {'b': i}} for i in range(40)}, 'late': {'a': {'b': 1, 'c': {'d': 2}}}},
+    }
+    for name, data in layouts.items():
+        path = tmp_path / f'{name}.json'
+        path.write_text(json.dumps(data), encoding='utf-8')
+        df, meta, _, number_rows = quietly(read_json, path)
+        for limits in ({'row_limit': 5}, {'row_limit': 1, 'inference_rows': 3}):
+            sample, sample_meta, _, sample_rows = quietly(read_json, path, **limits)
+            assert sample_meta.column_names == meta.column_names, name
+            assert list(sample.columns) == list(df.columns)
+            assert len(sample) == limits['row_limit'] and sample_rows == number_rows
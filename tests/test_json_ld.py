@@ -0,0 +1,46 @@
+import json
+
+import DDICDI_converter_JSONLD_incremental as converter
+from DDICDI_converter_JSONLD_incremental import generate_complete_json_ld
+from conftest import quietly
+
+CSV = 'id,score,label\n' + ''.join(f'{i},{i * 1.5},row {i}\n' for i in range(23))
+
+
+def test_parallel_row_shards_keep_document_order(csv_dataset, monkeypatch):
+    df, meta, path = csv_dataset(CSV)
+    # Many more shards than pending tasks
+    monkeypatch.setattr(converter, 'CHUNKED_FRAME_SHARD_ROWS', 4)
+    for indent in (4, None):
+        expected = quietly(generate_complete_json_ld, df, meta, path, process_all_rows=True,
+                           chunk_size=2, indent=indent)
+        assert quietly(generate_complete_json_ld, df, meta, path, process_all_rows=True,
+                       chunk_size=2, indent=indent, workers=2) == expected
+
+
+def test_row_level_components_encoded_column_by_column(csv_dataset):
+    df, meta, _ = csv_dataset('my id,ærø,text\n1,2.5,"a ""quoted"" \\ text"\n2,,ü€\n3,4,\n')
+    frame = converter._InstanceValueFrame(df, meta)
+    for indent in (4, None):
+        assert frame.encoded(1, 3, indent, 2) == converter._encode_items(frame.elements(1, 3), indent, 2)
+        assert frame.encoded(3, 5, indent, 2) == ''
+        for variable in meta.column_names:
+            assert converter._encode_data_points(variable, 1, 3, '#wideDataSet', indent, 2) == \
+                converter._encode_items(converter._variable_DataPoints(variable, 1, 3, '#wideDataSet'), indent, 2)
+            assert converter._encode_data_point_positions(variable, 1, 3, indent, 2) == \
+                converter._encode_items(converter._variable_DataPointPositions(variable, 1, 3), indent, 2)
+
+
+def test_parallel_variable_metadata_in_column_order(csv_dataset, monkeypatch):
+    columns = [f'v{i}' for i in range(12)]
+    df, meta, path = csv_dataset(','.join(columns) + '\n' + ','.join('1' * len(columns)) + '\n')
+    # Value labels and missing values listed in another order than the columns
+    meta.variable_value_labels = {variable: {1: 'Yes', 2: 'No'} for variable in reversed(columns[::2])}
+    meta.missing_ranges = {variable: [{'lo': 9, 'hi': 9}] for variable in reversed(columns[::3])}
+    monkeypatch.setattr(converter, 'PARALLEL_METADATA_MIN_VARIABLES', 1)
+
+    serial = json.loads(quietly(generate_complete_json_ld, df, meta, path))
+    parallel = json.loads(quietly(generate_complete_json_ld, df, meta, path, workers=2))
+    assert parallel == serial
+    domains = [item['@id'] for item in serial['DDICDIModels'] if item['@type'] == 'SentinelValueDomain']
+    assert domains == [f'#sentinelValueDomain-{variable}' for variable in columns[::3]]
@@ -0,0 +1,131 @@
+import json
+import threading
+
+import pytest
+from rdflib import RDF, Graph
+
+import jsonld_context
+from DDICDI_converter_JSONLD_incremental import JSON_LD_CONTEXT, generate_complete_json_ld, iter_complete_ntriples
+from format_converter import FormatConverter
+from conftest import quietly, vendored_context_path
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """No network: DDI_JSONLD_OFFLINE is set and any fetch fails the test"""
+    def fetch(url):
+        raise AssertionError(f"fetched {url}")
+
+    monkeypatch.setenv(jsonld_context.OFFLINE_ENV_VAR, 'true')
+    monkeypatch.setattr(jsonld_context, '_fetch', fetch)
+    monkeypatch.setattr(jsonld_context, '_documents', {})
+    monkeypatch.setattr(jsonld_context, '_rdflib_documents', jsonld_context._DocumentCache())
+    monkeypatch.setattr(jsonld_context, '_processed_contexts', jsonld_context.OrderedDict())
+    FormatConverter.graph_cache.clear()
+
+
+@pytest.fixture
+def published_context():
+    """The vendored DDI-CDI context, as published"""
+    path = vendored_context_path()
+    if path is None:
+        pytest.skip("the published DDI-CDI context is not vendored, run python jsonld_context.py --refresh")
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_vendored_context_is_loaded_without_network(offline, published_context):
+    assert jsonld_context.load_document(jsonld_context.DDI_CDI_CONTEXT_URL) == published_context
+    assert '@context' in published_context
+
+
+def test_converter_terms_are_defined_by_the_published_context(offline, published_context, csv_dataset):
+    df, meta, path = csv_dataset('id,score\n1,2.5\n2,3.5\n')
+    document = json.loads(quietly(generate_complete_json_ld, df, meta, path, max_rows=2))
+    terms = set()
+
+    def collect(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == '@context':
+                    continue
+                if key == '@type':
+                    terms.update(value if isinstance(value, list) else [value])
+                elif not key.startswith('@'):
+                    terms.add(key)
+                collect(value)
+        elif isinstance(node, list):
+            for item in node:
+                collect(item)
+    collect(document)
+
+    # Every term resolves through the published context, and the N-Triples
+    # templates use exactly those IRIs
+    context = jsonld_context.rdflib_context(JSON_LD_CONTEXT, 'http://example.org/ddi/')
+    expanded = {term: context.expand(term) for term in terms}
+    assert [term for term, iri in expanded.items() if not iri or ':' not in iri] == []
+    ntriples = ''.join(quietly(iter_complete_ntriples, df, meta, path, max_rows=2))
+    graph = Graph().parse(data=ntriples, format='nt')
+    used = {str(p) for p in graph.predicates()} | {str(o) for o in graph.objects(None, RDF.type)}
+    assert used <= set(expanded.values()) | {str(RDF.type)}
+
+
+def test_conversion_without_network(offline, published_context, csv_dataset):
+    df, meta, path = csv_dataset('id,score\n1,2.5\n2,3.5\n')
+    ntriples = ''.join(quietly(iter_complete_ntriples, df, meta, path, max_rows=2))
+    assert '<http://example.org/ddi/#instanceVariable-score>' in ntriples
+
+
+def test_unvendored_context_offline_is_an_error(offline, tmp_path, monkeypatch):
+    monkeypatch.setattr(jsonld_context, 'CONTEXT_DIR', str(tmp_path))
+    with pytest.raises(ValueError, match='jsonld_context.py --refresh'):
+        jsonld_context.load_document(jsonld_context.DDI_CDI_CONTEXT_URL)
+
+
+def test_unvendored_context_is_fetched_once(tmp_path, monkeypatch):
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return {'@context': {}}
+
+    monkeypatch.delenv(jsonld_context.OFFLINE_ENV_VAR, raising=False)
+    monkeypatch.setattr(jsonld_context, 'CONTEXT_DIR', str(tmp_path))
+    monkeypatch.setattr(jsonld_context, '_fetch', fetch)
+    monkeypatch.setattr(jsonld_context, '_documents', {})
+    for _ in range(2):
+        assert jsonld_context.load_document(jsonld_context.DDI_CDI_CONTEXT_URL) == {'@context': {}}
+    assert fetched == [jsonld_context.DDI_CDI_CONTEXT_URL]
+
+
+def test_refresh_vendors_the_published_bytes(tmp_path, monkeypatch):
+    published = b'{"@context":\r\n  {"@vocab": "http://example.org/"}}'
+    monkeypatch.setattr(jsonld_context, 'CONTEXT_DIR', str(tmp_path / 'contexts'))
+    monkeypatch.setattr(jsonld_context, '_download', lambda url: published)
+    quietly(jsonld_context.refresh_bundled_contexts)
+    for filename in jsonld_context.BUNDLED_CONTEXTS.values():
+        assert (tmp_path / 'contexts' / filename).read_bytes() == published
+
+
+def test_unbundled_context_offline_is_an_error(offline):
+    with pytest.raises(ValueError, match=jsonld_context.OFFLINE_ENV_VAR):
+        jsonld_context.load_document('https://example.org/other.jsonld')
+
+
+def test_fetch_runs_outside_the_lock(monkeypatch):
+    url = 'https://example.org/slow.jsonld'
+    locked = []
+
+    def fetch(fetched_url):
+        locked.append(jsonld_context._lock.locked())
+        return {'@context': {}}
+
+    monkeypatch.delenv(jsonld_context.OFFLINE_ENV_VAR, raising=False)
+    monkeypatch.setattr(jsonld_context, '_fetch', fetch)
+    monkeypatch.setattr(jsonld_context, '_documents', {})
+    thread = threading.Thread(target=jsonld_context.load_document, args=(url,))
+    thread.start()
+    thread.join()
+    assert locked == [False]
+    assert jsonld_context.load_document(url) == {'@context': {}}
+    assert locked == [False]
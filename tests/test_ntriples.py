@@ -0,0 +1,30 @@
+import rdflib
+from rdflib.compare import isomorphic
+
+from DDICDI_converter_JSONLD_incremental import generate_complete_json_ld, iter_complete_ntriples
+from format_converter import FormatConverter, iri_segment
+from conftest import quietly
+
+BASE = FormatConverter.DEFAULT_BASE_URI
+
+
+def test_iri_segment():
+    assert iri_segment('score') == 'score'
+    assert iri_segment('my id') == 'my%20id'
+    assert iri_segment('a#b%c') == 'a%23b%25c'
+    assert iri_segment('ærø/x') == 'ærø/x'
+    assert iri_segment(1.0) == '1.0'
+
+
+def test_variable_names_with_spaces(csv_dataset):
+    df, meta, path = csv_dataset('my id,score\n1,2.5\n2,3.5\n')
+    for options in ({'max_rows': 2}, {'process_all_rows': True}):
+        ntriples = ''.join(quietly(iter_complete_ntriples, df, meta, path, **options))
+        graph = rdflib.Graph().parse(data=ntriples, format='nt')
+        assert rdflib.URIRef(BASE + '#instanceVariable-my%20id') in set(graph.subjects())
+        assert rdflib.URIRef(BASE + '#instanceValue-1-my%20id') in set(graph.subjects())
+
+        # The same triples as the conversion of the JSON-LD document through rdflib
+        document = quietly(generate_complete_json_ld, df, meta, path, **options)
+        expected = rdflib.Graph().parse(data=FormatConverter.convert(document, 'ntriples'), format='nt')
+        assert isomorphic(graph, expected)
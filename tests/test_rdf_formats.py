@@ -0,0 +1,54 @@
+import rdflib
+import pytest
+from rdflib.compare import isomorphic
+
+import DDICDI_converter_JSONLD_incremental as converter
+from format_converter import FormatConverter, iter_binary_rdf, _split_triple
+from conftest import quietly
+
+CSV = 'my id,score,comment\n1,2.5,hello world\n2,3.5,"a ""quoted"" text"\n'
+
+
+def _graph(data, rdflib_format):
+    graph = rdflib.Dataset() if rdflib_format == 'nquads' else rdflib.Graph()
+    graph.parse(data=data, format=rdflib_format)
+    # Compare the triples whatever named graph holds them
+    plain = rdflib.Graph()
+    for triple in (graph.triples((None, None, None)) if rdflib_format != 'nquads'
+                   else ((s, p, o) for s, p, o, _ in graph.quads((None, None, None, None)))):
+        plain.add(triple)
+    return plain
+
+
+def test_split_triple_term_by_term():
+    assert tuple(_split_triple('<s> <p> "a b" .')) == ('<s>', '<p>', '"a b"')
+    assert tuple(_split_triple('<s t> <p> "a \\" b"@en .')) == ('<s t>', '<p>', '"a \\" b"@en')
+    assert tuple(_split_triple('_:b0 <p q> <o r> .')) == ('_:b0', '<p q>', '<o r>')
+    with pytest.raises(ValueError):
+        _split_triple('<s> <p> .')
+
+
+@pytest.fixture
+def dataset(csv_dataset):
+    df, meta, path = csv_dataset(CSV)
+    document = quietly(converter.generate_complete_json_ld, df, meta, path, process_all_rows=True)
+    expected = _graph(FormatConverter.convert(document, 'ntriples'), 'nt')
+    return df, meta, path, expected
+
+
+@pytest.mark.parametrize('function, rdflib_format', [
+    ('iter_complete_ntriples', 'nt'),
+    ('iter_complete_turtle', 'turtle'),
+    ('iter_complete_nquads', 'nquads'),
+    ('iter_complete_rdfxml', 'xml'),
+])
+def test_streamed_formats_round_trip(dataset, function, rdflib_format):
+    df, meta, path, expected = dataset
+    text = ''.join(quietly(getattr(converter, function), df, meta, path, process_all_rows=True))
+    assert isomorphic(_graph(text, rdflib_format), expected)
+
+
+def test_binary_rdf_round_trip(dataset):
+    df, meta, path, expected = dataset
+    data = b''.join(quietly(converter.iter_complete_binary_rdf, df, meta, path, process_all_rows=True))
+    assert isomorphic(_graph(''.join(iter_binary_rdf(data)), 'nt'), expected)